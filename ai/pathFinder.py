@@ -1,5 +1,8 @@
-from typing import Set, List
+import heapq
+
+from typing import Dict, Set, List
 from model.hex import Hex
+from model.precompute import MapTables, UNREACHABLE
 
 
 class Node:
@@ -22,11 +25,16 @@ class AStarPathfinding:
     
     <param name="size">Size of the map.</param>
     <param name="center">Center of the map.</param>
+    <param name="tables">Tables of the map, needed to search for turns.</param>
     '''
 
-    def __init__(self, size: int = 10, center: Hex = Hex(0, 0, 0)):
+    def __init__(self, size: int = 10, center: Hex = Hex(0, 0, 0),
+                 tables: MapTables | None = None):
         self.size = size
         self.center = center
+        self.tables = tables
+        # Number of nodes expanded by the last search
+        self.expanded = 0
 
     def __closest_neighbor(self, position: Hex, start: Hex) -> Hex:
         res = position
@@ -66,15 +74,84 @@ class AStarPathfinding:
             return self.__closest_free_node_to_start(start, closest, exclude)
         
 
-    def path(self, start: Hex, end: Hex, exclude: Set[Hex], speed) -> List[Hex]:
+    def __turn_path(self, start: Hex, end: Hex, exclude: Set[Hex], speed: int) -> List[Hex]:
+        '''
+        A* over turns. Every turn costs 1 and ceil(distance / speed) turns are left,
+        distance walking around obstacles, so the heuristic is exact on maps
+        without other excluded hexes and never overestimates with them.
+        A turn ends on any hex up to speed steps away, shorter turns
+        are needed when hexes at full speed are excluded.
+        '''
+
+        tables = self.tables
+        first, last = tables.index[start], tables.index[end]
+        to_end = tables.row(last)
+        if to_end[first] == UNREACHABLE:
+            return []
+
+        def h(i: int) -> int:
+            return -(-to_end[i] // speed)
+
+        prev = {first: None}  # type: Dict[int, int | None]
+        cost = {first: 0}
+        # Many nodes have equal F, deeper ones and closer to the end go first
+        heap = [(h(first), 0, to_end[first], first)]
+        closed = set()
+
+        while heap:
+            _, _, _, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expanded += 1
+
+            if current == last:
+                break
+
+            g = cost[current] + 1
+            if to_end[current] <= speed:
+                # End costs F of current node, which is the lowest one
+                prev[last] = current
+                closed.add(last)
+                break
+
+            for dist in range(1, speed + 1):
+                for neighbor in tables.circle(current, dist):
+                    if neighbor in closed or cost.get(neighbor, g + 1) <= g \
+                            or tables.hexes[neighbor] in exclude:
+                        continue
+                    cost[neighbor] = g
+                    prev[neighbor] = current
+                    heapq.heappush(heap, (g + h(neighbor), -g, to_end[neighbor], neighbor))
+
+        if last not in closed:
+            return []
+
+        finalPathHexes = []
+        current = last
+        while current is not None:
+            finalPathHexes.insert(0, tables.hexes[current])
+            current = prev[current]
+
+        return finalPathHexes
+
+    def path(self, start: Hex, end: Hex, exclude: Set[Hex], speed, turns: bool = False) -> List[Hex]:
         '''
         Finds path from given start point to end point. Returns an empty list if the path couldn't be found.
         
         <param name="start">Start Hex.</param>
         <param name="end">Destination Hex.</param>
         <param name="exclude">Excluded nodes from search.</param>
+        <param name="speed">Max distance of one step.</param>
+        <param name="turns">
+        Find path with the fewest turns of vehicle with given speed, path has hexes
+        where every turn ends. Vehicle walks around obstacles of the map tables,
+        other excluded nodes are only not ended on.
+        </param>
         '''
 
+        self.expanded = 0
+
         # If the start or end Hex is excluded - return an empty list.
         if start in exclude:
             return []
@@ -83,6 +160,13 @@ class AStarPathfinding:
             if end in exclude:
                 return []
 
+        if turns:
+            if self.tables is None:
+                raise ValueError("Search for turns needs map tables")
+            if start not in self.tables.index or end not in self.tables.index:
+                return []
+            return self.__turn_path(start, end, exclude, speed)
+
         openNodes = {start: Node(start, end, 0, None)}
         closedNodes = dict()
 
@@ -94,6 +178,7 @@ class AStarPathfinding:
 
             # Adding the current Hex to the closed list.
             closedNodes[currentHex] = currentNode
+            self.expanded += 1
 
             # If the current Hex is the end Hex - we've found the path.
             if currentHex == end:
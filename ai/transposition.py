@@ -0,0 +1,98 @@
+from typing import Any, Callable, Hashable, List, NamedTuple, Optional
+
+
+class Entry(NamedTuple):
+    key: Hashable
+    value: Any
+    # Depth of search the value was found with, 0 for evaluations
+    depth: int
+    # Generation of the table the value was stored in
+    generation: int
+
+
+# Decides if new entry replaces old one stored in the same slot
+ReplacePolicy = Callable[[Entry, Entry], bool]
+
+
+def always_replace(old: Entry, new: Entry) -> bool:
+    '''
+    The latest entry wins, good for evaluations which all cost the same.
+    '''
+
+    return True
+
+
+def prefer_deeper(old: Entry, new: Entry) -> bool:
+    '''
+    Deeper search results are kept over shallower ones of the same generation,
+    entries of older generations are replaced by anything.
+    '''
+
+    return new.generation != old.generation or new.depth >= old.depth
+
+
+class TranspositionTable:
+    '''
+    Bounded table of values computed for game states. Every key has
+    one slot chosen by its hash, so a new entry either replaces the one
+    stored in its slot or is dropped, as replacement policy decides.
+    Keys are compared in full, so entries of states with colliding
+    hashes are never taken for each other.
+    '''
+
+    def __init__(self, size: int = 1 << 16, replace: ReplacePolicy = always_replace):
+        '''
+        <param name="size">Number of slots.</param>
+        <param name="replace">Policy of slots that are taken by another entry.</param>
+        '''
+
+        self.size = size
+        self.replace = replace
+        self.slots = [None] * size  # type: List[Optional[Entry]]
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, depth: int = 0) -> Optional[Any]:
+        '''
+        <param name="key">State key, hashable and comparable.</param>
+        <param name="depth">Minimum depth of search the value has to be found with.</param>
+        <returns>Stored value or None if there is none</returns>
+        '''
+
+        entry = self.slots[hash(key) % self.size]
+        if entry is None or entry.key != key or entry.depth < depth:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, depth: int = 0) -> bool:
+        '''
+        <param name="key">State key, hashable and comparable.</param>
+        <param name="value">Value computed for the state.</param>
+        <param name="depth">Depth of search the value was found with.</param>
+        <returns>True if the value is stored</returns>
+        '''
+
+        slot = hash(key) % self.size
+        old = self.slots[slot]
+        new = Entry(key, value, depth, self.generation)
+        if old is not None and not self.replace(old, new):
+            return False
+
+        self.slots[slot] = new
+        return True
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self.slots[hash(key) % self.size]
+        return entry is not None and entry.key == key
+
+    def new_generation(self):
+        '''
+        Mark stored entries as old, call when a turn ends. Old entries
+        are still found, but are the first to be replaced.
+        '''
+
+        self.generation += 1
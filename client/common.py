@@ -1,5 +1,5 @@
 from enum import IntEnum
-from typing import NewType, NamedTuple
+from typing import Dict, NewType, NamedTuple
 
 
 PlayerId = NewType("PlayerId", int)
@@ -18,9 +18,7 @@ class Hex(NamedTuple):
 
     @staticmethod
     def from_json(j) -> 'Hex':
-        return Hex(**{
-            k: int(j[k]) for k in Hex._fields
-        })
+        return Hex(int(j['x']), int(j['y']), int(j['z']))
 
 
 class ProtocolAction(IntEnum):
@@ -49,9 +47,33 @@ class GameAction(IntEnum):
 ActionType = ProtocolAction | GameAction
 
 
-def enum_from_json(cls, j):
-    for value in cls:
-        if value.name.casefold() == j.casefold():
-            return value
+class EnumTable(dict):
+    '''
+    Lookup table of enum members by lowercase name.
+    Keys in other case are folded on miss.
+    '''
+
+    def __init__(self, cls: type):
+        super().__init__((value.name.casefold(), value) for value in cls)
+        self.cls = cls
+
+    def __missing__(self, key):
+        folded = key.casefold()
+        if folded != key and folded in self:
+            return self[folded]
+        raise ValueError(f"Unknown {self.cls} value: {key}")
+
+
+# Lookup tables of enums, filled on first use
+ENUM_TABLES = {}  # type: Dict[type, EnumTable]
 
-    raise ValueError(f"Unknown {cls} value: {j}")
+
+def enum_table(cls: type) -> EnumTable:
+    table = ENUM_TABLES.get(cls)
+    if table is None:
+        table = ENUM_TABLES[cls] = EnumTable(cls)
+    return table
+
+
+def enum_from_json(cls, j):
+    return enum_table(cls)[j]
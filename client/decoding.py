@@ -0,0 +1,289 @@
+'''
+Fast decoders of server responses.
+
+Decoders are generated once from annotations of response NamedTuples
+and produce exactly the same values as their from_json methods.
+'''
+
+import typing
+from enum import Enum, IntEnum
+from typing import Any, Callable, Dict, NewType
+
+from client.common import Hex, GameAction, enum_table
+from client.actions import ChatAction, MoveAction, ShootAction
+from client.responses import (
+    Vehicle,
+    GameStateResponse,
+    PlayerAction,
+)
+
+
+Decoder = Callable[[Any], Any]
+
+
+class IntEnumTable(dict):
+    '''
+    Lookup table of int enum members by value.
+    '''
+
+    def __init__(self, cls: type):
+        super().__init__((value.value, value) for value in cls)
+        self.cls = cls
+
+    def __missing__(self, key):
+        raise ValueError(f"{key} is not a valid {self.cls.__name__}")
+
+
+def decode_hex(j) -> Hex:
+    return tuple.__new__(Hex, (int(j['x']), int(j['y']), int(j['z'])))
+
+
+ACTION_DATA_DECODERS = {}  # type: Dict[GameAction, Decoder]
+
+
+def decode_action_data(j):
+    return ACTION_DATA_DECODERS[GameAction(int(j['action_type']))](j['data'])
+
+
+# Fields which decoding does not follow from annotation,
+# expressions are evaluated with j bound to JSON object
+FIELD_OVERRIDES = {
+    Vehicle: {
+        'shoot_range_bonus':
+            "int(j['shoot_range_bonus']) if 'shoot_range_bonus' in j else -1",
+    },
+    GameStateResponse: {
+        'current_player_idx':
+            "int(j['current_player_idx']) "
+            "if j.get('current_player_idx') is not None else None",
+        'winner':
+            "int(j['winner']) if j.get('winner') else None",
+        'catapult_usage':
+            "[_decode_hex(v0) for v0 in j['catapult_usage']] "
+            "if 'catapult_usage' in j else []",
+    },
+    PlayerAction: {
+        'data': "_decode_action_data(j)",
+    },
+}
+
+
+class DecoderGenerator:
+    '''
+    Generates Python source of decoders and compiles it.
+    '''
+
+    def __init__(self):
+        self.namespace = {
+            '_tuple_new': tuple.__new__,
+            '_Hex': Hex,
+            '_decode_hex': decode_hex,
+            '_decode_action_data': decode_action_data,
+        }  # type: Dict[str, Any]
+        self.names = {}  # type: Dict[tuple, str]
+        self.decoders = {}  # type: Dict[type, Decoder]
+        self.field_decoders = {}  # type: Dict[type, Dict[str, Decoder]]
+
+    def __global(self, prefix: str, key, factory: Callable[[], Any]) -> str:
+        '''
+        Name of a global of generated code, created once per prefix and key.
+        '''
+
+        if (prefix, key) not in self.names:
+            name = f"_{prefix}_{len(self.namespace)}"
+            self.namespace[name] = factory()
+            self.names[(prefix, key)] = name
+        return self.names[(prefix, key)]
+
+    def __expr(self, tp, src: str, depth: int = 0) -> str:
+        '''
+        Expression decoding src JSON value of type tp.
+
+        <param name="tp">Annotated type</param>
+        <param name="src">Expression of JSON value</param>
+        <param name="depth">Nesting level, used to name comprehension variables</param>
+        '''
+
+        # NewTypes, i.e. PlayerId and VehicleId, are decoded as supertype
+        while isinstance(tp, NewType):
+            tp = tp.__supertype__
+
+        origin = typing.get_origin(tp)
+        args = typing.get_args(tp)
+        var = f"v{depth}"
+
+        if tp is int or tp is str or tp is bool:
+            return f"{tp.__name__}({src})"
+        if tp is Hex:
+            if src.isidentifier():
+                return f"_tuple_new(_Hex, (int({src}['x']), int({src}['y']), int({src}['z'])))"
+            return f"_decode_hex({src})"
+        if isinstance(tp, type) and issubclass(tp, IntEnum):
+            return f"{self.__global('I', tp, lambda: IntEnumTable(tp))}[int({src})]"
+        if isinstance(tp, type) and issubclass(tp, Enum):
+            return f"{self.__global('E', tp, lambda: enum_table(tp))}[{src}]"
+        if isinstance(tp, type) and issubclass(tp, tuple) and hasattr(tp, '_fields'):
+            self.generate(tp)
+            return f"{self.__global('D', tp, lambda: self.decoders[tp])}({src})"
+        if origin is list:
+            item, = args
+            return f"[{self.__expr(item, var, depth + 1)} for {var} in {src}]"
+        if origin is dict:
+            key, value = args
+            k = f"k{depth}"
+            return (f"{{{self.__expr(key, k, depth + 1)}: {self.__expr(value, var, depth + 1)} "
+                    f"for {k}, {var} in {src}.items()}}")
+
+        raise TypeError(f"Can not generate decoder for {tp}")
+
+    def generate(self, cls: type) -> Decoder:
+        '''
+        Generate decoder of NamedTuple class and decoders of all its fields.
+
+        <param name="cls">NamedTuple class</param>
+        <returns>Decoder function</returns>
+        '''
+
+        if cls in self.decoders:
+            return self.decoders[cls]
+
+        hints = typing.get_type_hints(cls)
+        overrides = FIELD_OVERRIDES.get(cls, {})
+
+        exprs = {
+            name: overrides[name] if name in overrides
+            else self.__expr(hints[name], f"j[{name!r}]")
+            for name in cls._fields
+        }
+
+        cls_name = self.__global('C', cls, lambda: cls)
+        source = [f"def decode(j):"]
+        source.append(f"    return _tuple_new({cls_name}, (")
+        source.extend(f"        {expr}," for expr in exprs.values())
+        source.append("    ))")
+        self.decoders[cls] = self.__compile("\n".join(source), f"decode_{cls.__name__}")
+
+        self.field_decoders[cls] = {
+            name: self.__compile(f"def decode(j):\n    return {expr}",
+                                 f"decode_{cls.__name__}_{name}")
+            for name, expr in exprs.items()
+        }
+
+        return self.decoders[cls]
+
+    def __compile(self, source: str, name: str) -> Decoder:
+        local = {}
+        exec(compile(source, f"<{name}>", "exec"), self.namespace, local)
+        decoder = local["decode"]
+        decoder.__name__ = decoder.__qualname__ = name
+        decoder.__source__ = source
+        return decoder
+
+
+GENERATOR = DecoderGenerator()
+
+
+def decoder_for(cls: type) -> Decoder:
+    '''
+    Get generated decoder of response NamedTuple.
+
+    <param name="cls">NamedTuple class</param>
+    <returns>Function from parsed JSON to cls instance</returns>
+    '''
+
+    return GENERATOR.generate(cls)
+
+
+def field_decoders_for(cls: type) -> Dict[str, Decoder]:
+    '''
+    Get generated decoders of every field of response NamedTuple.
+
+    <param name="cls">NamedTuple class</param>
+    <returns>Dictionary of field name to function from parsed JSON object to field value</returns>
+    '''
+
+    GENERATOR.generate(cls)
+    return GENERATOR.field_decoders[cls]
+
+
+class LazyField:
+    '''
+    Field of lazy response, decoded on first access and cached
+    in instance dictionary which then shadows the descriptor.
+    '''
+
+    def __init__(self, name: str, decoder: Decoder):
+        self.name = name
+        self.decoder = decoder
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.decoder(instance.json)
+        instance.__dict__[self.name] = value
+        return value
+
+
+class LazyGameStateResponse(GameStateResponse):
+    '''
+    GameStateResponse which keeps parsed JSON and decodes fields on demand.
+    Compares, matches and iterates as eagerly decoded GameStateResponse.
+    '''
+
+    def __new__(cls, j):
+        # Items of the underlying tuple are never read, fields are descriptors
+        self = tuple.__new__(cls, (None,) * len(GameStateResponse._fields))
+        self.json = j
+        return self
+
+    def __getnewargs__(self):
+        return (self.json,)
+
+    def __iter__(self):
+        for name in self._fields:
+            yield getattr(self, name)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        return getattr(self, self._fields[index])
+
+    def __eq__(self, other):
+        if isinstance(other, tuple):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, tuple):
+            return tuple(self) != tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return repr(self.decode()).replace(
+            GameStateResponse.__name__, type(self).__name__, 1)
+
+    def _replace(self, **kwargs) -> GameStateResponse:
+        return self.decode()._replace(**kwargs)
+
+    def decode(self) -> GameStateResponse:
+        '''
+        Decode all fields.
+
+        <returns>Plain GameStateResponse</returns>
+        '''
+
+        return tuple.__new__(GameStateResponse, tuple(self))
+
+
+for _name, _decoder in field_decoders_for(GameStateResponse).items():
+    setattr(LazyGameStateResponse, _name, LazyField(_name, _decoder))
+
+
+ACTION_DATA_DECODERS.update({
+    GameAction.CHAT: decoder_for(ChatAction),
+    GameAction.MOVE: decoder_for(MoveAction),
+    GameAction.SHOOT: decoder_for(ShootAction),
+})
@@ -0,0 +1,155 @@
+import json
+import struct
+from json.encoder import encode_basestring_ascii
+
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from client.common import ActionType, Hex
+from client.actions import Action, LoginAction, ChatAction, MoveAction, ShootAction
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+HEADER = struct.Struct("<II")
+HEADER_PLACEHOLDER = bytes(HEADER.size)
+
+BodyWriter = Callable[[bytearray, Action], None]
+
+
+def dictify(value):
+    '''
+    Convert a namedtuple to a dict recursively.
+    Remove nones.
+    '''
+    if hasattr(value, "_asdict"):
+        return {k: dictify(v) for k, v in
+                value._asdict().items() if v is not None}
+
+    return value
+
+
+def encode_str(value: str) -> bytes:
+    '''
+    Encode string exactly as json.dumps does with default settings.
+    '''
+
+    # For printable ASCII both escape only quotes and backslashes
+    if orjson is not None and value.isascii() and value.isprintable():
+        return orjson.dumps(value)
+    return encode_basestring_ascii(value).encode("ascii")
+
+
+def encode_value(value) -> bytes:
+    '''
+    Encode single JSON value exactly as json.dumps does with default settings.
+    '''
+
+    t = type(value)
+    if t is int:
+        return b'%d' % value
+    if t is str:
+        return encode_str(value)
+    if t is bool:
+        return b'true' if value else b'false'
+    return json.dumps(dictify(value)).encode("utf-8")
+
+
+def write_generic(buf: bytearray, action: Action):
+    buf += json.dumps(dictify(action)).encode("utf-8")
+
+
+def compile_writer(cls: type) -> BodyWriter:
+    '''
+    Build body writer for a flat NamedTuple, keys are encoded once here.
+
+    <param name="cls">NamedTuple class of action</param>
+    '''
+
+    keys = [b'"' + name.encode("ascii") + b'": ' for name in cls._fields]
+
+    def write(buf: bytearray, action: Action):
+        sep = b'{'
+        for key, value in zip(keys, action):
+            # Nones are omitted as in dictify
+            if value is None:
+                continue
+            buf += sep
+            buf += key
+            buf += encode_value(value)
+            sep = b', '
+
+        buf += b'{}' if sep == b'{' else b'}'
+
+    return write
+
+
+def write_vehicle_target(buf: bytearray, action: MoveAction | ShootAction):
+    '''
+    Body writer for actions made of vehicle id and target hex.
+    '''
+
+    vehicle_id = action.vehicle_id
+    target = action.target
+    if type(target) is Hex:
+        x, y, z = target
+        if type(vehicle_id) is int and type(x) is int and type(y) is int and type(z) is int:
+            buf += b'{"vehicle_id": %d, "target": {"x": %d, "y": %d, "z": %d}}' % (
+                vehicle_id, x, y, z)
+            return
+
+    write_generic(buf, action)
+
+
+WRITERS = {
+    LoginAction: compile_writer(LoginAction),
+    ChatAction: compile_writer(ChatAction),
+    MoveAction: write_vehicle_target,
+    ShootAction: write_vehicle_target,
+}  # type: Dict[type, BodyWriter]
+
+
+class ActionEncoder:
+    '''
+    Encodes action frames into a reusable buffer.
+    Output is byte-identical to serialize_action.
+    '''
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, t: ActionType, action: Optional[Action] = None):
+        '''
+        Append frame to the buffer.
+
+        <param name="t">Action type</param>
+        <param name="action">Action data</param>
+        '''
+
+        buf = self.buffer
+        start = len(buf)
+        buf += HEADER_PLACEHOLDER
+        if action is not None:
+            WRITERS.get(type(action), write_generic)(buf, action)
+        HEADER.pack_into(buf, start, t, len(buf) - start - HEADER.size)
+
+    def encode(self, t: ActionType, action: Optional[Action] = None) -> bytes:
+        '''
+        Encode a single frame.
+        '''
+
+        del self.buffer[:]
+        self.write(t, action)
+        return bytes(self.buffer)
+
+    def encode_many(self, requests: Iterable[Tuple[ActionType, Optional[Action]]]) -> bytes:
+        '''
+        Encode several frames into one contiguous chunk.
+        '''
+
+        del self.buffer[:]
+        for t, action in requests:
+            self.write(t, action)
+        return bytes(self.buffer)
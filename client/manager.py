@@ -0,0 +1,180 @@
+import random
+import asyncio as aio
+import logging as log
+
+from typing import List
+
+from client.session import Session
+from client.actions import LoginAction
+from client.responses import LoginResponse, ErrorResponse
+
+
+class SessionManager:
+    '''
+    Opens sessions concurrently and keeps spare connected sessions,
+    so that joining a game does not wait for connection.
+    Owns every session it gives out and disconnects them on close.
+    '''
+
+    def __init__(self, addr: str, port: int, max_logins: int = 8,
+                 retries: int = 3, backoff: float = 0.1, max_backoff: float = 2.0,
+                 connect_timeout: float = 5.0, spares: int = 0,
+                 session_class: type = Session, **session_options):
+        '''
+        <param name="addr">Server address</param>
+        <param name="port">Server port</param>
+        <param name="max_logins">Maximum number of logins in flight</param>
+        <param name="retries">Number of retries of failed connection</param>
+        <param name="backoff">Seconds before the first retry, doubled for every next one</param>
+        <param name="max_backoff">Maximum seconds between retries</param>
+        <param name="connect_timeout">Seconds after which connection attempt fails</param>
+        <param name="spares">Number of connected sessions kept in reserve</param>
+        <param name="session_class">Class of created sessions</param>
+        <param name="session_options">Keyword arguments of every created session</param>
+        '''
+
+        self.addr = addr
+        self.port = port
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.connect_timeout = connect_timeout
+        self.spares = spares
+        self.session_class = session_class
+        self.session_options = session_options
+        self.login_slots = aio.Semaphore(max_logins)
+        self.sessions = []  # type: List[Session]
+        self.spare_sessions = []  # type: List[Session]
+        self.warm_up_task = None  # type: aio.Task | None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        await self.close()
+
+    async def connect(self) -> Session:
+        '''
+        Open new session, transient failures are retried with exponential backoff.
+        '''
+
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            session = self.session_class(self.addr, self.port, **self.session_options)
+            try:
+                await aio.wait_for(session.connect(), self.connect_timeout)
+                return session
+            except (OSError, aio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+
+                log.warning(f"Connection to {self.addr}:{self.port} failed: {e!r}, "
+                            f"retry in {delay:.2f} s")
+                # Randomized so that concurrent sessions do not retry in lockstep
+                await aio.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(delay * 2, self.max_backoff)
+
+    async def open(self, n: int = 1) -> List[Session]:
+        '''
+        Get n connected sessions, spare sessions are used first
+        and the rest is connected concurrently.
+
+        <param name="n">Number of sessions</param>
+        <returns>Sessions owned by manager</returns>
+        '''
+
+        sessions = []
+        while self.spare_sessions and len(sessions) < n:
+            session = self.spare_sessions.pop()
+            # Server could have dropped idle connection
+            if session.writer.is_closing() or session.frames.at_eof():
+                await self.__disconnect(session)
+                continue
+            sessions.append(session)
+
+        results = await aio.gather(
+            *(self.connect() for _ in range(n - len(sessions))),
+            return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        sessions.extend(r for r in results if not isinstance(r, BaseException))
+        if errors:
+            await aio.gather(*(self.__disconnect(s) for s in sessions))
+            raise errors[0]
+
+        self.sessions.extend(sessions)
+        self.warm_up()
+
+        return sessions
+
+    async def login(self, session: Session, action: LoginAction) -> LoginResponse | ErrorResponse:
+        async with self.login_slots:
+            return await session.login(action)
+
+    async def login_all(self, sessions: List[Session],
+                        actions: List[LoginAction]) -> List[LoginResponse | ErrorResponse]:
+        '''
+        Log in sessions concurrently, number of logins in flight is bounded.
+
+        <param name="sessions">Connected sessions</param>
+        <param name="actions">Login of every session</param>
+        <returns>Responses in the same order as sessions</returns>
+        '''
+
+        return list(await aio.gather(
+            *(self.login(session, action) for session, action in zip(sessions, actions))
+        ))
+
+    def warm_up(self):
+        '''
+        Connect missing spare sessions in background.
+        '''
+
+        if self.warm_up_task is not None and not self.warm_up_task.done():
+            return
+        if len(self.spare_sessions) >= self.spares:
+            return
+
+        self.warm_up_task = aio.create_task(self.__warm_up())
+
+    async def __warm_up(self):
+        missing = self.spares - len(self.spare_sessions)
+        results = await aio.gather(
+            *(self.connect() for _ in range(missing)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                log.warning(f"Spare connection failed: {result!r}")
+            else:
+                self.spare_sessions.append(result)
+
+    async def release(self, session: Session):
+        '''
+        Disconnect session given out by manager before manager is closed.
+        '''
+
+        self.sessions.remove(session)
+        await self.__disconnect(session)
+
+    async def close(self):
+        if self.warm_up_task is not None:
+            self.warm_up_task.cancel()
+            try:
+                await self.warm_up_task
+            except aio.CancelledError:
+                pass
+            self.warm_up_task = None
+
+        sessions = self.sessions + self.spare_sessions
+        self.sessions = []
+        self.spare_sessions = []
+        await aio.gather(*(self.__disconnect(s) for s in sessions))
+
+    async def __disconnect(self, session: Session):
+        if not session.is_connected:
+            return
+        try:
+            await session.disconnect()
+        except (OSError, aio.TimeoutError) as e:
+            log.debug(f"Disconnect failed: {e!r}")
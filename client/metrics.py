@@ -0,0 +1,184 @@
+import bisect
+import logging as log
+import asyncio as aio
+
+from typing import Callable, Dict, Optional
+
+from client.common import ActionType
+from client.responses import ResponseCode
+
+
+# Upper bounds of histogram buckets in seconds, from 50 us to about 26 s
+BUCKET_BOUNDS = [0.00005 * 2 ** i for i in range(20)]
+
+
+class Histogram:
+    '''
+    Histogram of durations with fixed exponential buckets.
+    Recording is a single bisect, quantiles are approximated by bucket bounds.
+    '''
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, value: float):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        '''
+        Upper bound of the bucket containing given quantile,
+        clamped to observed maximum.
+
+        <param name="q">Quantile from 0 to 1</param>
+        '''
+
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class SessionMetrics:
+    '''
+    Counters of a session, could be shared by several sessions.
+    Durations are in seconds.
+    '''
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # Time from sending request to having decoded response, by request type
+        self.round_trips = {}  # type: Dict[ActionType, Histogram]
+        # Time spent in response deserialization, lazy fields are decoded later
+        self.decode = Histogram()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.requests = 0
+        self.errors = {}  # type: Dict[ResponseCode, int]
+
+    def round_trip(self, t: ActionType, seconds: float):
+        histogram = self.round_trips.get(t)
+        if histogram is None:
+            histogram = self.round_trips[t] = Histogram()
+        histogram.record(seconds)
+
+    def error(self, code: ResponseCode):
+        self.errors[code] = self.errors.get(code, 0) + 1
+
+    def snapshot(self) -> dict:
+        '''
+        Current values as JSON serializable dictionary.
+        '''
+
+        return {
+            "requests": self.requests,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "round_trips": {
+                t.name: h.snapshot() for t, h in self.round_trips.items()
+            },
+            "decode": self.decode.snapshot(),
+            "errors": {code.name: n for code, n in self.errors.items()},
+        }
+
+
+def format_snapshot(snapshot: dict) -> str:
+    lines = [
+        f"{snapshot['requests']} requests, {snapshot['bytes_sent']} bytes sent, "
+        f"{snapshot['bytes_received']} bytes received"
+    ]
+    for name, h in [*snapshot["round_trips"].items(), ("decode", snapshot["decode"])]:
+        lines.append(
+            f"{name:<14}{h['count']:>7} mean {h['mean'] * 1000:.2f} ms, "
+            f"p50 {h['p50'] * 1000:.2f} ms, p95 {h['p95'] * 1000:.2f} ms, "
+            f"max {h['max'] * 1000:.2f} ms"
+        )
+    if snapshot["errors"]:
+        lines.append("errors: " + ", ".join(
+            f"{code} {n}" for code, n in snapshot["errors"].items()))
+    return "\n".join(lines)
+
+
+class MetricsReporter:
+    '''
+    Periodically reports snapshots of session metrics.
+    '''
+
+    def __init__(self, metrics: SessionMetrics, interval: float = 10.0,
+                 report: Optional[Callable[[dict], None]] = None, reset: bool = False):
+        '''
+        <param name="metrics">Metrics to report</param>
+        <param name="interval">Seconds between reports</param>
+        <param name="report">Called with every snapshot, logs it if None</param>
+        <param name="reset">Reset metrics after every report, so that reports are per interval</param>
+        '''
+
+        self.metrics = metrics
+        self.interval = interval
+        self.report = report or (lambda snapshot: log.info(
+            "Session metrics:\n" + format_snapshot(snapshot)))
+        self.reset = reset
+        self.task = None  # type: aio.Task | None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        await self.stop()
+
+    def start(self):
+        if self.task is not None:
+            raise RuntimeError("Already started")
+
+        self.task = aio.create_task(self.__run())
+
+    async def stop(self):
+        if self.task is None:
+            raise RuntimeError("Not started")
+
+        self.task.cancel()
+        try:
+            await self.task
+        except aio.CancelledError:
+            pass
+        self.task = None
+
+        # Final report, so that short runs are reported too
+        self.report(self.metrics.snapshot())
+
+    async def __run(self):
+        while True:
+            await aio.sleep(self.interval)
+            self.report(self.metrics.snapshot())
+            if self.reset:
+                self.metrics.reset()
@@ -0,0 +1,113 @@
+import time
+import struct
+
+from typing import BinaryIO, Iterator, NamedTuple
+
+from client.common import ActionType
+from client.responses import ResponseCode
+
+
+# File starts with magic and format version
+MAGIC = b"YAGDEREC"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sI")
+
+# Every frame is: kind, wall clock time, action type, response code, payload length
+FRAME_HEADER = struct.Struct("<BdIII")
+
+# Header of protocol frames, see client.session
+PROTOCOL_HEADER = struct.Struct("<II")
+
+REQUEST = 0
+RESPONSE = 1
+
+
+class Frame(NamedTuple):
+    kind: int
+    time: float
+    # Type of the action, for responses the type of the request it answers
+    action: int
+    # Response code, 0 for requests
+    code: int
+    data: bytes
+
+
+class Recorder:
+    '''
+    Appends request and response frames of sessions to a file.
+    Payloads are stored as they were sent or received.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "ab")  # type: BinaryIO
+        # Appended file already has the header
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def write(self, kind: int, action: int, code: int, data: bytes):
+        self.file.write(FRAME_HEADER.pack(kind, time.time(), action, code, len(data)))
+        self.file.write(data)
+
+    def requests(self, data: bytes):
+        '''
+        Record encoded request frames, several frames could be sent at once.
+
+        <param name="data">Encoded protocol frames</param>
+        '''
+
+        offset = 0
+        while offset < len(data):
+            t, l = PROTOCOL_HEADER.unpack_from(data, offset)
+            offset += PROTOCOL_HEADER.size
+            self.write(REQUEST, t, 0, data[offset:offset + l])
+            offset += l
+
+    def response(self, t: ActionType, code: ResponseCode, data: bytes):
+        '''
+        Record response payload.
+
+        <param name="t">Type of the request response answers</param>
+        <param name="code">Response code</param>
+        <param name="data">Payload</param>
+        '''
+
+        self.write(RESPONSE, t, code, data)
+
+
+def read_frames(path: str) -> Iterator[Frame]:
+    '''
+    Read frames of recorded file in order they were recorded.
+
+    <param name="path">File written by Recorder</param>
+    '''
+
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            raise ValueError(f"Not a recording: {path}")
+        magic, version = FILE_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"Not a recording: {path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version: {version}")
+
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            # Last frame could be cut if recording process was killed
+            if len(header) < FRAME_HEADER.size:
+                return
+            kind, t, action, code, l = FRAME_HEADER.unpack(header)
+            data = f.read(l)
+            if len(data) < l:
+                return
+            yield Frame(kind, t, action, code, data)
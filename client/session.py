@@ -2,10 +2,16 @@ import json
 import struct
 import asyncio as aio
 import logging as log
+from time import perf_counter
 
-from typing import Optional
+from typing import Optional, List, Tuple
 
 from client.common import ProtocolAction, ActionType, GameAction
+from client.encoding import ActionEncoder, dictify
+from client.decoding import decoder_for, LazyGameStateResponse
+from client.recorder import Recorder
+from client.metrics import SessionMetrics
+from client.transport import HEADER, FrameProtocol, StreamFrameReader, open_frame_connection, loads
 
 from client.actions import (
     Action, 
@@ -35,17 +41,6 @@ def serialize_action(t: ActionType, action: Optional[Action] = None) -> bytes:
     n bytes: JSON data in UTF-8
     '''
 
-    def dictify(value) -> dict:
-        '''
-        Convert a namedtuple to a dict recursively.
-        Remove nones.
-        '''
-        if hasattr(value, "_asdict"):
-            return {k: dictify(v) for k, v in
-                    value._asdict().items() if v is not None}
-
-        return value
-
     if action is not None:
         data = dictify(action)
         data = json.dumps(data).encode("utf-8")
@@ -55,18 +50,22 @@ def serialize_action(t: ActionType, action: Optional[Action] = None) -> bytes:
     return struct.pack("<II", t, len(data)) + data
 
 
-def deserialize_response_header(data: bytes) -> tuple[ResponseCode, int]:
-    '''
-    Deserialize the header of a response.
-    The format is:
-    4 bytes: response code
-    4 bytes: length of the JSON data
-    '''
-    c, l = struct.unpack("<II", data)
-    return ResponseCode(c), l
+RESPONSE_DECODERS = {
+    ProtocolAction.LOGIN: decoder_for(LoginResponse),
+    ProtocolAction.MAP: decoder_for(MapResponse),
+    ProtocolAction.GAME_STATE: decoder_for(GameStateResponse),
+    ProtocolAction.GAME_ACTIONS: decoder_for(GameActionsResponse),
+}
+
+# Game state fields are decoded only when accessed
+LAZY_RESPONSE_DECODERS = {
+    **RESPONSE_DECODERS,
+    ProtocolAction.GAME_STATE: LazyGameStateResponse,
+}
 
 
-def deserialize_response_data(t: ActionType, data: bytes) -> ActionResponse | None:
+def deserialize_response_data(t: ActionType, data: bytes | memoryview,
+                              decoders: dict = RESPONSE_DECODERS) -> ActionResponse | None:
     '''
     Deserialize the data of a response.
     The format is:
@@ -75,40 +74,52 @@ def deserialize_response_data(t: ActionType, data: bytes) -> ActionResponse | No
     if len(data) == 0:
         return None
 
-    data = data.decode("utf-8")
-    data = json.loads(data)
-    match t:
-        case ProtocolAction.LOGIN:
-            return LoginResponse.from_json(data)
-        case ProtocolAction.MAP:
-            return MapResponse.from_json(data)
-        case ProtocolAction.GAME_STATE:
-            return GameStateResponse.from_json(data)
-        case ProtocolAction.GAME_ACTIONS:
-            return GameActionsResponse.from_json(data)
-        case _:
-            raise ValueError(f"Unknown action type: {t}")
-
-
-def deserialize_error_response(c: ResponseCode, data: bytes) -> ErrorResponse:
+    decoder = decoders.get(t)
+    if decoder is None:
+        raise ValueError(f"Unknown action type: {t}")
+
+    return decoder(loads(data))
+
+
+def deserialize_error_response(c: ResponseCode, data: bytes | memoryview) -> ErrorResponse:
     '''
     Deserialize the data of an error response.
     The format is:
     n bytes: JSON data in UTF-8
     '''
-    data = data.decode("utf-8")
-    data = json.loads(data)
+    data = loads(data)
 
     return ErrorResponse(c, data["error_message"])
 
 
 class Session:
-    def __init__(self, addr: str, port: int):
+    def __init__(self, addr: str, port: int, lazy_state: bool = False,
+                 recorder: Optional[Recorder] = None,
+                 metrics: Optional[SessionMetrics] = None,
+                 buffered: bool = True):
+        '''
+        <param name="addr">Server address</param>
+        <param name="port">Server port</param>
+        <param name="lazy_state">Decode game state fields only when they are accessed</param>
+        <param name="recorder">Recorder of all sent and received frames</param>
+        <param name="metrics">Metrics to collect, nothing is measured if None</param>
+        <param name="buffered">Receive into reusable buffer instead of asyncio streams</param>
+        '''
+
         self.addr = addr
         self.port = port
-        self.reader = None
-        self.writer = None
+        self.decoders = LAZY_RESPONSE_DECODERS if lazy_state else RESPONSE_DECODERS
+        self.buffered = buffered
+        # Source of response frames and sink of requests
+        self.frames = None  # type: StreamFrameReader | FrameProtocol | None
+        self.writer = None  # type: aio.StreamWriter | FrameProtocol | None
         self.is_connected = False
+        self.encoder = ActionEncoder()
+        # Responses come in order of requests, so a request and reading
+        # of its response are not interleaved with others
+        self.lock = aio.Lock()
+        self.recorder = recorder
+        self.metrics = metrics
 
     async def __aenter__(self):
         await self.connect()
@@ -121,7 +132,11 @@ class Session:
         if self.is_connected:
             raise RuntimeError("Already connected")
 
-        self.reader, self.writer = await aio.open_connection(self.addr, self.port)
+        if self.buffered:
+            self.frames = self.writer = await open_frame_connection(self.addr, self.port)
+        else:
+            reader, self.writer = await aio.open_connection(self.addr, self.port)
+            self.frames = StreamFrameReader(reader)
         self.is_connected = True
 
     async def disconnect(self):
@@ -133,30 +148,93 @@ class Session:
         self.is_connected = False
 
     async def action(self, t: ActionType, action: Optional[Action] = None) -> ActionResponse | ErrorResponse:
-        data = serialize_action(t, action)
+        async with self.lock:
+            data = self.encoder.encode(t, action)
+            if self.recorder is not None:
+                self.recorder.requests(data)
+
+            sent = self.__sent(data, 1)
+            self.writer.write(data)
+            await self.writer.drain()
 
-        self.writer.write(data)
-        await self.writer.drain()
+            log.debug("Sent action %s - %s, encoded: %s", t.name, action, data)
 
-        log.debug(f"Sent action {t.name} - {action}, encoded: {data}")
+            return await self.__read_response(t, sent)
 
-        header = await self.reader.readexactly(8)
-        c, l = deserialize_response_header(header)
+    async def pipeline(self, requests: List[Tuple[ActionType, Optional[Action]]]) -> List[ActionResponse | ErrorResponse | None]:
+        '''
+        Send several actions at once and only then read responses.
+        Server answers in order, so the whole batch costs one round trip.
 
-        log.debug(f"Received header: code {str(c)}, length {l}")
+        <param name="requests">List of action types and actions</param>
+        <returns>Responses in the same order as requests</returns>
+        '''
+
+        if not requests:
+            return []
+
+        async with self.lock:
+            data = self.encoder.encode_many(requests)
+            if self.recorder is not None:
+                self.recorder.requests(data)
+
+            sent = self.__sent(data, len(requests))
+            self.writer.write(data)
+            await self.writer.drain()
+
+            log.debug("Sent %d pipelined actions, encoded: %s", len(requests), data)
+
+            return [await self.__read_response(t, sent) for t, _ in requests]
+
+    def __sent(self, data: bytes, requests: int) -> float:
+        '''
+        Account sent requests.
+
+        <returns>Time requests were sent at, 0 if metrics are off</returns>
+        '''
+
+        metrics = self.metrics
+        if metrics is None:
+            return 0.0
+
+        metrics.requests += requests
+        metrics.bytes_sent += len(data)
+        return perf_counter()
+
+    async def __read_response(self, t: ActionType, sent: float = 0.0) -> ActionResponse | ErrorResponse:
+        c, data = await self.frames.read_frame()
+        c = ResponseCode(c)
+        l = len(data)
+
+        log.debug("Received header: code %s, length %d", c, l)
+
+        if self.recorder is not None:
+            self.recorder.response(t, c, data)
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.bytes_received += HEADER.size + l
+            decode_start = perf_counter()
 
-        data = await self.reader.readexactly(l)
         match c:
             case ResponseCode.OKEY:
-                log.debug(f"Received response data: {data}")
-                response = deserialize_response_data(t, data)
-                log.debug(f"Deserialized response: {response}")
-                return response
+                log.debug("Received response data: %s", data)
+                response = deserialize_response_data(t, data, self.decoders)
+                # Formatting is deferred, it would decode all fields of lazy responses
+                log.debug("Deserialized response: %s", response)
             case _:
-                log.error(f"Received response data: {data}")
+                log.error(f"Received response data: {bytes(data)}")
                 response = deserialize_error_response(c, data)
                 log.error(f"Deserialized response: {response}")
-                return response
+
+        if metrics is not None:
+            end = perf_counter()
+            metrics.decode.record(end - decode_start)
+            metrics.round_trip(t, end - sent)
+            if c != ResponseCode.OKEY:
+                metrics.error(c)
+
+        return response
 
     async def login(self, action: LoginAction) -> LoginResponse | ErrorResponse:
         return await self.action(ProtocolAction.LOGIN, action)
@@ -0,0 +1,71 @@
+import asyncio as aio
+
+from typing import Awaitable, Callable, Dict
+
+from client.session import Session
+from client.common import ProtocolAction
+from client.responses import (
+    ActionResponse,
+    MapResponse,
+    GameStateResponse,
+    GameActionsResponse,
+    ErrorResponse
+)
+
+
+class SharedRequests:
+    '''
+    Read-only requests of one session shared by every co-located client:
+    bots, renderer and the game loop itself.
+
+    Concurrent identical requests are collapsed into one round trip
+    and responses are reused until the turn ends. Map does not change
+    during the game and is fetched once. Error responses are not reused.
+    '''
+
+    def __init__(self, session: Session):
+        '''
+        <param name="session">Logged in session to send requests through</param>
+        '''
+
+        self.session = session
+        self.responses = {}  # type: Dict[ProtocolAction, aio.Future]
+        # Number of requests sent and answered from shared responses
+        self.sent = 0
+        self.collapsed = 0
+
+    async def __request(self, t: ProtocolAction,
+                        send: Callable[[], Awaitable[ActionResponse | ErrorResponse]]):
+        future = self.responses.get(t)
+        if future is None:
+            future = self.responses[t] = aio.ensure_future(send())
+            future.add_done_callback(lambda f: self.__forget_failed(t, f))
+            self.sent += 1
+        else:
+            self.collapsed += 1
+
+        # Cancellation of one waiter does not cancel the request of others
+        return await aio.shield(future)
+
+    def __forget_failed(self, t: ProtocolAction, future: aio.Future):
+        if future.cancelled() or future.exception() is not None \
+                or isinstance(future.result(), ErrorResponse):
+            if self.responses.get(t) is future:
+                del self.responses[t]
+
+    async def map(self) -> MapResponse | ErrorResponse:
+        return await self.__request(ProtocolAction.MAP, self.session.map)
+
+    async def game_state(self) -> GameStateResponse | ErrorResponse:
+        return await self.__request(ProtocolAction.GAME_STATE, self.session.game_state)
+
+    async def game_actions(self) -> GameActionsResponse | ErrorResponse:
+        return await self.__request(ProtocolAction.GAME_ACTIONS, self.session.game_actions)
+
+    def next_turn(self):
+        '''
+        Forget responses that change between turns, call when turn ends.
+        '''
+
+        for t in (ProtocolAction.GAME_STATE, ProtocolAction.GAME_ACTIONS):
+            self.responses.pop(t, None)
@@ -0,0 +1,218 @@
+import json
+import struct
+import asyncio as aio
+
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+HEADER = struct.Struct("<II")
+
+# Initial size of receive buffer, it grows to fit the largest frame
+INITIAL_BUFFER_SIZE = 64 * 1024
+# Minimal free space offered to the transport
+MIN_READ_SIZE = 16 * 1024
+
+Frame = Tuple[int, memoryview]
+
+
+def loads(data: bytes | memoryview):
+    '''
+    Parse JSON payload, memoryview is parsed without copying to bytes.
+    '''
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(str(data, "utf-8"))
+
+
+class StreamFrameReader:
+    '''
+    Frame reader over asyncio stream, allocates bytes for every frame.
+    '''
+
+    def __init__(self, reader: aio.StreamReader):
+        self.reader = reader
+
+    async def read_frame(self) -> Tuple[int, bytes]:
+        code, l = HEADER.unpack(await self.reader.readexactly(HEADER.size))
+        return code, await self.reader.readexactly(l)
+
+    def at_eof(self) -> bool:
+        return self.reader.at_eof()
+
+
+class FrameProtocol(aio.BufferedProtocol):
+    '''
+    Receives frames into a reusable buffer and gives out payloads
+    as memoryviews into it.
+
+    Payload is valid until the next read_frame call or the next await
+    of the caller, whichever happens first: buffer space of consumed frames
+    is reused. Buffer never changes while views of queued frames exist,
+    it is replaced by a larger one instead.
+    '''
+
+    def __init__(self):
+        self.buffer = bytearray(INITIAL_BUFFER_SIZE)
+        self.view = memoryview(self.buffer)
+        # Received data is buffer[start:end], parsed frames are before start
+        self.start = 0
+        self.end = 0
+        self.frames = deque()  # type: Deque[Frame]
+        self.transport = None  # type: aio.Transport | None
+        self.waiter = None  # type: aio.Future | None
+        self.drain_waiter = None  # type: aio.Future | None
+        self.paused = False
+        self.closed = None  # type: aio.Future | None
+        self.exception = None  # type: Exception | None
+        self.eof = False
+
+    # Protocol callbacks
+
+    def connection_made(self, transport: aio.Transport):
+        self.transport = transport
+        self.closed = aio.get_running_loop().create_future()
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.eof = True
+        self.exception = exc
+        if not self.closed.done():
+            self.closed.set_result(None)
+        self.__wake(self.waiter)
+        self.__wake(self.drain_waiter)
+
+    def eof_received(self):
+        self.eof = True
+        self.__wake(self.waiter)
+
+    def pause_writing(self):
+        self.paused = True
+
+    def resume_writing(self):
+        self.paused = False
+        self.__wake(self.drain_waiter)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        needed = max(sizehint, MIN_READ_SIZE)
+        if len(self.buffer) - self.end < needed:
+            self.__make_room(needed)
+        return self.view[self.end:]
+
+    def buffer_updated(self, nbytes: int):
+        self.end += nbytes
+        self.__parse()
+        if self.frames:
+            self.__wake(self.waiter)
+
+    # Buffer management
+
+    def __make_room(self, needed: int):
+        pending = self.end - self.start
+
+        if not self.frames and pending + needed <= len(self.buffer):
+            # Nobody looks at consumed part, move pending data to the front
+            self.buffer[:pending] = self.buffer[self.start:self.end]
+        else:
+            # Views of queued frames keep the old buffer alive
+            size = len(self.buffer)
+            while size < pending + needed:
+                size *= 2
+            buffer = bytearray(size)
+            buffer[:pending] = self.view[self.start:self.end]
+            self.buffer = buffer
+            self.view = memoryview(buffer)
+
+        self.start = 0
+        self.end = pending
+
+    def __parse(self):
+        view = self.view
+        start = self.start
+        end = self.end
+        while end - start >= HEADER.size:
+            code, l = HEADER.unpack_from(view, start)
+            if end - start - HEADER.size < l:
+                # Make sure the whole frame fits into buffer
+                if HEADER.size + l > len(self.buffer) - start:
+                    self.start = start
+                    self.__make_room(HEADER.size + l - (end - start))
+                    view, start, end = self.view, self.start, self.end
+                break
+            start += HEADER.size
+            self.frames.append((code, view[start:start + l]))
+            start += l
+        self.start = start
+
+    @staticmethod
+    def __wake(waiter: Optional[aio.Future]):
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    # Reading
+
+    async def read_frame(self) -> Frame:
+        '''
+        Wait for the next frame.
+
+        <returns>Response code and payload view</returns>
+        '''
+
+        if self.waiter is not None:
+            # Frames would be given out in no particular order
+            raise RuntimeError("read_frame is already awaited by another coroutine")
+
+        while not self.frames:
+            if self.eof:
+                raise self.exception or aio.IncompleteReadError(
+                    bytes(self.view[self.start:self.end]), None)
+            self.waiter = aio.get_running_loop().create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+
+        return self.frames.popleft()
+
+    def at_eof(self) -> bool:
+        return self.eof and not self.frames
+
+    # Writing, same interface as asyncio.StreamWriter
+
+    def write(self, data: bytes):
+        self.transport.write(data)
+
+    async def drain(self):
+        if self.exception is not None:
+            raise self.exception
+        if self.transport.is_closing():
+            # Let connection_lost run, as StreamWriter does
+            await aio.sleep(0)
+            if self.eof:
+                raise ConnectionResetError("Connection lost")
+        while self.paused and not self.eof:
+            self.drain_waiter = aio.get_running_loop().create_future()
+            try:
+                await self.drain_waiter
+            finally:
+                self.drain_waiter = None
+
+    def is_closing(self) -> bool:
+        return self.transport.is_closing()
+
+    def close(self):
+        self.transport.close()
+
+    async def wait_closed(self):
+        await self.closed
+
+
+async def open_frame_connection(addr: str, port: int) -> FrameProtocol:
+    loop = aio.get_running_loop()
+    _, protocol = await loop.create_connection(FrameProtocol, addr, port)
+    return protocol
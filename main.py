@@ -1,18 +1,25 @@
+import sys
 import logging
+import argparse
 from contextlib import AsyncExitStack
 import asyncio as aio
-import pygame
+from time import perf_counter
 
 from client.session import Session
-from client.actions import LoginAction, MoveAction as ClientMoveAction, ShootAction as ClientShootAction
-from client.common import Hex as ClientHex, VehicleId as ClientVehicleId, PlayerId as ClientPlayerId
+from client.manager import SessionManager
+from client.recorder import Recorder
+from client.metrics import SessionMetrics, MetricsReporter
+from client.shared import SharedRequests
+from client.actions import LoginAction
+from client.common import PlayerId as ClientPlayerId
 from client.responses import ErrorResponse
-from player.engine import Engine
+from player.pool import EnginePool
+from player.workers import EngineWorkers
+from player.speculation import Speculator, cancel
+from player.validator import ActionValidator
 from model.game import Game
 from model.common import PlayerId
 from model.action import MoveAction, ShootAction
-from graphics.window import Window
-from graphics.constants import WINDOW_NAME
 
 from info import ( 
     SERVER_ADDR, 
@@ -20,10 +27,27 @@ from info import (
 )
 
 
+server_addr = SERVER_ADDR
+server_port = SERVER_PORT
 game_name = "yagde-test-game"
 num_of_players = 3
 full = False
 number_of_bots = 1
+# Engine computations run in this pool to keep event loop responsive
+engine_workers = 1
+engine_processes = False
+# Run engine of every bot in its own process instead of the pool
+bot_processes = False
+# File to record traffic of the state session to, see runner.replay
+record_file = None
+# Seconds between reports of session metrics, not collected if None
+metrics_interval = None
+# Run without GUI, pygame is not even imported
+headless = False
+# Separate observer connection fetches game state, otherwise the first bot does
+use_observer = True
+# Precompute turns of bots for predicted states while others play
+speculation = False
 
 logging.basicConfig(
     format="%(asctime)s %(levelname)s %(message)s",
@@ -44,138 +68,275 @@ class Client:
         self.session = session
 
 
+class Gui:
+    '''
+    Window of the game, pygame is imported only when it is created.
+    '''
+
+    def __init__(self):
+        import pygame
+        from graphics.window import Window
+        from graphics.constants import WINDOW_NAME
+
+        pygame.init()
+        self.pygame = pygame
+        window_info = pygame.display.Info()
+        self.window = Window(window_info.current_w, window_info.current_h, WINDOW_NAME)
+
+    def clear_events(self):
+        self.pygame.event.clear()
+
+    def draw(self, game: Game):
+        self.window.draw(game)
+        self.window.update()
+
+    def end(self, w_name: str):
+        self.window.end(w_name)
+
+
 class Sessions:
     def __init__(self, observer, players):
         self.observer = observer
         self.players = players
 
-
-async def send_action(session: Session, action):
-    match action:
-        case MoveAction(vehicleId=vehicleId, target=target):
-            await session.move(ClientMoveAction(
-                vehicle_id=ClientVehicleId(vehicleId),
-                target=ClientHex(*target),
-            ))
-        case ShootAction(vehicleId=vehicleId, target=target):
-            await session.shoot(ClientShootAction(
-                vehicle_id=ClientVehicleId(vehicleId),
-                target=ClientHex(*target),
-            ))
-        case _:
-            raise RuntimeError(f"Unknown action type: {action}")
-
-
-async def create_sessions(stack: AsyncExitStack, game_name: str):
-    observer_session = Session(SERVER_ADDR, SERVER_PORT)
-    await stack.enter_async_context(observer_session)
+    @property
+    def state_session(self) -> Session:
+        '''
+        Session that fetches game state for everybody.
+        '''
+
+        if self.observer is not None:
+            return self.observer.session
+        return self.players[0].session
+
+
+async def send_actions(session: Session, actions):
+    requests = []
+    for action in actions:
+        match action:
+            case MoveAction() | ShootAction():
+                requests.append(action.to_request())
+            case _:
+                raise RuntimeError(f"Unknown action type: {action}")
+
+    # All actions are sent at once, responses are read afterwards
+    for action, resp in zip(actions, await session.pipeline(requests)):
+        # Rejected action costs the turn of one vehicle, not the game
+        if isinstance(resp, ErrorResponse):
+            logging.warning(f"Action {action} rejected: {resp.error_message}")
+
+
+async def create_sessions(stack: AsyncExitStack, game_name: str,
+                          metrics: SessionMetrics | None = None):
+    recorder = stack.enter_context(Recorder(record_file)) \
+        if record_file is not None else None
+    # Only one session fetches game states, laziness costs others nothing
+    manager = await stack.enter_async_context(
+        SessionManager(server_addr, server_port, lazy_state=True, metrics=metrics)
+    )
     global full
     global num_of_players
     global number_of_bots
-    observer_login = LoginAction("yagde-test-user-observer",
-                                 game=game_name,
-                                 num_players=num_of_players,
-                                 is_observer=True,
-                                 is_full=full)
-    observer_info = handle_response(
-        await observer_session.login(observer_login)
+
+    # All connections are opened at once
+    sessions = await manager.open(number_of_bots + int(use_observer))
+    sessions[0].recorder = recorder
+
+    player_logins = [
+        LoginAction(f"yagde-test-user-{i}", game=game_name, is_full=full)
+        for i in range(number_of_bots)
+    ]
+    # Whoever logs in first creates the game, so it goes before the rest
+    if use_observer:
+        first_login = LoginAction("yagde-test-user-observer",
+                                  game=game_name,
+                                  num_players=num_of_players,
+                                  is_observer=True,
+                                  is_full=full)
+    else:
+        first_login = player_logins.pop(0)._replace(num_players=num_of_players)
+    first = Client(
+        handle_response(await manager.login(sessions[0], first_login)),
+        sessions[0]
     )
-    observer = Client(observer_info, observer_session)
-
-    players = []
-    for i in range(number_of_bots):
-        player_session = Session(SERVER_ADDR, SERVER_PORT)
-        await stack.enter_async_context(player_session)
-        player_login = LoginAction(f"yagde-test-user-{i}", game=game_name, is_full=full)
-        player_info = handle_response(
-            await player_session.login(player_login)
-        )
-        players.append(Client(player_info, player_session))
 
-    return Sessions(observer, players)
+    player_infos = await manager.login_all(sessions[1:], player_logins)
+    players = [
+        Client(handle_response(info), session)
+        for info, session in zip(player_infos, sessions[1:])
+    ]
+
+    if use_observer:
+        return Sessions(first, players)
+    return Sessions(None, [first] + players)
 
 
-async def make_turns(sessions: Sessions, current_player_idx: ClientPlayerId, game: Game):
+async def make_turns(sessions: Sessions, current_player_idx: ClientPlayerId, game: Game, compute):
     observer = sessions.observer
 
     logging.info(f"Current player: {current_player_idx}")
 
     turn_tasks = []
     async with aio.TaskGroup() as turns:
-        # Make current player turn
+        # Make other players turns
         for player in sessions.players:
-            if player.info.idx != current_player_idx:
+            if player.info.idx == current_player_idx:
                 continue
 
-            engine = Engine(game, PlayerId(player.info.idx))
-
             logging.info(f"Bot turn: {player.info.idx}")
 
-            actions = engine.make_turn()
-            for action in actions:
-                await send_action(player.session, action)
-
             turn = turns.create_task(player.session.turn())
             turn_tasks.append(turn)
 
-        # Make other players turns
+        # Make observer turn
+        if observer is not None:
+            logging.info(f"Observer turn: {observer.info.idx}")
+
+            turn = turns.create_task(observer.session.turn())
+            turn_tasks.append(turn)
+
+        # Make current player turn, sessions above are
+        # serviced while engine is thinking
         for player in sessions.players:
-            if player.info.idx == current_player_idx:
+            if player.info.idx != current_player_idx:
                 continue
 
             logging.info(f"Bot turn: {player.info.idx}")
 
+            actions = await compute(game, PlayerId(player.info.idx))
+            await send_actions(player.session, actions)
+
             turn = turns.create_task(player.session.turn())
             turn_tasks.append(turn)
 
-        # Make observer turn
-        logging.info(f"Observer turn: {observer.info.idx}")
-
-        turn = turns.create_task(observer.session.turn())
-        turn_tasks.append(turn)
-
     for turn in turn_tasks:
         handle_response(turn.result())
 
 
+async def speculate_all(speculators, game: Game, current: PlayerId, compute, known):
+    '''
+    Speculate for every bot, the ones making turn sooner go first.
+    '''
+
+    players = game.players
+    start = players.index(current) if current in players else 0
+    for i in range(1, len(players) + 1):
+        speculator = speculators.get(players[(start + i) % len(players)])
+        if speculator is not None and speculator.player_id not in known:
+            await speculator.speculate(game, current, compute, known)
+
+
 async def play():
-    window_info = pygame.display.Info()
-    window = Window(window_info.current_w, window_info.current_h, WINDOW_NAME)
+    gui = Gui() if not headless else None
     game = Game()
     global number_of_rounds
     async with AsyncExitStack() as stack:
-        sessions = await create_sessions(stack, game_name)
-        observer = sessions.observer
-        
+        if bot_processes:
+            pool = stack.enter_context(EngineWorkers())
+        else:
+            pool = stack.enter_context(
+                EnginePool(engine_workers, engine_processes)
+            )
+        # Speculation has its own process, so that a computation still running
+        # after it is cancelled does not delay turns computed in the pool
+        speculation_pool = stack.enter_context(
+            EnginePool(1, use_processes=True)
+        ) if speculation else None
+        metrics = None
+        if metrics_interval is not None:
+            metrics = SessionMetrics()
+            await stack.enter_async_context(
+                MetricsReporter(metrics, metrics_interval)
+            )
+        sessions = await create_sessions(stack, game_name, metrics)
+        # Every state request of this process goes through one session
+        shared = SharedRequests(sessions.state_session)
+
+        speculators = {
+            PlayerId(player.info.idx): Speculator(PlayerId(player.info.idx))
+            for player in sessions.players
+        } if speculation else {}
+        speculation_task = None
+        # Actions computed by local bots this turn
+        known = {}
+
+        def speculate(current: PlayerId):
+            nonlocal speculation_task
+            speculation_task = aio.create_task(speculate_all(
+                speculators, game.copy(), current, speculation_pool.make_turn, dict(known)
+            ))
+
+        async def compute(game: Game, player_id: PlayerId):
+            # Validator copies the state before engine changes the game
+            validator = ActionValidator(game, player_id)
+            actions = speculators[player_id].take(game) if speculators else None
+            if actions is None:
+                actions = await pool.make_turn(game, player_id)
+            actions = validator.validate(actions)
+            known[player_id] = actions
+            if speculators:
+                # Own actions are known, others can plan while opponents play
+                speculate(player_id)
+            return actions
 
         map_response = handle_response(
-            await observer.session.map()
+            await shared.map()
         )
 
         game.init_map(map_response)
 
+        # Game is probably not full yet, so there is time to prepare for the first turn
+        start = perf_counter()
+        player_ids = [PlayerId(player.info.idx) for player in sessions.players]
+        await pool.warm_up(game, player_ids)
+        if speculation_pool is not None:
+            await speculation_pool.warm_up(game, player_ids)
+        logging.info(f"Warm-up took {perf_counter() - start:.3f} s")
+
         while True:
-            pygame.event.clear()
+            if gui is not None:
+                gui.clear_events()
             game_state = handle_response(
-                await observer.session.game_state()
+                await shared.game_state()
             )
+            await cancel(speculation_task)
             game.update_state(game_state)
 
             if game_state.finished and game_state.current_round == game_state.num_rounds:
                 break
 
-            await make_turns(sessions, game_state.current_player_idx, game)
+            current = PlayerId(game_state.current_player_idx)
+            known = {}
+            if speculators and current not in speculators:
+                speculate(current)
+            # Engine changes game it computes turn in
+            turn_start = game.copy() if speculators else None
+
+            await make_turns(sessions, game_state.current_player_idx, game, compute)
+            shared.next_turn()
+
+            # Actions are only needed to draw them and to predict opponents
+            if gui is None and not speculators:
+                continue
 
             # Get actions of this turn
             game_actions = handle_response(
-                await observer.session.game_actions()
+                await shared.game_actions()
             )
             game.update_actions(game_actions)
+            for speculator in speculators.values():
+                speculator.observe(turn_start, game.actions)
+
+            if gui is not None:
+                gui.draw(game)
+
+        await cancel(speculation_task)
+        for speculator in speculators.values():
+            logging.info(f"Speculation of player {speculator.player_id}: "
+                         f"{speculator.hits} hits, {speculator.misses} misses")
 
-            window.draw(game)
-            window.update()
-        
 
+        logging.info(f"State requests: {shared.sent} sent, {shared.collapsed} shared")
         logging.info(f"Winner: {game_state.winner}")
 
         w_name = ""
@@ -183,10 +344,17 @@ async def play():
             if game_state.winner == player.idx:
                 w_name = player.name
 
-        window.end(w_name)
+        if gui is not None:
+            gui.end(w_name)
 
 
-if __name__ == "__main__":
+def ask_settings():
+    '''
+    Ask game settings interactively.
+    '''
+
+    global number_of_bots, num_of_players, full, game_name, bot_processes
+
     sim_check = ""
     while sim_check.lower() != "y" and sim_check.lower() != "n":
         print("Do you want simulation?(Y/N) ", end="")
@@ -218,6 +386,76 @@ if __name__ == "__main__":
         game_name = input()
     else:
         number_of_bots = 3
- 
-    pygame.init()
+        bot_processes = True
+
+
+def parse_args():
+    '''
+    Set module settings from command line.
+    '''
+
+    global server_addr, server_port, game_name, num_of_players, full, number_of_bots
+    global engine_workers, engine_processes, bot_processes, record_file, metrics_interval, headless
+    global speculation, use_observer
+
+    parser = argparse.ArgumentParser(description="Play the game with AI bots")
+    parser.add_argument("-i", "--interactive", action="store_true",
+                        help="ask game settings instead of taking them from options, "
+                             "the default without options")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without GUI, pygame is not required")
+    parser.add_argument("--host", default=server_addr, help="server address")
+    parser.add_argument("--port", type=int, default=server_port, help="server port")
+    parser.add_argument("-g", "--game", default=game_name, help="game name")
+    parser.add_argument("-n", "--players", type=int, default=num_of_players,
+                        help="number of players in created game")
+    parser.add_argument("--full", action="store_true",
+                        help="game is full, no observers could join")
+    parser.add_argument("-b", "--bots", type=int, default=number_of_bots,
+                        help="number of bots playing")
+    parser.add_argument("-s", "--simulation", action="store_true",
+                        help="all players are bots, each computing in its own process")
+    parser.add_argument("--engine-workers", type=int, default=engine_workers,
+                        help="size of engine pool")
+    parser.add_argument("--engine-processes", action="store_true",
+                        help="engine pool uses processes instead of threads")
+    parser.add_argument("--record", default=record_file,
+                        help="record traffic of the session fetching game state to this file")
+    parser.add_argument("--metrics", type=float, default=metrics_interval,
+                        help="report session metrics every given number of seconds")
+    parser.add_argument("--no-observer", action="store_true",
+                        help="the first bot fetches game state for everybody, "
+                             "no separate observer connection")
+    parser.add_argument("--speculate", action="store_true",
+                        help="precompute turns of bots for predicted states while others play")
+    args = parser.parse_args()
+
+    server_addr = args.host
+    server_port = args.port
+    headless = args.headless
+    speculation = args.speculate
+    use_observer = not args.no_observer
+    record_file = args.record
+    metrics_interval = args.metrics
+    engine_workers = args.engine_workers
+    engine_processes = args.engine_processes
+
+    # Settings are asked as before when no options are given
+    if args.interactive or len(sys.argv) == 1:
+        ask_settings()
+        return
+
+    game_name = args.game
+    num_of_players = args.players
+    full = args.full
+    number_of_bots = args.bots
+    if args.simulation:
+        number_of_bots = num_of_players
+        bot_processes = True
+    if not use_observer and number_of_bots < 1:
+        parser.error("--no-observer needs at least one bot")
+
+
+if __name__ == "__main__":
+    parse_args()
     aio.run(play())
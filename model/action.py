@@ -2,6 +2,8 @@ from model.common import PlayerId
 from model.vehicle import VehicleId
 from model.hex import Hex
 from client.responses import GameActionsResponse, GameAction
+from client.actions import MoveAction as ClientMoveAction, ShootAction as ClientShootAction
+from client.common import Hex as ClientHex, VehicleId as ClientVehicleId
 
 
 class ChatAction:
@@ -19,6 +21,16 @@ class MoveAction:
         self.vehicleId = vehicleId
         self.target = target
 
+    def to_request(self) -> tuple[GameAction, ClientMoveAction]:
+        '''
+        Convert to action type and action for client Session
+        '''
+
+        return GameAction.MOVE, ClientMoveAction(
+            vehicle_id=ClientVehicleId(self.vehicleId),
+            target=ClientHex(*self.target),
+        )
+
     def __repr__(self) -> str:
         return f"MoveAction(playerId={self.playerId}, vehicleId={self.vehicleId}, target={self.target})"
 
@@ -29,6 +41,16 @@ class ShootAction:
         self.vehicleId = vehicleId
         self.target = target
 
+    def to_request(self) -> tuple[GameAction, ClientShootAction]:
+        '''
+        Convert to action type and action for client Session
+        '''
+
+        return GameAction.SHOOT, ClientShootAction(
+            vehicle_id=ClientVehicleId(self.vehicleId),
+            target=ClientHex(*self.target),
+        )
+
     def __repr__(self) -> str:
         return f"ShootAction(playerId={self.playerId}, vehicleId={self.vehicleId}, target={self.target})"
 
@@ -1,10 +1,15 @@
 from client.responses import MapResponse, GameStateResponse, GameActionsResponse
+from client.decoding import LazyGameStateResponse
 from model.vehicle import Vehicle, VehicleType
 from model.map import GameMap
 from model.common import PlayerId
 from model.action import TurnActions
-from ai.pathFinder import AStarPathfinding
-from model.hex import Hex
+from model.hex import Hex, hexes_at
+from model.precompute import UNREACHABLE
+
+from collections import deque
+from itertools import chain
+from typing import Dict, Set
 
 
 class Game:
@@ -22,6 +27,15 @@ class Game:
 
         self.map = GameMap.from_map_response(map_response)
 
+    def init_map_from_snapshot(self, snapshot: tuple):
+        '''
+        Initialize map from GameMap.snapshot result
+        
+        <param name="snapshot">Map snapshot</param>
+        '''
+
+        self.map = GameMap.from_snapshot(snapshot)
+
     def update_state(self, state_response: GameStateResponse):
         '''
         Update map and players from server GameStateResponse
@@ -29,12 +43,56 @@ class Game:
         <param name="state_response">GameStateResponse from server</param>
         '''
 
-        self.map.update_vehicles_from_state_response(state_response)
+        if isinstance(state_response, LazyGameStateResponse):
+            # Skip decoding into response vehicles
+            self.map.update_vehicles_from_json(state_response.json['vehicles'])
+        else:
+            self.map.update_vehicles_from_state_response(state_response)
         self.players = [PlayerId(player.idx)
                         for player in state_response.players]
         self.attack_matrix = {PlayerId(idx): [PlayerId(idx) for idx in matrix]
                               for idx, matrix in state_response.attack_matrix.items()}
 
+    def state_snapshot(self) -> tuple:
+        '''
+        Compact representation of current state, i.e. everything
+        that changes between turns, made of plain ints
+
+        <returns>Tuple that could be passed to Game.update_state_from_snapshot</returns>
+        '''
+
+        return (
+            tuple(self.players),
+            tuple((idx, tuple(matrix))
+                  for idx, matrix in self.attack_matrix.items()),
+            self.map.vehicles_snapshot(),
+        )
+
+    def update_state_from_snapshot(self, snapshot: tuple):
+        '''
+        Update map and players from Game.state_snapshot result
+
+        <param name="snapshot">State snapshot</param>
+        '''
+
+        players, attack_matrix, vehicles = snapshot
+        self.map.update_vehicles_from_snapshot(vehicles)
+        self.players = [PlayerId(idx) for idx in players]
+        self.attack_matrix = {PlayerId(idx): [PlayerId(p) for p in matrix]
+                              for idx, matrix in attack_matrix}
+
+    def copy(self) -> 'Game':
+        '''
+        Copy of the game, static part of the map is shared
+        
+        <returns>Game with copied state</returns>
+        '''
+
+        game = Game()
+        game.map = self.map.copy()
+        game.update_state_from_snapshot(self.state_snapshot())
+        return game
+
     def update_actions(self, actions: GameActionsResponse):
         '''
         Update actions from server GameActionsResponse
@@ -44,6 +102,24 @@ class Game:
 
         self.actions = TurnActions.from_actions_response(actions)
 
+    def attackable_players(self, player_id: PlayerId) -> Set[PlayerId]:
+        '''
+        Get players that player is allowed to attack this turn
+        
+        <param name="player_id">Attacking player</param>
+        <returns>Set of players that can be attacked</returns>
+        '''
+
+        was_attacked = set(chain.from_iterable(self.attack_matrix.values()))
+
+        return {
+            enemy_id for enemy_id in self.players
+            if enemy_id != player_id and (
+                enemy_id not in was_attacked or
+                player_id in self.attack_matrix.get(enemy_id, [])
+            )
+        }
+
     def check_neutrality(self, vehicle: Vehicle, enemy: Vehicle):
         '''
         Check if vehicle can attack enemy
@@ -63,15 +139,79 @@ class Game:
 
         return not was_attacked or attacked_player
     
-    def is_obstacle_between(self, my_vehicle: Vehicle, destination: Hex):
-        path = AStarPathfinding().path(my_vehicle.position,
-                                       destination,
-                                       self.map.get_obstacles_for(my_vehicle.playerId),
-                                       1)
-        if len(path) <= my_vehicle.speed + 1:
-            return False
-        return True
-    
+    def reachable(self, vehicle: Vehicle, goal: Hex) -> Dict[Hex, int]:
+        '''
+        Hexes vehicle can end its move on this turn. Vehicle moves up to its speed
+        steps and can pass through vehicles of its player, but not through
+        obstacles and enemies. Current position is included, it is where
+        vehicle ends if it does not move.
+        
+        <param name="vehicle">Vehicle to move.</param>
+        <param name="goal">Hex vehicle is heading to.</param>
+        <returns>Remaining distance to goal from every hex, hexes closer to vehicle go first</returns>
+        '''
+
+        tables = self.map.tables
+        vehicles = self.map.vehicles
+        start = tables.index.get(vehicle.position)
+        if start is None:
+            return {vehicle.position: vehicle.position.distance(goal)}
+
+        # Steps from vehicle to hexes it can pass through
+        steps = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            step = steps[current] + 1
+            if step > vehicle.speed:
+                continue
+            for neighbor in tables.neighbors[current]:
+                if neighbor in steps:
+                    continue
+                other = vehicles.get(tables.hexes[neighbor])
+                if other is not None and other.playerId != vehicle.playerId:
+                    continue
+                steps[neighbor] = step
+                queue.append(neighbor)
+
+        # Distances around obstacles, straight ones if goal can not be walked to
+        row = tables.row(tables.index[goal]) if goal in tables.index else None
+        result = {}
+        for i in steps:
+            hex = tables.hexes[i]
+            if i != start and hex in vehicles:
+                continue
+            dist = UNREACHABLE if row is None else row[i]
+            result[hex] = hex.distance(goal) if dist == UNREACHABLE else dist
+        return result
+
+    def fire_line(self, vehicle: Vehicle) -> Set[Hex]:
+        '''
+        Returns hexes on straight lines from vehicle that are not shadowed by obstacles.
+        
+        <param name="vehicle">Vehicle to cast lines from.</param>
+        '''
+
+        _, ru = vehicle.shooting_range
+        if vehicle.bonus:
+            ru += 1
+
+        tables = self.map.tables
+        if vehicle.position in tables.index:
+            return tables.fire_line(vehicle.position, ru)
+
+        obstacles = set(self.get_obstacles_for(vehicle.playerId))
+        result = set()
+        for direction in hexes_at(1):
+            current = vehicle.position
+            for _ in range(ru):
+                current = current + direction
+                if current in obstacles:
+                    break
+                result.add(current)
+
+        return result
+
     def on_line(self, vehicle: Vehicle, target: Hex):
         '''
         Returns if this hex is one one line with the other and if there is no obstacle between them.
@@ -79,11 +219,7 @@ class Game:
         <param name="other">Other hex.</param>
         '''
 
-        if vehicle.position.q == target.q or vehicle.position.r == target.r or vehicle.position.s == target.s:
-            # Other is aligned to the hex, let's check if there is obstacle between them
-            if not self.is_obstacle_between(vehicle, target):
-                return True
-        return False
+        return target in self.fire_line(vehicle)
     
     def in_shooting_range(self, vehicle: Vehicle, target: Hex) -> bool:
         dist = vehicle.position.distance(target)
@@ -1,4 +1,4 @@
-from typing import NamedTuple, List, Set
+from typing import Dict, NamedTuple, List, Set, Tuple
 from itertools import permutations
 
 from client.common import Hex as ResponseHex
@@ -56,14 +56,29 @@ class Hex(NamedTuple):
     def from_hex_response(hex: ResponseHex):
         return Hex(*hex)
 
+    @staticmethod
+    def from_json(j) -> 'Hex':
+        return Hex(int(j['x']), int(j['y']), int(j['z']))
+
+
+# Rings of hexes around the origin by distance, computed once
+_rings = {}  # type: Dict[int, Tuple[Hex, ...]]
 
-def hexes_at(dist: int = 0):
+
+def hexes_at(dist: int = 0) -> Tuple[Hex, ...]:
     '''
     Returns the hexes at the given distance from the origin.
     
     <param name="dist">Distance from the origin.</param>
     '''
 
+    ring = _rings.get(dist)
+    if ring is None:
+        ring = _rings[dist] = tuple(_ring(dist))
+    return ring
+
+
+def _ring(dist: int) -> Set[Hex]:
     indexes = {0, 1, 2}
     result = set()
     for i, j in permutations(indexes, 2):
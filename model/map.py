@@ -1,6 +1,14 @@
 from model.common import Content, PlayerId
 from model.vehicle import Vehicle, VehicleId, VehicleType
 from model.hex import Hex
+from model.precompute import MapTables, tables_for
+from model.zobrist import (
+    vehicles_hash,
+    position_key,
+    hp_key,
+    capture_points_key,
+    bonus_key
+)
 
 from typing import Dict, List
 from client.responses import MapResponse, GameStateResponse
@@ -11,6 +19,28 @@ class GameMap:
         self.size = size
         self.contents = contents
         self.vehicles = {}  # type: Dict[Hex, Vehicle]
+        self._tables = None  # type: MapTables | None
+        # Zobrist hash of vehicles, kept up to date by methods changing them
+        self.hash = 0
+
+    @property
+    def tables(self) -> MapTables:
+        '''
+        Precomputed tables of the map, shared by all maps with the same contents
+        '''
+
+        if self._tables is None:
+            self._tables = tables_for(self.size, self.contents)
+        return self._tables
+
+    def copy(self) -> 'GameMap':
+        '''
+        Copy of the map without vehicles, static part and tables are shared
+        '''
+
+        game_map = GameMap(self.size, self.contents)
+        game_map._tables = self._tables
+        return game_map
 
     @staticmethod
     def from_map_response(map_response: MapResponse):
@@ -39,6 +69,56 @@ class GameMap:
             Hex.from_hex_response(vehicle.position): Vehicle.from_vehicle_response(vid, vehicle)
             for vid, vehicle in state_response.vehicles.items()
         }
+        self.rehash()
+
+    def update_vehicles_from_json(self, vehicles_json: dict):
+        '''
+        Update vehicles straight from "vehicles" object of game state JSON
+        
+        <param name="vehicles_json">Parsed JSON of vehicles by id</param>
+        '''
+
+        vehicles = [Vehicle.from_json(vid, v) for vid, v in vehicles_json.items()]
+        self.vehicles = {vehicle.position: vehicle for vehicle in vehicles}
+        self.rehash()
+
+    def snapshot(self) -> tuple:
+        '''
+        Compact representation of static part of the map made of plain ints
+        
+        <returns>Tuple that could be passed to GameMap.from_snapshot</returns>
+        '''
+
+        return (self.size, tuple(
+            (*hex, content.value) for hex, content in self.contents.items()
+        ))
+
+    @staticmethod
+    def from_snapshot(snapshot: tuple) -> 'GameMap':
+        size, contents = snapshot
+        return GameMap(size, {
+            Hex(q, r, s): Content(content) for q, r, s, content in contents
+        })
+
+    def vehicles_snapshot(self) -> tuple:
+        '''
+        Compact representation of vehicles on the map
+        
+        <returns>Tuple that could be passed to GameMap.update_vehicles_from_snapshot</returns>
+        '''
+
+        return tuple(vehicle.snapshot() for vehicle in self.vehicles.values())
+
+    def update_vehicles_from_snapshot(self, snapshot: tuple):
+        '''
+        Update vehicles from GameMap.vehicles_snapshot result
+        
+        <param name="snapshot">Vehicles snapshot</param>
+        '''
+
+        vehicles = [Vehicle.from_snapshot(v) for v in snapshot]
+        self.vehicles = {vehicle.position: vehicle for vehicle in vehicles}
+        self.rehash()
 
     def get_spawn_points(self) -> List[Hex]:
         '''
@@ -63,6 +143,40 @@ class GameMap:
             return self.content[hex]
         return None
 
+    def move_vehicle(self, vehicle: Vehicle, target: Hex):
+        '''
+        Move vehicle on the map, rules are not checked
+        
+        <param name="vehicle">Vehicle on the map</param>
+        <param name="target">Free hex to move vehicle to</param>
+        '''
+
+        self.vehicles.pop(vehicle.position)
+        self.hash ^= position_key(vehicle.id, vehicle.position) ^ position_key(vehicle.id, target)
+        vehicle.position = target
+        self.vehicles[target] = vehicle
+
+    def set_hp(self, vehicle: Vehicle, hp: int):
+        self.hash ^= hp_key(vehicle.id, vehicle.hp) ^ hp_key(vehicle.id, hp)
+        vehicle.hp = hp
+
+    def set_capture_points(self, vehicle: Vehicle, capture_points: int):
+        self.hash ^= capture_points_key(vehicle.id, vehicle.capture_points) \
+            ^ capture_points_key(vehicle.id, capture_points)
+        vehicle.capture_points = capture_points
+
+    def set_bonus(self, vehicle: Vehicle, bonus: bool):
+        self.hash ^= bonus_key(vehicle.id, vehicle.bonus) ^ bonus_key(vehicle.id, bonus)
+        vehicle.bonus = bonus
+
+    def rehash(self):
+        '''
+        Compute hash of vehicles from scratch, call after vehicles
+        are changed other than by methods of the map
+        '''
+
+        self.hash = vehicles_hash(self.vehicles.values())
+
     def vehicle_by(self, id: VehicleId) -> Vehicle | None:
         '''
         Get vehicle by id
@@ -121,32 +235,20 @@ class GameMap:
         '''
 
         # Are enemy vehicles obstacles?
-        return [hex for hex, content in self.contents.items()
-                if content == Content.OBSTACLE]
+        return list(self.tables.by_content[Content.OBSTACLE])
     
     def get_base_nodes(self, exclude: List[Hex]) -> List[Hex]:
-        res = []
-        for node, cont in self.contents.items():
-            if cont == Content.BASE and node not in exclude:
-                res.append(node)
-        return res
+        return [node for node in self.tables.by_content[Content.BASE]
+                if node not in exclude]
     
     def get_light_repairs(self) -> List[Hex]:
-        res = []
-        for node, cont in self.contents.items():
-            if cont == Content.LIGHT_REPAIR:
-                res.append(node)
-        return res
+        return list(self.tables.by_content[Content.LIGHT_REPAIR])
     
     def get_heavy_repairs(self) -> List[Hex]:
-        res = []
-        for node, cont in self.contents.items():
-            if cont == Content.HARD_REPAIR:
-                res.append(node)
-        return res
+        return list(self.tables.by_content[Content.HARD_REPAIR])
     
     def get_closest_catapult(self, position: Hex) -> Hex:
-        return min([node for node, cont in self.contents.items() if cont == Content.CATAPULT], key=position.distance)
+        return min(self.tables.by_content[Content.CATAPULT], key=position.distance)
 
     def __repr__(self):
         return f"GameMap(size={self.size}, content={self.contents}, vehicles={self.vehicles})"
\ No newline at end of file
@@ -0,0 +1,368 @@
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+
+from array import array
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from model.hex import Hex, hexes_at, hexes_range
+from model.common import Content
+from model.vehicle import VEHICLE_SHOOTING_RANGE
+
+
+# Longest straight line any vehicle can shoot along, range bonus included
+MAX_LINE = max(ru for _, ru in VEHICLE_SHOOTING_RANGE.values()) + 1
+# Distance between hexes that are not connected
+UNREACHABLE = -1
+# Contents that have a field of distances to the closest hex with them
+FIELD_CONTENTS = (Content.BASE, Content.LIGHT_REPAIR, Content.HARD_REPAIR, Content.CATAPULT)
+
+# Directory of cached tables shared by processes of the host, empty to disable
+CACHE_DIR = os.environ.get("YAGDE_TABLES_CACHE",
+                           os.path.join(tempfile.gettempdir(), "yagde-tables"))
+
+# Cache file is a header followed by arrays in native byte order:
+# hexes (n x 3 shorts), distances (n x n shorts), fields (FIELD_CONTENTS x n shorts)
+# and lengths of lines (n x 6 bytes)
+MAGIC = b"YAGDEMAP"
+VERSION = 1
+# Magic, version, map size, number of hexes, number of directions, MAX_LINE
+FILE_HEADER = struct.Struct("<8sIIIII")
+
+MapKey = Hashable
+
+
+def map_key(size: int, contents: Dict[Hex, Content]) -> MapKey:
+    return size, frozenset(contents.items())
+
+
+def map_hash(size: int, contents: Dict[Hex, Content]) -> str:
+    '''
+    Hash of the static part of the map, same for equal maps in any process.
+    '''
+
+    h = hashlib.sha1(str(size).encode())
+    for q, r, s, content in sorted((*hex, content.value) for hex, content in contents.items()):
+        h.update(struct.pack("<hhhB", q, r, s, content))
+    return h.hexdigest()
+
+
+class MapTables:
+    '''
+    Everything that depends only on the static part of the map,
+    computed once per map and shared by every game on it.
+    '''
+
+    def __init__(self, size: int, contents: Dict[Hex, Content],
+                 data: Optional[memoryview] = None):
+        '''
+        <param name="size">Size of the map.</param>
+        <param name="contents">Contents of the map hexes.</param>
+        <param name="data">Contents of a file written by save, tables are computed if None.</param>
+        '''
+
+        self.size = size
+        self.contents = contents
+        # Hexes of the map and their indexes in tables
+        self.hexes = tuple(hexes_range(size + 1))
+        self.index = {hex: i for i, hex in enumerate(self.hexes)}
+
+        # Hexes of every content in order of contents, as GameMap getters return them
+        self.by_content = {content: [] for content in Content}  # type: Dict[Content, List[Hex]]
+        for hex, content in contents.items():
+            self.by_content[content].append(hex)
+        self.obstacles = frozenset(self.by_content[Content.OBSTACLE])
+
+        # Indexes of neighbors of every hex vehicles can move to
+        self.neighbors = tuple(
+            tuple(
+                self.index[neighbor] for neighbor in hex.neighbors()
+                if neighbor in self.index and neighbor not in self.obstacles
+            )
+            for hex in self.hexes
+        )  # type: Tuple[Tuple[int, ...], ...]
+
+        # Straight lines from hexes in hexes_at(1) order cut by obstacles, filled on demand
+        self.lines = {}  # type: Dict[Hex, Tuple[Tuple[Hex, ...], ...]]
+        # Lengths of lines of every hex, known in advance when loaded from file
+        self.line_lengths = None  # type: Sequence[int] | None
+
+        # Indexes of hexes at exact distance from source, by source and distance
+        self.circles = {}  # type: Dict[Tuple[int, int], Tuple[int, ...]]
+
+        if data is not None:
+            self.__load(data)
+            return
+
+        # Distances from every hex to the closest hex with content
+        self.fields = {
+            content: self.__bfs(self.index[hex] for hex in self.by_content[content]
+                                if hex in self.index)
+            for content in FIELD_CONTENTS
+        }  # type: Dict[Content, Sequence[int]]
+
+        # Distances between hexes walking around obstacles, row of every
+        # source hex is computed on first use. Rows are assigned when complete,
+        # so threads sharing tables at worst compute a row twice
+        self.rows = [None] * len(self.hexes)  # type: List[Optional[Sequence[int]]]
+
+    def __reduce__(self):
+        # Tables loaded from file are views of memory map, which can not be
+        # pickled, so the receiving process gets tables of the map on its own
+        return tables_for, (self.size, self.contents)
+
+    def __line(self, hex: Hex, direction: Hex, length: int = MAX_LINE) -> Tuple[Hex, ...]:
+        line = []
+        current = hex
+        for _ in range(length):
+            current = current + direction
+            if current in self.obstacles:
+                break
+            line.append(current)
+        return tuple(line)
+
+    def lines_of(self, hex: Hex) -> Tuple[Tuple[Hex, ...], ...]:
+        '''
+        Straight lines from hex of the map in hexes_at(1) order, cut by obstacles.
+        '''
+
+        lines = self.lines.get(hex)
+        if lines is None:
+            directions = hexes_at(1)
+            if self.line_lengths is None:
+                lengths = [MAX_LINE] * len(directions)
+            else:
+                start = self.index[hex] * len(directions)
+                lengths = self.line_lengths[start:start + len(directions)]
+            lines = self.lines[hex] = tuple(
+                self.__line(hex, direction, length)
+                for direction, length in zip(directions, lengths)
+            )
+        return lines
+
+    def __bfs(self, sources: Iterable[int]) -> array:
+        neighbors = self.neighbors
+        row = array('h', [UNREACHABLE]) * len(self.hexes)
+
+        queue = deque()
+        for source in sources:
+            row[source] = 0
+            queue.append(source)
+
+        while queue:
+            current = queue.popleft()
+            dist = row[current] + 1
+            for neighbor in neighbors[current]:
+                if row[neighbor] == UNREACHABLE:
+                    row[neighbor] = dist
+                    queue.append(neighbor)
+
+        return row
+
+    def fire_line(self, hex: Hex, ru: int) -> Set[Hex]:
+        '''
+        Hexes on straight lines from hex up to given distance not shadowed by obstacles.
+
+        <param name="hex">Hex of the map to cast lines from.</param>
+        <param name="ru">Length of lines, at most MAX_LINE.</param>
+        '''
+
+        result = set()
+        for line in self.lines_of(hex):
+            result.update(line[:ru])
+        return result
+
+    def row(self, source: int) -> Sequence[int]:
+        '''
+        Distances from hex with given index to every hex, computed by BFS on first use.
+        '''
+
+        row = self.rows[source]
+        if row is None:
+            row = self.rows[source] = self.__bfs([source])
+        return row
+
+    def circle(self, source: int, dist: int) -> Tuple[int, ...]:
+        '''
+        Indexes of hexes exactly dist steps away from hex with given index,
+        walking around obstacles. Computed from the distance row on first use.
+        '''
+
+        key = source, dist
+        circle = self.circles.get(key)
+        if circle is None:
+            row = self.row(source)
+            circle = self.circles[key] = tuple(i for i, d in enumerate(row) if d == dist)
+        return circle
+
+    def distance(self, start: Hex, end: Hex) -> int:
+        '''
+        Length of the shortest path between hexes avoiding obstacles.
+
+        <param name="start">Hex of the map.</param>
+        <param name="end">Hex of the map.</param>
+        <returns>Number of steps or UNREACHABLE</returns>
+        '''
+
+        return self.row(self.index[start])[self.index[end]]
+
+    def field_distance(self, content: Content, hex: Hex) -> int:
+        '''
+        Length of the shortest path from hex to the closest hex with content.
+
+        <param name="content">One of FIELD_CONTENTS.</param>
+        <param name="hex">Hex of the map.</param>
+        <returns>Number of steps or UNREACHABLE</returns>
+        '''
+
+        return self.fields[content][self.index[hex]]
+
+    def fill(self):
+        '''
+        Compute lines and distances of all hexes at once.
+        '''
+
+        for source, hex in enumerate(self.hexes):
+            self.lines_of(hex)
+            self.row(source)
+
+    # Cache file
+
+    def save(self, path: str):
+        '''
+        Write tables to a file, which is replaced atomically.
+        '''
+
+        self.fill()
+
+        directions = hexes_at(1)
+        header = FILE_HEADER.pack(MAGIC, VERSION, self.size, len(self.hexes),
+                                  len(directions), MAX_LINE)
+
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(header)
+                f.write(array('h', (c for hex in self.hexes for c in hex)).tobytes())
+                for row in self.rows:
+                    f.write(bytes(row))
+                for content in FIELD_CONTENTS:
+                    f.write(bytes(self.fields[content]))
+                f.write(array('b', (
+                    len(line) for hex in self.hexes for line in self.lines_of(hex)
+                )).tobytes())
+            os.replace(tmp, path)
+        finally:
+            # Left only if writing failed
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def __load(self, data: memoryview):
+        n = len(self.hexes)
+        directions = hexes_at(1)
+
+        header = FILE_HEADER.unpack_from(data)
+        if header != (MAGIC, VERSION, self.size, n, len(directions), MAX_LINE):
+            raise ValueError("File does not match the map")
+
+        views = []
+        offset = FILE_HEADER.size
+        for fmt, length in (('h', 3 * n), ('h', n * n),
+                            ('h', len(FIELD_CONTENTS) * n), ('b', len(directions) * n)):
+            end = offset + length * struct.calcsize(fmt)
+            views.append(data[offset:end].cast(fmt))
+            offset = end
+        if offset != len(data):
+            raise ValueError("File has wrong size")
+        hexes, distances, fields, lengths = views
+
+        if tuple(hexes) != tuple(c for hex in self.hexes for c in hex):
+            raise ValueError("File has different order of hexes")
+
+        # Rows and fields are views into the file, nothing is copied
+        self.rows = [distances[i * n:(i + 1) * n] for i in range(n)]
+        self.fields = {
+            content: fields[i * n:(i + 1) * n] for i, content in enumerate(FIELD_CONTENTS)
+        }
+        self.line_lengths = lengths
+
+    @staticmethod
+    def load(path: str, size: int, contents: Dict[Hex, Content]) -> 'MapTables':
+        '''
+        Tables from file written by save. File is memory mapped,
+        so processes loading the same file share its pages.
+        '''
+
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return MapTables(size, contents, memoryview(data))
+
+
+# Tables of maps seen by the process
+_tables = {}  # type: Dict[MapKey, MapTables]
+
+
+def cached_tables(size: int, contents: Dict[Hex, Content], cache_dir: str) -> MapTables:
+    '''
+    Load tables from cache directory, missing or broken file is rebuilt.
+
+    <param name="size">Size of the map.</param>
+    <param name="contents">Contents of the map hexes.</param>
+    <param name="cache_dir">Directory of cache files.</param>
+    '''
+
+    path = os.path.join(cache_dir, f"{map_hash(size, contents)}.tables")
+    try:
+        return MapTables.load(path, size, contents)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logging.warning(f"Broken map tables {path}: {e!r}")
+
+    tables = MapTables(size, contents)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tables.save(path)
+    except OSError as e:
+        logging.warning(f"Could not cache map tables to {path}: {e!r}")
+    return tables
+
+
+def tables_for(size: int, contents: Dict[Hex, Content]) -> MapTables:
+    '''
+    Get tables of the map, they are loaded from CACHE_DIR
+    or built on first request.
+
+    <param name="size">Size of the map.</param>
+    <param name="contents">Contents of the map hexes.</param>
+    '''
+
+    key = map_key(size, contents)
+    tables = _tables.get(key)
+    if tables is None:
+        # Files are in native byte order, header is not
+        if CACHE_DIR and sys.byteorder == "little":
+            tables = cached_tables(size, contents, CACHE_DIR)
+        else:
+            tables = MapTables(size, contents)
+        _tables[key] = tables
+    return tables
+
+
+def warm_up(size: int, contents: Dict[Hex, Content]):
+    '''
+    Build all tables of the map, so that the first turn
+    costs no more than later ones. Nothing is returned,
+    so it could be run in a worker process.
+
+    <param name="size">Size of the map.</param>
+    <param name="contents">Contents of the map hexes.</param>
+    '''
+
+    tables_for(size, contents).fill()
@@ -1,12 +1,12 @@
 from typing import NewType, List
 from enum import Enum
 
-from ai.pathFinder import AStarPathfinding
 from model.hex import Hex
 from model.common import PlayerId
 from client.responses import Vehicle as ResponseVehicle
 from client.common import VehicleId as ResponseVehicleId
 from client.responses import VehicleType as ResponseVehicleType
+from client.common import enum_table
 
 
 VehicleId = NewType('VehicleId', int)
@@ -36,6 +36,9 @@ class VehicleType(Enum):
                 raise ValueError(f"Unknown vehicle type response: {response}")
 
 
+# Vehicle types by their names in server JSON
+VEHICLE_TYPES = enum_table(VehicleType)
+
 VEHICLE_MAX_HP = {
     VehicleType.LIGHT_TANK: 1,
     VehicleType.MEDIUM_TANK: 2,
@@ -99,6 +102,51 @@ class Vehicle:
             cap_points=vehicle.capture_points
         )
 
+    @staticmethod
+    def from_json(vid: str | int, j) -> 'Vehicle':
+        '''
+        Create Vehicle straight from server JSON, without
+        intermediate client.responses.Vehicle
+
+        <param name="vid">Vehicle id, key of the vehicles object</param>
+        <param name="j">Parsed JSON of the vehicle</param>
+        '''
+
+        return Vehicle(
+            id=VehicleId(int(vid)),
+            playerId=PlayerId(int(j['player_id'])),
+            vehicle_type=VEHICLE_TYPES[j['vehicle_type']],
+            spawn=Hex.from_json(j['spawn_position']),
+            hp=int(j['health']),
+            position=Hex.from_json(j['position']),
+            bonus=j.get('shoot_range_bonus') == 1,
+            cap_points=int(j['capture_points'])
+        )
+
+    def snapshot(self) -> tuple:
+        '''
+        Compact representation of vehicle made of plain ints
+        
+        <returns>Tuple that could be passed to Vehicle.from_snapshot</returns>
+        '''
+
+        return (self.id, self.playerId, self.type.value, self.hp,
+                *self.position, *self.spawn, self.bonus, self.capture_points)
+
+    @staticmethod
+    def from_snapshot(snapshot: tuple) -> 'Vehicle':
+        vid, pid, vtype, hp, q, r, s, sq, sr, ss, bonus, cap_points = snapshot
+        return Vehicle(
+            id=VehicleId(vid),
+            playerId=PlayerId(pid),
+            vehicle_type=VehicleType(vtype),
+            spawn=Hex(sq, sr, ss),
+            hp=hp,
+            position=Hex(q, r, s),
+            bonus=bonus,
+            cap_points=cap_points
+        )
+
     def pick_move(self, path):
         '''
         Pick move target from path
@@ -0,0 +1,69 @@
+import struct
+import hashlib
+
+from functools import reduce
+from operator import xor
+from typing import Dict, Iterable, Tuple
+
+from model.hex import Hex
+from model.vehicle import Vehicle, VehicleId
+
+
+# Kinds of vehicle features that have keys
+POSITION = 0
+HP = 1
+CAPTURE_POINTS = 2
+BONUS = 3
+
+# Keys of features seen by the process
+_keys = {}  # type: Dict[Tuple[int, ...], int]
+
+
+def _key(*values: int) -> int:
+    '''
+    Random 128 bit key of a feature. Keys are derived from values,
+    so they are the same in every process and need no table sized in advance.
+    Hashes are used as exact state keys, the second 64 bits only make
+    a collision of different states practically impossible.
+    '''
+
+    key = _keys.get(values)
+    if key is None:
+        digest = hashlib.blake2b(struct.pack(f"<{len(values)}i", *values), digest_size=16).digest()
+        key = _keys[values] = int.from_bytes(digest, "little")
+    return key
+
+
+def position_key(vid: VehicleId, position: Hex) -> int:
+    return _key(POSITION, vid, *position)
+
+
+def hp_key(vid: VehicleId, hp: int) -> int:
+    return _key(HP, vid, hp)
+
+
+def capture_points_key(vid: VehicleId, capture_points: int) -> int:
+    return _key(CAPTURE_POINTS, vid, capture_points)
+
+
+def bonus_key(vid: VehicleId, bonus: bool) -> int:
+    return _key(BONUS, vid) if bonus else 0
+
+
+def vehicle_hash(vehicle: Vehicle) -> int:
+    '''
+    Zobrist hash of position, hp, capture points and bonus of the vehicle.
+    '''
+
+    vid = vehicle.id
+    return position_key(vid, vehicle.position) ^ hp_key(vid, vehicle.hp) \
+        ^ capture_points_key(vid, vehicle.capture_points) ^ bonus_key(vid, vehicle.bonus)
+
+
+def vehicles_hash(vehicles: Iterable[Vehicle]) -> int:
+    '''
+    Zobrist hash of vehicles, independent of their order. A change of one
+    feature is applied by xor with keys of its old and new values.
+    '''
+
+    return reduce(xor, map(vehicle_hash, vehicles), 0)
@@ -1,29 +1,22 @@
-from ai.pathFinder import AStarPathfinding
 from model.hex import Hex
 from model.game import Game
 from model.vehicle import Vehicle, VehicleType
-from model.common import PlayerId
+from model.common import Content, PlayerId
+from model.precompute import UNREACHABLE
 from model.action import ShootAction, MoveAction
+from player.shot_planner import ShotPlanner
+from player.params import EngineParams, DEFAULT_PARAMS
 
-from typing import List
-
-
-VEHICLE_TURN_ORDER = [
-    VehicleType.SPG,
-    VehicleType.LIGHT_TANK,
-    VehicleType.HEAVY_TANK,
-    VehicleType.MEDIUM_TANK,
-    VehicleType.AT_SPG
-]
+from typing import Callable, List
 
 
 class Engine():
 
-    def __init__(self, game: Game, player_id: PlayerId):
+    def __init__(self, game: Game, player_id: PlayerId, params: EngineParams = DEFAULT_PARAMS):
         self.game = game
         self.player_id = player_id
+        self.params = params
         self.actions = []
-        self.path_finder = AStarPathfinding(game.map.size)
 
     def __shoot(self, vehicle: Vehicle, enemy: Vehicle):
         target = None
@@ -42,160 +35,88 @@ class Engine():
             MoveAction(self.player_id, vehicle.id, target)
         )
 
-    def __shoot_with_vehicle(self, vehicle: Vehicle) -> bool:
-        target = None
-        top_prio = 0
-
-        base_nodes = self.game.map.get_base_nodes([])
-
-        for enemy in self.game.get_enemy_vehicles_for(self.player_id):
-            can_attack = self.game.check_neutrality(vehicle, enemy)
-            in_range = self.game.in_shooting_range(
-                vehicle,
-                enemy.position
-            )
-
-            if not can_attack or not in_range:
-                continue
-            
-            if vehicle.position not in base_nodes and enemy.position not in base_nodes:
-                continue
+    def __walking_distance(self, vehicle: Vehicle) -> Callable[[Hex], int]:
+        '''
+        Distance from vehicle to hexes walking around obstacles, unreachable ones are the farthest.
+        '''
 
-            prio = 0
+        tables = self.game.map.tables
+        row = tables.row(tables.index[vehicle.position])
 
-            # Add cap points to prio
-            prio += enemy.capture_points
+        def distance(hex: Hex) -> int:
+            dist = row[tables.index[hex]]
+            return len(row) if dist == UNREACHABLE else dist
 
-            # If enemy is low hp add 3 points
-            if enemy.hp <= vehicle.damage:
-                prio += 3
-
-            if target is None or prio >= top_prio:
-                target = enemy
-                top_prio = prio
-
-        if target is not None:
-            self.__shoot(vehicle, target)
-            return True
-
-        return False
+        return distance
 
     def __decide_target(self, vehicle: Vehicle, exclude: List[Hex]) -> Hex:
         target = Hex(0, 0, 0)
         base_nodes = self.game.map.get_base_nodes(exclude)
+        distance = self.__walking_distance(vehicle)
 
         # We should find closest base target that is reachable
-        if base_nodes is not None:
-            if len(base_nodes) == 0:
-                return target
-            minDist = base_nodes[0].distance(vehicle.position)
-            target = base_nodes[0]
-
-            for node in base_nodes:
-                dist = node.distance(vehicle.position)
-                if dist < minDist:
-                    target = node
-                    minDist = dist
+        if base_nodes:
+            target = min(base_nodes, key=distance)
 
-        if vehicle.position not in base_nodes and vehicle.hp <= 1:
+        if vehicle.position not in base_nodes and vehicle.hp <= self.params.repair_threshold:
             # Then we should make target closest repair only if it is closer than base
-
-            # So now let's find closest repair
             if vehicle.type == VehicleType.MEDIUM_TANK:
-                repairs = self.game.map.get_light_repairs()
+                repair = Content.LIGHT_REPAIR
             elif vehicle.type == VehicleType.HEAVY_TANK or vehicle.type == VehicleType.AT_SPG:
-                repairs = self.game.map.get_heavy_repairs()
+                repair = Content.HARD_REPAIR
             else:
                 return target
 
-            if repairs is None:
-                return target
-            
-            temp = repairs[0]
-            minDist = vehicle.position.distance(temp)
-            for node in repairs:
-                dist = node.distance(vehicle.position)
-                if dist < minDist:
-                    temp = node
-                    minDist = dist
-            
-            # Now we should see if repair is closer than closest base node
-            if temp.distance(vehicle.position) <= target.distance(vehicle.position):
-                return temp
-        
+            # Distance to the closest repair is precomputed for every hex
+            tables = self.game.map.tables
+            repair_distance = tables.field_distance(repair, vehicle.position)
+            if repair_distance != UNREACHABLE and repair_distance <= distance(target):
+                return min(tables.by_content[repair], key=distance)
+
         if vehicle.position in base_nodes:
             # If you are already in base go to the closest next base node if it's safe
-            minDist = None
-
-            for node in base_nodes:
-                if node == vehicle.position:
-                    continue
-
-                dist = node.distance(vehicle.position)
-                if minDist is None or dist < minDist:
-                    target = node
-                    minDist = dist
+            others = [node for node in base_nodes if node != vehicle.position]
+            if others:
+                target = min(others, key=distance)
 
         return target
 
     def __move_vehicle(self, vehicle: Vehicle):
-        obstacles = self.game.get_obstacles_for(self.player_id)
-        target = Hex(0, 0, 0)
-        move = None
-
-        # We should get all other vehicles except this one
-        other_vehicles = []
-        for node, veh in self.game.map.vehicles.items():
-            if veh.id == vehicle.id:
-                continue
-            other_vehicles.append(node)
-
-        exclude = []
-        for obst in obstacles:
-            exclude.append(obst)
-        for veh in other_vehicles:
-            exclude.append(veh)
-
-        while True:
-            target = self.__decide_target(vehicle, exclude)
-
-            path = self.path_finder.path(
-                vehicle.position,
-                target,
-                exclude,
-                vehicle.speed
-            )
-
-            if len(path) <= 1:
-                return
-            
-            move = path[1]
-            
-            if move.distance(target) > vehicle.position.distance(target):
-                return
-
-            if not self.game.is_obstacle_between(vehicle, move):
-                break
-
-            exclude.append(move)
-        
-        self.game.map.vehicles[move] = vehicle
-        self.game.map.vehicles.pop(vehicle.position)
-        
+        # Base nodes taken by other vehicles are not targets
+        exclude = list(self.game.get_obstacles_for(self.player_id))
+        exclude.extend(node for node, veh in self.game.map.vehicles.items()
+                       if veh.id != vehicle.id)
+
+        target = self.__decide_target(vehicle, exclude)
+        reachable = self.game.reachable(vehicle, target)
+
+        # Closest to target, with fewest steps among equally close ones
+        move = min(reachable, key=reachable.get)
+        if reachable[move] >= reachable[vehicle.position]:
+            return
+
+        self.game.map.move_vehicle(vehicle, move)
         self.__move(vehicle, move)
-            
-    def __vehicle_action(self, vehicle):
-        shooted = self.__shoot_with_vehicle(vehicle)
 
-        if shooted == False:
+    def __vehicle_action(self, vehicle, shots):
+        if vehicle.id in shots:
+            self.__shoot(vehicle, shots[vehicle.id])
+        else:
             self.__move_vehicle(vehicle)
 
     def make_turn(self):
         vehicles = self.game.get_vehicles_for(self.player_id)
+        ordered = [
+            vehicle
+            for vehicle_type in self.params.turn_order
+            for vehicle in vehicles.get(vehicle_type, [])
+        ]
+
+        # Shots are planned for all vehicles at once before anyone moves
+        shots = ShotPlanner(self.game, self.player_id, self.params).plan(ordered)
 
-        for vehicle_type in VEHICLE_TURN_ORDER:
-            for vehicle in vehicles[vehicle_type]:
-                self.__vehicle_action(vehicle)
+        for vehicle in ordered:
+            self.__vehicle_action(vehicle, shots)
 
         result = self.actions
         self.actions = []
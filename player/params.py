@@ -0,0 +1,46 @@
+from typing import NamedTuple, Tuple
+
+from model.vehicle import VehicleType
+
+
+class EngineParams(NamedTuple):
+    '''
+    Tunable constants of engine heuristics.
+    '''
+
+    # Order in which vehicles act during a turn
+    turn_order: Tuple[VehicleType, ...] = (
+        VehicleType.SPG,
+        VehicleType.LIGHT_TANK,
+        VehicleType.HEAVY_TANK,
+        VehicleType.MEDIUM_TANK,
+        VehicleType.AT_SPG,
+    )
+    # Shot priority bonus for an enemy that would be destroyed by the shot
+    low_hp_bonus: int = 3
+    # Shot priority per capture point of enemy
+    capture_weight: int = 1
+    # Vehicle with at most this hp goes to repair if it is closer than base
+    repair_threshold: int = 1
+
+    def to_json(self) -> dict:
+        return {
+            "turn_order": [t.name.lower() for t in self.turn_order],
+            "low_hp_bonus": self.low_hp_bonus,
+            "capture_weight": self.capture_weight,
+            "repair_threshold": self.repair_threshold,
+        }
+
+    @staticmethod
+    def from_json(j) -> 'EngineParams':
+        default = EngineParams()
+        return EngineParams(
+            turn_order=tuple(VehicleType[t.upper()] for t in j["turn_order"])
+            if "turn_order" in j else default.turn_order,
+            low_hp_bonus=int(j.get("low_hp_bonus", default.low_hp_bonus)),
+            capture_weight=int(j.get("capture_weight", default.capture_weight)),
+            repair_threshold=int(j.get("repair_threshold", default.repair_threshold)),
+        )
+
+
+DEFAULT_PARAMS = EngineParams()
@@ -0,0 +1,115 @@
+import asyncio as aio
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+from model.game import Game
+from model.common import PlayerId
+from model.action import MoveAction, ShootAction
+from model.precompute import warm_up
+from player.engine import Engine
+
+from typing import List
+
+
+def compute_turn(game: Game, player_id: PlayerId) -> List[MoveAction | ShootAction]:
+    '''
+    Compute actions of player for current game state.
+    Module level so it could be sent to a worker process.
+
+    <param name="game">Game to compute turn in</param>
+    <param name="player_id">Player to compute turn for</param>
+    <returns>List of actions</returns>
+    '''
+
+    return Engine(game, player_id).make_turn()
+
+
+def _ready():
+    '''
+    Job that waits for a worker process to start.
+    '''
+
+
+class EnginePool:
+    '''
+    Runs engine computations in an executor, off the event loop.
+    '''
+
+    def __init__(self, max_workers: int = 1, use_processes: bool = False):
+        '''
+        <param name="max_workers">Size of the pool.</param>
+        <param name="use_processes">Use worker processes instead of threads.</param>
+        Note: with processes game is pickled on every turn and changes
+        engine makes to it are not visible to the caller
+        '''
+
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.executor = None  # type: Executor | None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.shutdown()
+
+    def start(self):
+        if self.executor is not None:
+            raise RuntimeError("Already started")
+
+        if self.use_processes:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                               thread_name_prefix="engine")
+
+    def shutdown(self):
+        if self.executor is None:
+            raise RuntimeError("Not started")
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = None
+
+    def make_turn(self, game: Game, player_id: PlayerId) -> aio.Future:
+        '''
+        Schedule turn computation in the pool.
+
+        <param name="game">Game to compute turn in</param>
+        <param name="player_id">Player to compute turn for</param>
+        <returns>Awaitable resolving to list of actions</returns>
+        '''
+
+        if self.executor is None:
+            raise RuntimeError("Not started")
+
+        loop = aio.get_running_loop()
+        return loop.run_in_executor(self.executor, compute_turn, game, player_id)
+
+    async def warm_up(self, game: Game, player_ids: List[PlayerId]):
+        '''
+        Build map tables where turns are computed, before the first turn.
+        Threads share one copy. Process pool is restarted with an initializer
+        building tables, so every worker process builds its own copy when it
+        starts, even one that would only be spawned later.
+
+        <param name="game">Game with initialized map</param>
+        <param name="player_ids">Players turns will be computed for, unused by the pool</param>
+        '''
+
+        if self.executor is None:
+            raise RuntimeError("Not started")
+
+        loop = aio.get_running_loop()
+        if not self.use_processes:
+            await loop.run_in_executor(self.executor, warm_up, game.map.size, game.map.contents)
+            return
+
+        self.executor.shutdown(wait=True)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=warm_up,
+            initargs=(game.map.size, game.map.contents)
+        )
+        await aio.gather(*(
+            loop.run_in_executor(self.executor, _ready) for _ in range(self.max_workers)
+        ))
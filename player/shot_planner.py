@@ -0,0 +1,116 @@
+from model.game import Game
+from model.vehicle import Vehicle, VehicleType, VehicleId
+from model.common import PlayerId
+from player.params import EngineParams, DEFAULT_PARAMS
+
+from typing import Dict, List
+
+
+class ShotPlanner:
+    '''
+    Plans shots of all player vehicles at once.
+
+    Every (own vehicle, enemy) pair is scored in a single pass over
+    precomputed tables, then shots are assigned greedily while tracking
+    damage already dealt, so no shot is wasted on an enemy that is
+    going to be destroyed anyway.
+    '''
+
+    def __init__(self, game: Game, player_id: PlayerId, params: EngineParams = DEFAULT_PARAMS):
+        '''
+        <param name="game">Game to plan shots in.</param>
+        <param name="player_id">Player to plan shots for.</param>
+        <param name="params">Priorities of targets.</param>
+        '''
+
+        self.game = game
+        self.player_id = player_id
+        self.params = params
+        # Enemies and their hp left after planned shots, set up by plan
+        self.enemies = []  # type: List[Vehicle]
+        self.hp_left = []  # type: List[int]
+
+    def __in_range(self, vehicle: Vehicle) -> List[bool]:
+        '''
+        Returns for each enemy whether it is in shooting range of vehicle.
+
+        <param name="vehicle">Shooting vehicle.</param>
+        '''
+
+        rl, ru = vehicle.shooting_range
+        if vehicle.bonus:
+            ru += 1
+
+        position = vehicle.position
+        in_range = [
+            rl <= position.distance(enemy.position) <= ru
+            for enemy in self.enemies
+        ]
+
+        if vehicle.type == VehicleType.AT_SPG:
+            line = self.game.fire_line(vehicle)
+            in_range = [
+                ok and enemy.position in line
+                for ok, enemy in zip(in_range, self.enemies)
+            ]
+
+        return in_range
+
+    def __score(self, vehicle: Vehicle, enemy_idx: int) -> int:
+        enemy = self.enemies[enemy_idx]
+        score = enemy.capture_points * self.params.capture_weight
+        if self.hp_left[enemy_idx] <= vehicle.damage:
+            score += self.params.low_hp_bonus
+        return score
+
+    def plan(self, vehicles: List[Vehicle]) -> Dict[VehicleId, Vehicle]:
+        '''
+        Decide which enemy each vehicle should shoot.
+
+        <param name="vehicles">Own vehicles in turn order.</param>
+        <returns>Dictionary of vehicle id to enemy it should shoot</returns>
+        '''
+
+        self.enemies = self.game.get_enemy_vehicles_for(self.player_id)
+        self.hp_left = [enemy.hp for enemy in self.enemies]
+
+        base_nodes = set(self.game.map.get_base_nodes([]))
+        attackable = self.game.attackable_players(self.player_id)
+
+        enemy_allowed = [enemy.playerId in attackable for enemy in self.enemies]
+        enemy_in_base = [enemy.position in base_nodes for enemy in self.enemies]
+
+        # Candidate targets of every vehicle
+        candidates = []  # type: List[List[int]]
+        for vehicle in vehicles:
+            in_base = vehicle.position in base_nodes
+            candidates.append([
+                idx for idx, ok in enumerate(self.__in_range(vehicle))
+                if ok and enemy_allowed[idx] and (in_base or enemy_in_base[idx])
+            ])
+
+        shots = {}  # type: Dict[VehicleId, Vehicle]
+        while True:
+            best = None
+            best_key = None
+            for order, (vehicle, targets) in enumerate(zip(vehicles, candidates)):
+                if vehicle.id in shots:
+                    continue
+
+                alive = [idx for idx in targets if self.hp_left[idx] > 0]
+                for idx in alive:
+                    # Prefer higher score, then vehicles with fewer options,
+                    # then vehicles that come first in turn order
+                    key = (self.__score(vehicle, idx), -len(alive), -order)
+                    if best_key is None or key > best_key:
+                        best = (vehicle, idx)
+                        best_key = key
+
+            if best is None:
+                break
+
+            vehicle, idx = best
+            shots[vehicle.id] = self.enemies[idx]
+            self.hp_left[idx] -= vehicle.damage
+
+        return shots
@@ -0,0 +1,146 @@
+from typing import List, Optional
+
+from model.game import Game
+from model.hex import Hex
+from model.common import Content, PlayerId
+from model.vehicle import Vehicle, VehicleId, VehicleType, VEHICLE_MAX_HP
+from model.action import MoveAction, ShootAction
+
+
+# Same as in server rules
+MAX_PLAYERS_IN_BASE = 2
+
+Actions = List[MoveAction | ShootAction]
+
+
+class TurnSimulator:
+    '''
+    Applies actions to a copy of the game following server rules:
+    moves, shots with respawn of destroyed vehicles, and end of turn
+    repairs, capture and attack matrix reset.
+    '''
+
+    def __init__(self, game: Game):
+        self.game = game.copy()
+        self.contents = self.game.map.contents
+
+    def vehicle(self, vid: VehicleId) -> Optional[Vehicle]:
+        return self.game.map.vehicle_by(vid)
+
+    def can_move(self, vehicle: Vehicle, target: Hex) -> bool:
+        # Staying in place is a valid move, as on the server
+        return target in self.game.reachable(vehicle, target)
+
+    def move(self, vehicle: Vehicle, target: Hex) -> bool:
+        if not self.can_move(vehicle, target):
+            return False
+
+        self.game.map.move_vehicle(vehicle, target)
+        # Catapult usage count is not known, assume it is not used up
+        if self.contents.get(target) == Content.CATAPULT:
+            self.game.map.set_bonus(vehicle, True)
+        return True
+
+    def apply(self, actions: Actions):
+        for action in actions:
+            vehicle = self.vehicle(action.vehicleId)
+            if vehicle is None:
+                continue
+            match action:
+                case MoveAction():
+                    self.move(vehicle, action.target)
+                case ShootAction():
+                    self.shoot(vehicle, action.target)
+
+    def can_attack(self, player_id: PlayerId, enemy_id: PlayerId) -> bool:
+        matrix = self.game.attack_matrix
+        if player_id == enemy_id:
+            return False
+        if player_id in matrix.get(enemy_id, []):
+            return True
+        return not any(
+            enemy_id in attacked
+            for idx, attacked in matrix.items() if idx != player_id
+        )
+
+    def victims(self, vehicle: Vehicle, target: Hex) -> List[Vehicle]:
+        vehicles = self.game.map.vehicles
+        if not self.game.in_shooting_range(vehicle, target):
+            return []
+
+        if vehicle.type != VehicleType.AT_SPG:
+            victim = vehicles.get(target)
+            if victim is None or victim.playerId == vehicle.playerId:
+                return []
+            return [victim]
+
+        diff = target - vehicle.position
+        dist = vehicle.position.distance(target)
+        direction = Hex(diff.q // dist, diff.r // dist, diff.s // dist)
+        _, ru = vehicle.shooting_range
+        if vehicle.bonus:
+            ru += 1
+
+        result = []
+        current = vehicle.position
+        for _ in range(ru):
+            current = current + direction
+            if self.contents.get(current) == Content.OBSTACLE:
+                break
+            victim = vehicles.get(current)
+            if victim is not None and victim.playerId != vehicle.playerId:
+                result.append(victim)
+        return result
+
+    def shoot(self, vehicle: Vehicle, target: Hex) -> bool:
+        victims = self.victims(vehicle, target)
+        if not victims or not all(self.can_attack(vehicle.playerId, v.playerId) for v in victims):
+            return False
+
+        game_map = self.game.map
+        game_map.set_bonus(vehicle, False)
+        for victim in victims:
+            attacked = self.game.attack_matrix.setdefault(vehicle.playerId, [])
+            if victim.playerId not in attacked:
+                attacked.append(victim.playerId)
+
+            game_map.set_hp(victim, victim.hp - vehicle.damage)
+            game_map.set_capture_points(victim, 0)
+            if victim.hp <= 0:
+                self.respawn(victim)
+        return True
+
+    def respawn(self, vehicle: Vehicle):
+        game_map = self.game.map
+        game_map.set_hp(vehicle, VEHICLE_MAX_HP[vehicle.type])
+        game_map.set_capture_points(vehicle, 0)
+        game_map.set_bonus(vehicle, False)
+        # Vehicle standing on the spawn keeps it, as on the server
+        if game_map.vehicles.get(vehicle.spawn, vehicle) is vehicle:
+            game_map.move_vehicle(vehicle, vehicle.spawn)
+
+    def end_turn(self, player_id: PlayerId, next_player: PlayerId):
+        game_map = self.game.map
+        vehicles = game_map.vehicles.values()
+
+        for vehicle in vehicles:
+            if vehicle.playerId != player_id:
+                continue
+            match self.contents.get(vehicle.position), vehicle.type:
+                case Content.LIGHT_REPAIR, VehicleType.MEDIUM_TANK:
+                    game_map.set_hp(vehicle, vehicle.max_hp)
+                case Content.HARD_REPAIR, VehicleType.HEAVY_TANK | VehicleType.AT_SPG:
+                    game_map.set_hp(vehicle, vehicle.max_hp)
+
+        in_base = {
+            vehicle.playerId for vehicle in vehicles
+            if self.contents.get(vehicle.position) == Content.BASE
+        }
+        if len(in_base) <= MAX_PLAYERS_IN_BASE:
+            for vehicle in vehicles:
+                if vehicle.playerId == player_id and \
+                        self.contents.get(vehicle.position) == Content.BASE:
+                    game_map.set_capture_points(vehicle, vehicle.capture_points + 1)
+
+        # Attacks of player are only remembered until their next turn
+        self.game.attack_matrix[next_player] = []
@@ -0,0 +1,210 @@
+import asyncio as aio
+import logging
+
+from itertools import product
+from typing import Awaitable, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from model.game import Game
+from model.hex import Hex
+from model.common import PlayerId
+from model.vehicle import VehicleId
+from model.action import TurnActions
+from player.simulator import Actions, TurnSimulator
+from ai.transposition import TranspositionTable
+
+
+TurnComputer = Callable[[Game, PlayerId], Awaitable[Actions]]
+
+
+class StateKey(NamedTuple):
+    '''
+    Everything engine decision depends on. Vehicles are represented by
+    the incremental 128 bit Zobrist hash of the map, the rest is small.
+    '''
+
+    zobrist: int
+    attack_matrix: FrozenSet[Tuple[PlayerId, FrozenSet[PlayerId]]]
+    players: Tuple[PlayerId, ...]
+
+    def __hash__(self) -> int:
+        return self.zobrist
+
+
+def state_key(game: Game) -> StateKey:
+    return StateKey(
+        game.map.hash,
+        frozenset((idx, frozenset(attacked)) for idx, attacked in game.attack_matrix.items()),
+        tuple(game.players),
+    )
+
+
+def players_between(game: Game, current: PlayerId, player_id: PlayerId) -> List[PlayerId]:
+    '''
+    Players making turns from current one up to, not including, given player.
+    '''
+
+    players = game.players
+    if current not in players or player_id not in players:
+        return []
+
+    start = players.index(current)
+    result = []
+    for i in range(len(players)):
+        idx = players[(start + i) % len(players)]
+        if idx == player_id:
+            break
+        result.append(idx)
+    return result
+
+
+class Speculator:
+    '''
+    Precomputes turns of a player while others make theirs.
+
+    Every opponent is predicted to either repeat its previous turn
+    (vehicles move by the same offsets and shoot the same enemies)
+    or to pass. The turn is computed for every predicted state and
+    reused when the real state matches one of them exactly.
+    Turns are kept across turns, so a state that repeats is not
+    computed twice.
+    '''
+
+    def __init__(self, player_id: PlayerId, max_states: int = 4, table_size: int = 1 << 12):
+        '''
+        <param name="player_id">Player to compute turns for.</param>
+        <param name="max_states">Maximum number of predicted states per turn.</param>
+        <param name="table_size">Number of computed turns kept.</param>
+        '''
+
+        self.player_id = player_id
+        self.max_states = max_states
+        # Previous turn of every opponent
+        self.offsets = {}  # type: Dict[PlayerId, Dict[VehicleId, Hex]]
+        self.victims = {}  # type: Dict[PlayerId, Dict[VehicleId, VehicleId]]
+        self.plans = TranspositionTable(table_size)
+        self.hits = 0
+        self.misses = 0
+
+    def observe(self, game: Game, actions: TurnActions):
+        '''
+        Remember actions of a turn.
+
+        <param name="game">Game in the state turn started with.</param>
+        <param name="actions">Actions of the turn.</param>
+        '''
+
+        vehicles = {v.id: v for v in game.map.vehicles.values()}
+        players = {a.playerId for a in actions.moves + actions.shoots}
+
+        for player_id in players:
+            self.offsets[player_id] = {
+                move.vehicleId: move.target - vehicles[move.vehicleId].position
+                for move in actions.moves
+                if move.playerId == player_id and move.vehicleId in vehicles
+            }
+            self.victims[player_id] = {
+                shot.vehicleId: game.map.vehicles[shot.target].id
+                for shot in actions.shoots
+                if shot.playerId == player_id and shot.target in game.map.vehicles
+            }
+
+    def __repeat(self, simulator: TurnSimulator, player_id: PlayerId):
+        # Order of actions is lost in TurnActions, shots are applied first
+        for vid, victim_id in self.victims.get(player_id, {}).items():
+            vehicle = simulator.vehicle(vid)
+            victim = simulator.vehicle(victim_id)
+            if vehicle is not None and victim is not None:
+                simulator.shoot(vehicle, victim.position)
+
+        for vid, offset in self.offsets.get(player_id, {}).items():
+            vehicle = simulator.vehicle(vid)
+            if vehicle is not None:
+                simulator.move(vehicle, vehicle.position + offset)
+
+    def predict(self, game: Game, current: PlayerId,
+                known: Optional[Dict[PlayerId, Actions]] = None) -> List[Game]:
+        '''
+        Predict states the player could get at its next turn.
+
+        <param name="game">Game with current state.</param>
+        <param name="current">Player making turn now.</param>
+        <param name="known">Actions of players that are known exactly, e.g. of local bots.</param>
+        <returns>Predicted games, the most likely first</returns>
+        '''
+
+        known = known or {}
+        between = players_between(game, current, self.player_id)
+        if not between:
+            return []
+
+        order = between + [self.player_id]
+        guessed = [idx for idx in between if idx not in known]
+        result = []
+        # True means the opponent repeats its previous turn
+        for choices in product((True, False), repeat=len(guessed)):
+            if len(result) == self.max_states:
+                break
+
+            repeats = dict(zip(guessed, choices))
+            simulator = TurnSimulator(game)
+            for player_id, next_player in zip(order, order[1:]):
+                if player_id in known:
+                    simulator.apply(known[player_id])
+                elif repeats[player_id]:
+                    self.__repeat(simulator, player_id)
+                simulator.end_turn(player_id, next_player)
+            result.append(simulator.game)
+
+        return result
+
+    async def speculate(self, game: Game, current: PlayerId, compute: TurnComputer,
+                        known: Optional[Dict[PlayerId, Actions]] = None):
+        '''
+        Compute turns for predicted states one by one, so that
+        cancellation takes effect between computations.
+
+        <param name="game">Game with current state.</param>
+        <param name="current">Player making turn now.</param>
+        <param name="compute">Computes turn of the player in a game, e.g. EnginePool.make_turn</param>
+        <param name="known">Actions of players that are known exactly.</param>
+        '''
+
+        for predicted in self.predict(game, current, known):
+            key = state_key(predicted)
+            if key in self.plans:
+                continue
+            self.plans.put(key, await compute(predicted, self.player_id))
+
+    def take(self, game: Game) -> Optional[Actions]:
+        '''
+        Get precomputed turn for the real state.
+
+        <param name="game">Game with the state of the player turn.</param>
+        <returns>Actions or None if the state was not predicted</returns>
+        '''
+
+        actions = self.plans.get(state_key(game))
+        self.plans.new_generation()
+
+        if actions is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        logging.debug(f"Speculation of player {self.player_id}: {self.hits} hits, {self.misses} misses")
+
+        return actions
+
+
+async def cancel(task: Optional[aio.Task]):
+    '''
+    Cancel speculation task and wait for it to stop.
+    '''
+
+    if task is None or task.done():
+        return
+
+    task.cancel()
+    try:
+        await task
+    except aio.CancelledError:
+        pass
@@ -0,0 +1,81 @@
+import logging
+
+from typing import Set
+
+from model.game import Game
+from model.common import PlayerId
+from model.vehicle import VehicleId
+from model.action import MoveAction, ShootAction
+from player.simulator import Actions, TurnSimulator
+
+
+class ActionValidator:
+    '''
+    Checks actions against game rules before they are sent,
+    so that the server does not reject them.
+
+    Actions are checked in order on a simulated copy of the game,
+    so a move sees vehicles moved before it and a shot sees enemies
+    destroyed before it. Move to a hex that can not be reached is
+    repaired to the reachable hex closest to its target, other
+    invalid actions are dropped.
+    '''
+
+    def __init__(self, game: Game, player_id: PlayerId):
+        '''
+        <param name="game">Game in the state of the turn start, it is not changed.</param>
+        <param name="player_id">Player making the turn.</param>
+        '''
+
+        self.simulator = TurnSimulator(game)
+        self.player_id = player_id
+        self.acted = set()  # type: Set[VehicleId]
+        self.repaired = 0
+        self.dropped = 0
+
+    def validate(self, actions: Actions) -> Actions:
+        '''
+        <param name="actions">Actions in the order they are going to be sent.</param>
+        <returns>Valid actions</returns>
+        '''
+
+        result = []
+        for action in actions:
+            checked = self.__check(action)
+            if checked is None:
+                logging.warning(f"Invalid action dropped: {action}")
+                self.dropped += 1
+                continue
+            if checked is not action:
+                logging.info(f"Invalid action {action} repaired to {checked}")
+                self.repaired += 1
+
+            self.acted.add(checked.vehicleId)
+            result.append(checked)
+
+        return result
+
+    def __check(self, action: MoveAction | ShootAction) -> MoveAction | ShootAction | None:
+        simulator = self.simulator
+        vehicle = simulator.vehicle(action.vehicleId)
+        if action.playerId != self.player_id or vehicle is None \
+                or vehicle.playerId != self.player_id or vehicle.id in self.acted:
+            return None
+
+        match action:
+            case ShootAction():
+                return action if simulator.shoot(vehicle, action.target) else None
+            case MoveAction():
+                if simulator.move(vehicle, action.target):
+                    return action
+
+                # The reachable hex closest to target, if it is any closer than staying
+                reachable = simulator.game.reachable(vehicle, action.target)
+                target = min(reachable, key=reachable.get)
+                if reachable[target] >= reachable[vehicle.position]:
+                    return None
+
+                simulator.move(vehicle, target)
+                return MoveAction(action.playerId, action.vehicleId, target)
+            case _:
+                return None
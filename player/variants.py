@@ -0,0 +1,71 @@
+import json
+from functools import partial
+from importlib import import_module
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from model.game import Game
+from model.common import PlayerId
+from player.engine import Engine
+from player.params import EngineParams
+
+
+# Engine variants known by name, anything else is loaded by "module:Class" spec
+VARIANTS = {
+    "default": Engine,
+}
+
+
+def engine_class(spec: str) -> type:
+    '''
+    Get engine class by variant spec.
+    Engine class should be constructible from (Game, PlayerId)
+    and have make_turn() method returning list of actions.
+
+    <param name="spec">Registered variant name or "module:Class"</param>
+    <returns>Engine class</returns>
+    '''
+
+    if spec in VARIANTS:
+        return VARIANTS[spec]
+
+    module, sep, name = spec.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown engine variant: {spec}")
+
+    return getattr(import_module(module), name)
+
+
+class EngineVariant(NamedTuple):
+    # Name variant is reported under
+    name: str
+    # Engine class spec, see engine_class
+    engine: str = "default"
+    # Parameters passed to engine, engine defaults if None
+    params: Optional[EngineParams] = None
+
+    def factory(self) -> Callable[[Game, PlayerId], Engine]:
+        cls = engine_class(self.engine)
+        if self.params is None:
+            return cls
+        return partial(cls, params=self.params)
+
+
+def parse_variant(spec: 'str | EngineVariant') -> EngineVariant:
+    '''
+    Parse variant given on command line.
+
+    <param name="spec">Engine class spec or path to JSON file with EngineParams</param>
+    <returns>Engine variant</returns>
+    '''
+
+    if isinstance(spec, EngineVariant):
+        return spec
+
+    if spec.endswith(".json"):
+        path = Path(spec)
+        with open(path) as f:
+            params = EngineParams.from_json(json.load(f))
+        return EngineVariant(name=path.stem, params=params)
+
+    return EngineVariant(name=spec, engine=spec)
@@ -0,0 +1,185 @@
+import asyncio as aio
+from enum import IntEnum
+from concurrent.futures import ProcessPoolExecutor
+
+from model.game import Game
+from model.common import PlayerId
+from model.action import MoveAction, ShootAction
+from model.hex import Hex
+from model.precompute import warm_up
+from player.engine import Engine
+
+from typing import Dict, List
+
+
+# State of a worker process, every worker serves exactly one player
+_game = None  # type: Game | None
+_player_id = None  # type: PlayerId | None
+
+
+class PackedAction(IntEnum):
+    MOVE = 0
+    SHOOT = 1
+
+
+def _init_worker(map_snapshot: tuple, player_id: PlayerId):
+    global _game
+    global _player_id
+
+    _game = Game()
+    _game.init_map_from_snapshot(map_snapshot)
+    _player_id = player_id
+
+
+def _worker_turn(state_snapshot: tuple) -> List[tuple]:
+    '''
+    Compute turn inside worker process.
+
+    <param name="state_snapshot">Result of Game.state_snapshot</param>
+    <returns>List of actions packed into tuples</returns>
+    '''
+
+    _game.update_state_from_snapshot(state_snapshot)
+    actions = Engine(_game, _player_id).make_turn()
+
+    result = []
+    for action in actions:
+        match action:
+            case MoveAction():
+                kind = PackedAction.MOVE
+            case ShootAction():
+                kind = PackedAction.SHOOT
+            case _:
+                raise RuntimeError(f"Unknown action type: {action}")
+
+        result.append((kind, action.vehicleId, *action.target))
+
+    return result
+
+
+def _worker_warm_up():
+    warm_up(_game.map.size, _game.map.contents)
+
+
+def _unpack_action(player_id: PlayerId, packed: tuple) -> MoveAction | ShootAction:
+    kind, vehicle_id, q, r, s = packed
+    match kind:
+        case PackedAction.MOVE:
+            return MoveAction(player_id, vehicle_id, Hex(q, r, s))
+        case PackedAction.SHOOT:
+            return ShootAction(player_id, vehicle_id, Hex(q, r, s))
+        case _:
+            raise RuntimeError(f"Unknown packed action: {packed}")
+
+
+class EngineWorker:
+    '''
+    Engine of a single player living in a dedicated process.
+
+    Map is sent to the process once on start, afterwards every turn
+    only a compact state snapshot is sent and action list is received.
+    '''
+
+    def __init__(self, game: Game, player_id: PlayerId):
+        '''
+        <param name="game">Game with initialized map.</param>
+        <param name="player_id">Player engine plays for.</param>
+        '''
+
+        self.player_id = player_id
+        self.executor = ProcessPoolExecutor(
+            max_workers=1,
+            initializer=_init_worker,
+            initargs=(game.map.snapshot(), player_id)
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def make_turn(self, game: Game) -> List[MoveAction | ShootAction]:
+        '''
+        Compute turn in worker process.
+
+        <param name="game">Game with current state.</param>
+        <returns>List of actions</returns>
+        '''
+
+        loop = aio.get_running_loop()
+        packed = await loop.run_in_executor(
+            self.executor, _worker_turn, game.state_snapshot()
+        )
+
+        return [_unpack_action(self.player_id, action) for action in packed]
+
+    async def warm_up(self):
+        '''
+        Start worker process and build map tables in it.
+        '''
+
+        loop = aio.get_running_loop()
+        await loop.run_in_executor(self.executor, _worker_warm_up)
+
+
+class EngineWorkers:
+    '''
+    Set of per-player engine workers, drop-in replacement for EnginePool.
+    Workers are spawned on first turn of each player.
+    '''
+
+    def __init__(self):
+        self.workers = None  # type: Dict[PlayerId, EngineWorker] | None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.shutdown()
+
+    def start(self):
+        if self.workers is not None:
+            raise RuntimeError("Already started")
+
+        self.workers = {}
+
+    def shutdown(self):
+        if self.workers is None:
+            raise RuntimeError("Not started")
+
+        for worker in self.workers.values():
+            worker.shutdown()
+        self.workers = None
+
+    def make_turn(self, game: Game, player_id: PlayerId) -> aio.Future:
+        '''
+        Schedule turn computation in worker of the player.
+
+        <param name="game">Game to compute turn in</param>
+        <param name="player_id">Player to compute turn for</param>
+        <returns>Awaitable resolving to list of actions</returns>
+        '''
+
+        if self.workers is None:
+            raise RuntimeError("Not started")
+
+        return aio.ensure_future(self.__worker(game, player_id).make_turn(game))
+
+    async def warm_up(self, game: Game, player_ids: List[PlayerId]):
+        '''
+        Spawn workers of players and build map tables in them before the first turn.
+
+        <param name="game">Game with initialized map</param>
+        <param name="player_ids">Players to spawn workers for</param>
+        '''
+
+        if self.workers is None:
+            raise RuntimeError("Not started")
+
+        await aio.gather(*(
+            self.__worker(game, player_id).warm_up() for player_id in player_ids
+        ))
+
+    def __worker(self, game: Game, player_id: PlayerId) -> EngineWorker:
+        if player_id not in self.workers:
+            self.workers[player_id] = EngineWorker(game, player_id)
+        return self.workers[player_id]
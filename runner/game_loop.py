@@ -0,0 +1,161 @@
+import logging
+import asyncio as aio
+from time import perf_counter
+from typing import List, NamedTuple, Optional
+
+from client.session import Session
+from client.manager import SessionManager
+from client.recorder import Recorder
+from client.actions import LoginAction
+from client.responses import ErrorResponse, LoginResponse
+from model.game import Game
+from model.common import PlayerId
+from model.action import MoveAction, ShootAction
+from model.precompute import warm_up
+from player.variants import EngineVariant, parse_variant
+from player.validator import ActionValidator
+
+
+class BotResult(NamedTuple):
+    idx: int
+    variant: str
+    capture: int
+    kill: int
+    won: bool
+    # Seconds spent in make_turn for every own turn
+    latencies: List[float]
+    # Actions rejected by server
+    rejected: int
+    # Actions repaired or dropped before sending
+    invalid: int
+
+
+class GameResult(NamedTuple):
+    name: str
+    winner: Optional[int]
+    turns: int
+    bots: List[BotResult]
+
+
+class Bot:
+    def __init__(self, variant: EngineVariant, info: LoginResponse, session: Session):
+        self.variant = variant
+        self.engine_factory = variant.factory()
+        self.info = info
+        self.session = session
+        self.latencies = []  # type: List[float]
+        self.rejected = 0
+        self.invalid = 0
+
+
+def check_response(resp):
+    match resp:
+        case ErrorResponse(_, error_message):
+            raise RuntimeError(f"Server error: {error_message}")
+        case _:
+            return resp
+
+
+async def bot_turn(bot: Bot, game: Game):
+    '''
+    Compute and send actions of a bot, rejected actions are counted, not raised.
+    Turn is computed in a thread, so that other games of the event loop go on.
+    '''
+
+    player_id = PlayerId(bot.info.idx)
+
+    def compute() -> List[MoveAction | ShootAction]:
+        validator = ActionValidator(game, player_id)
+        actions = validator.validate(bot.engine_factory(game, player_id).make_turn())
+        bot.invalid += validator.repaired + validator.dropped
+        return actions
+
+    start = perf_counter()
+    actions = await aio.get_running_loop().run_in_executor(None, compute)
+    bot.latencies.append(perf_counter() - start)
+
+    responses = await bot.session.pipeline(
+        [action.to_request() for action in actions]
+    )
+    for action, resp in zip(actions, responses):
+        if isinstance(resp, ErrorResponse):
+            logging.warning(f"Bot {bot.info.idx} action {action} rejected: {resp.error_message}")
+            bot.rejected += 1
+
+
+async def play_game(addr: str, port: int, game_name: str,
+                    variants: List[str | EngineVariant], num_turns: Optional[int] = None,
+                    recorder: Optional[Recorder] = None) -> GameResult:
+    '''
+    Play a complete game without GUI, every bot uses its own engine variant.
+
+    <param name="addr">Server address</param>
+    <param name="port">Server port</param>
+    <param name="game_name">Name of the game to create</param>
+    <param name="variants">Engine variant or its spec for every bot, see player.variants</param>
+    <param name="num_turns">Number of turns, server default if None</param>
+    <param name="recorder">Recorder of the first bot traffic, which includes all game states</param>
+    <returns>Result of the game</returns>
+    '''
+
+    async with SessionManager(addr, port, lazy_state=True) as manager:
+        sessions = await manager.open(len(variants))
+        sessions[0].recorder = recorder
+
+        logins = [
+            LoginAction(f"{game_name}-bot-{i}",
+                        game=game_name,
+                        num_turns=num_turns,
+                        num_players=len(variants))
+            for i in range(len(variants))
+        ]
+        # Logins are sequential, server assigns seats in login order
+        infos = [
+            check_response(await manager.login(session, login))
+            for session, login in zip(sessions, logins)
+        ]
+
+        bots = [
+            Bot(parse_variant(variant), info, session)
+            for variant, info, session in zip(variants, infos, sessions)
+        ]
+
+        # First bot also fetches state for everybody
+        session = bots[0].session
+
+        game = Game()
+        game.init_map(check_response(await session.map()))
+        loop = aio.get_running_loop()
+        await loop.run_in_executor(None, warm_up, game.map.size, game.map.contents)
+
+        while True:
+            game_state = check_response(await session.game_state())
+            game.update_state(game_state)
+
+            if game_state.finished and game_state.current_round == game_state.num_rounds:
+                break
+
+            async with aio.TaskGroup() as turns:
+                for bot in bots:
+                    if bot.info.idx == game_state.current_player_idx:
+                        await bot_turn(bot, game)
+                    turns.create_task(bot.session.turn())
+
+    return GameResult(
+        name=game_name,
+        winner=game_state.winner,
+        turns=game_state.current_turn,
+        bots=[
+            BotResult(
+                idx=bot.info.idx,
+                variant=bot.variant.name,
+                capture=game_state.win_points[bot.info.idx].capture,
+                kill=game_state.win_points[bot.info.idx].kill,
+                won=game_state.winner == bot.info.idx,
+                latencies=bot.latencies,
+                rejected=bot.rejected,
+                invalid=bot.invalid,
+            )
+            for bot in bots
+        ]
+    )
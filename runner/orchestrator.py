@@ -0,0 +1,195 @@
+import os
+import argparse
+import logging
+import asyncio as aio
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack
+from typing import List, NamedTuple, Optional
+
+from server.server import GameServer
+from runner.game_loop import GameResult, play_game
+from player.variants import EngineVariant
+
+
+class GameFailure(NamedTuple):
+    name: str
+    error: str
+
+
+class ShardResult(NamedTuple):
+    results: List[GameResult]
+    failures: List[GameFailure]
+    # Wall clock seconds the shard was running
+    elapsed: float
+
+
+class Report(NamedTuple):
+    games: int
+    failed: int
+    turns: int
+    elapsed: float
+    games_per_minute: float
+    turns_per_second: float
+
+
+class Shard(NamedTuple):
+    # Names of games played by the shard
+    games: List[str]
+    variants: List[str | EngineVariant]
+    num_turns: Optional[int]
+    # Games running at once
+    concurrency: int
+    # Server to play on, private stand-in server if None
+    addr: Optional[str]
+    port: Optional[int]
+    # Seconds after which game is considered failed
+    timeout: Optional[float]
+
+
+async def guarded_game(addr: str, port: int, game_name: str, shard: Shard,
+                       slots: aio.Semaphore) -> GameResult | GameFailure:
+    '''
+    Play a game, its failure is returned instead of raised,
+    so that it does not affect other games of the shard.
+    '''
+
+    async with slots:
+        try:
+            return await aio.wait_for(
+                play_game(addr, port, game_name, shard.variants, shard.num_turns),
+                shard.timeout
+            )
+        except Exception as e:
+            logging.warning(f"Game {game_name} failed: {e!r}")
+            return GameFailure(game_name, repr(e))
+
+
+async def play_shard(shard: Shard) -> ShardResult:
+    '''
+    Play games of a shard concurrently in the current event loop.
+    '''
+
+    start = perf_counter()
+    async with AsyncExitStack() as stack:
+        addr, port = shard.addr, shard.port
+        if addr is None:
+            server = await stack.enter_async_context(GameServer())
+            addr, port = server.host, server.port
+
+        slots = aio.Semaphore(shard.concurrency)
+        outcomes = await aio.gather(*(
+            guarded_game(addr, port, name, shard, slots) for name in shard.games
+        ))
+
+    return ShardResult(
+        results=[o for o in outcomes if isinstance(o, GameResult)],
+        failures=[o for o in outcomes if isinstance(o, GameFailure)],
+        elapsed=perf_counter() - start,
+    )
+
+
+def run_shard(shard: Shard) -> ShardResult:
+    '''
+    Worker process entry point.
+    '''
+
+    return aio.run(play_shard(shard))
+
+
+def make_shards(games: int, processes: int, variants: List[str | EngineVariant],
+                num_turns: Optional[int] = None, concurrency: int = 16,
+                addr: Optional[str] = None, port: Optional[int] = None,
+                timeout: Optional[float] = None, prefix: str = "orchestrated") -> List[Shard]:
+    '''
+    Split games between shards evenly, empty shards are dropped.
+    '''
+
+    return [
+        Shard(
+            games=[f"{prefix}-{i}" for i in range(shard, games, processes)],
+            variants=variants,
+            num_turns=num_turns,
+            concurrency=concurrency,
+            addr=addr,
+            port=port,
+            timeout=timeout,
+        )
+        for shard in range(min(processes, games))
+    ]
+
+
+def run_games(shards: List[Shard], processes: int = 1) -> List[ShardResult]:
+    '''
+    Run shards, in worker processes if there is more than one.
+    '''
+
+    if processes <= 1 or len(shards) <= 1:
+        return [run_shard(shard) for shard in shards]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(run_shard, shards))
+
+
+def report(shards: List[ShardResult], elapsed: float) -> Report:
+    games = sum(len(s.results) for s in shards)
+    turns = sum(r.turns for s in shards for r in s.results)
+    return Report(
+        games=games,
+        failed=sum(len(s.failures) for s in shards),
+        turns=turns,
+        elapsed=elapsed,
+        games_per_minute=games * 60 / elapsed if elapsed else 0.0,
+        turns_per_second=turns / elapsed if elapsed else 0.0,
+    )
+
+
+def format_report(r: Report) -> str:
+    return (f"{r.games} games, {r.failed} failed, {r.turns} turns in {r.elapsed:.2f} s: "
+            f"{r.games_per_minute:.1f} games/min, {r.turns_per_second:.1f} turns/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run many headless games concurrently, sharded across processes")
+    parser.add_argument("variants", nargs="+",
+                        help="engine variant of every seat: registered name, "
+                             "module:Class or JSON file with engine parameters")
+    parser.add_argument("-g", "--games", type=int, default=32,
+                        help="number of games to play")
+    parser.add_argument("-p", "--processes", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes")
+    parser.add_argument("-c", "--concurrency", type=int, default=16,
+                        help="games running at once in every process")
+    parser.add_argument("-t", "--turns", type=int, default=None,
+                        help="number of turns in a game, server default if omitted")
+    parser.add_argument("--host", default=None,
+                        help="server to play on, private local server in every process if omitted")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="seconds after which game is considered failed")
+    parser.add_argument("--prefix", default="orchestrated", help="prefix of game names")
+    args = parser.parse_args()
+
+    if (args.host is None) != (args.port is None):
+        parser.error("--host and --port should be given together")
+
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(message)s",
+        level=logging.WARNING)
+
+    shards = make_shards(args.games, args.processes, args.variants, args.turns,
+                         args.concurrency, args.host, args.port, args.timeout, args.prefix)
+
+    start = perf_counter()
+    results = run_games(shards, args.processes)
+    elapsed = perf_counter() - start
+
+    for shard in results:
+        for failure in shard.failures:
+            print(f"{failure.name}: {failure.error}")
+    print(format_report(report(results, elapsed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import logging
+from time import perf_counter
+from statistics import mean
+from typing import List, NamedTuple, Optional
+
+from client.common import ProtocolAction
+from client.recorder import RESPONSE, Frame, read_frames
+from client.responses import ResponseCode
+from client.session import RESPONSE_DECODERS, LAZY_RESPONSE_DECODERS, deserialize_response_data
+from model.game import Game
+from model.common import PlayerId
+from player.variants import EngineVariant, parse_variant
+
+
+class ReplayStats(NamedTuple):
+    frames: int
+    states: int
+    turns: int
+    # Total seconds spent in every stage
+    decode: float
+    update: float
+    engine: float
+    # Seconds spent in make_turn for every turn
+    latencies: List[float]
+
+
+def replay(frames: List[Frame], variant: str | EngineVariant = "default",
+           lazy: bool = True, player_id: Optional[int] = None) -> ReplayStats:
+    '''
+    Feed recorded responses through deserializers, Game.update_state
+    and engine as fast as possible.
+
+    <param name="frames">Recorded frames</param>
+    <param name="variant">Engine variant making turns</param>
+    <param name="lazy">Decode game states lazily as the client does</param>
+    <param name="player_id">Make turns only for this player, for current player of every state if None</param>
+    <returns>Time spent in every stage</returns>
+    '''
+
+    decoders = LAZY_RESPONSE_DECODERS if lazy else RESPONSE_DECODERS
+    engine_factory = parse_variant(variant).factory()
+
+    game = Game()
+    decode = update = engine = 0.0
+    states = 0
+    latencies = []  # type: List[float]
+
+    for frame in frames:
+        if frame.kind != RESPONSE or frame.code != ResponseCode.OKEY:
+            continue
+
+        action = frame.action
+        if action not in (ProtocolAction.MAP, ProtocolAction.GAME_STATE):
+            continue
+
+        start = perf_counter()
+        response = deserialize_response_data(action, frame.data, decoders)
+        decode += perf_counter() - start
+
+        if action == ProtocolAction.MAP:
+            start = perf_counter()
+            game.init_map(response)
+            update += perf_counter() - start
+            continue
+
+        # States recorded before map was fetched could not be applied
+        if game.map is None:
+            continue
+
+        states += 1
+        start = perf_counter()
+        game.update_state(response)
+        update += perf_counter() - start
+
+        current = response.current_player_idx
+        if response.finished or current is None:
+            continue
+        if player_id is not None and current != player_id:
+            continue
+
+        start = perf_counter()
+        engine_factory(game, PlayerId(current)).make_turn()
+        latencies.append(perf_counter() - start)
+        engine += latencies[-1]
+
+    return ReplayStats(
+        frames=len(frames),
+        states=states,
+        turns=len(latencies),
+        decode=decode,
+        update=update,
+        engine=engine,
+        latencies=latencies,
+    )
+
+
+def format_stats(stats: ReplayStats, repeat: int = 1) -> str:
+    def per_state(seconds: float) -> float:
+        return seconds * 1000 / max(stats.states * repeat, 1)
+
+    latencies = [l * 1000 for l in stats.latencies] or [0.0]
+    return "\n".join([
+        f"{stats.frames} frames, {stats.states} states, {stats.turns} turns",
+        f"decode  {stats.decode:8.3f} s {per_state(stats.decode):8.3f} ms/state",
+        f"update  {stats.update:8.3f} s {per_state(stats.update):8.3f} ms/state",
+        f"engine  {stats.engine:8.3f} s {mean(latencies):8.3f} ms/turn, max {max(latencies):.3f} ms",
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay recorded session traffic through decoding and engine")
+    parser.add_argument("recording", help="file written by client.recorder.Recorder")
+    parser.add_argument("-v", "--variant", default="default",
+                        help="engine variant: registered name, module:Class "
+                             "or JSON file with engine parameters")
+    parser.add_argument("--player", type=int, default=None,
+                        help="make turns only for this player")
+    parser.add_argument("--eager", action="store_true",
+                        help="decode game states eagerly")
+    parser.add_argument("-n", "--repeat", type=int, default=1,
+                        help="number of times to replay the recording")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(message)s",
+        level=logging.WARNING)
+
+    frames = list(read_frames(args.recording))
+
+    totals = None  # type: Optional[ReplayStats]
+    for _ in range(args.repeat):
+        stats = replay(frames, args.variant, not args.eager, args.player)
+        if totals is None:
+            totals = stats
+        else:
+            totals = totals._replace(
+                decode=totals.decode + stats.decode,
+                update=totals.update + stats.update,
+                engine=totals.engine + stats.engine,
+                latencies=totals.latencies + stats.latencies,
+            )
+
+    print(format_stats(totals, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import json
+import argparse
+import logging
+import asyncio as aio
+from statistics import mean, quantiles
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+from server.server import GameServer
+from runner.game_loop import GameResult, play_game
+from player.variants import EngineVariant
+
+
+class VariantStats(NamedTuple):
+    variant: str
+    # Games the variant played and seats it took in them
+    games: int
+    seats: int
+    wins: int
+    # Share of seats that won
+    win_rate: float
+    capture: float
+    kill: float
+    rejected: int
+    invalid: int
+    # Decision latency over all turns, in milliseconds
+    latency_mean: float
+    latency_p50: float
+    latency_p95: float
+    latency_max: float
+
+
+async def local_game(game_name: str, variants: List[str | EngineVariant],
+                     num_turns: Optional[int] = None) -> GameResult:
+    '''
+    Play a game against a private stand-in server.
+    '''
+
+    async with GameServer() as server:
+        return await play_game(server.host, server.port, game_name,
+                               variants, num_turns)
+
+
+def run_game(job: tuple) -> GameResult:
+    '''
+    Worker process entry point.
+
+    <param name="job">Tuple of game name, variants and number of turns</param>
+    '''
+
+    game_name, variants, num_turns = job
+    return aio.run(local_game(game_name, variants, num_turns))
+
+
+def seatings(variants: list, games: int) -> list:
+    '''
+    Rotate variants between seats so that no variant keeps the same spawn.
+    '''
+
+    n = len(variants)
+    return [variants[i % n:] + variants[:i % n] for i in range(games)]
+
+
+def run_tournament(variants: List[str | EngineVariant], games: int, processes: Optional[int] = None,
+                   num_turns: Optional[int] = None) -> List[GameResult]:
+    '''
+    Run games in parallel worker processes.
+
+    <param name="variants">Engine variant of every seat in a game</param>
+    <param name="games">Number of games</param>
+    <param name="processes">Number of worker processes, number of CPUs if None</param>
+    <param name="num_turns">Number of turns in every game</param>
+    <returns>Results of all games</returns>
+    '''
+
+    jobs = [
+        (f"tournament-{i}", seating, num_turns)
+        for i, seating in enumerate(seatings(variants, games))
+    ]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(run_game, jobs))
+
+
+def summarize(results: List[GameResult]) -> Dict[str, VariantStats]:
+    '''
+    Aggregate results of games by engine variant.
+    '''
+
+    bots = {}
+    games = {}
+    for result in results:
+        for bot in result.bots:
+            bots.setdefault(bot.variant, []).append(bot)
+            games.setdefault(bot.variant, set()).add(result.name)
+
+    stats = {}
+    for variant, played in bots.items():
+        latencies = [l * 1000 for bot in played for l in bot.latencies] or [0.0]
+        cuts = quantiles(latencies, n=20, method="inclusive") \
+            if len(latencies) > 1 else latencies * 19
+        wins = sum(bot.won for bot in played)
+
+        stats[variant] = VariantStats(
+            variant=variant,
+            games=len(games[variant]),
+            seats=len(played),
+            wins=wins,
+            win_rate=wins / len(played),
+            capture=mean(bot.capture for bot in played),
+            kill=mean(bot.kill for bot in played),
+            rejected=sum(bot.rejected for bot in played),
+            invalid=sum(bot.invalid for bot in played),
+            latency_mean=mean(latencies),
+            latency_p50=cuts[9],
+            latency_p95=cuts[18],
+            latency_max=max(latencies),
+        )
+
+    return stats
+
+
+def format_stats(stats: Dict[str, VariantStats]) -> str:
+    header = f"{'variant':<24}{'games':>6}{'seats':>6}{'win%':>7}{'capture':>9}{'kill':>7}" \
+             f"{'rejected':>9}{'invalid':>8}{'mean ms':>9}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>8}"
+    lines = [header]
+    for s in stats.values():
+        lines.append(
+            f"{s.variant:<24}{s.games:>6}{s.seats:>6}{s.win_rate * 100:>7.1f}{s.capture:>9.2f}{s.kill:>7.2f}"
+            f"{s.rejected:>9}{s.invalid:>8}{s.latency_mean:>9.2f}{s.latency_p50:>8.2f}"
+            f"{s.latency_p95:>8.2f}{s.latency_max:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run headless self-play games against a local stand-in server")
+    parser.add_argument("variants", nargs="+",
+                        help="engine variant of every seat: registered name, "
+                             "module:Class or JSON file with engine parameters")
+    parser.add_argument("-g", "--games", type=int, default=12,
+                        help="number of games to play")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="number of worker processes, defaults to number of CPUs")
+    parser.add_argument("-t", "--turns", type=int, default=None,
+                        help="number of turns in a game, server default if omitted")
+    parser.add_argument("--json", default=None,
+                        help="write per-variant statistics to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(message)s",
+        level=logging.WARNING)
+
+    results = run_tournament(args.variants, args.games, args.processes, args.turns)
+    stats = summarize(results)
+
+    print(format_stats(stats))
+    draws = sum(result.winner is None for result in results)
+    print(f"{len(results)} games, {draws} draws")
+
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump({v: s._asdict() for v, s in stats.items()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import os
+import json
+import random
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from model.vehicle import VehicleType
+from player.params import EngineParams, DEFAULT_PARAMS
+from player.variants import EngineVariant
+from runner.tournament import run_game, seatings
+
+
+# Ranges of searched parameters
+LOW_HP_BONUS_RANGE = range(0, 7)
+CAPTURE_WEIGHT_RANGE = range(0, 4)
+REPAIR_THRESHOLD_RANGE = range(0, 3)
+
+
+class Evaluation(NamedTuple):
+    params: EngineParams
+    fitness: float
+    games: int
+    wins: int
+    capture: float
+    kill: float
+
+    def to_json(self) -> dict:
+        return {
+            "params": self.params.to_json(),
+            "fitness": self.fitness,
+            "games": self.games,
+            "wins": self.wins,
+            "capture": self.capture,
+            "kill": self.kill,
+        }
+
+    @staticmethod
+    def from_json(j) -> 'Evaluation':
+        return Evaluation(
+            params=EngineParams.from_json(j["params"]),
+            fitness=float(j["fitness"]),
+            games=int(j["games"]),
+            wins=int(j["wins"]),
+            capture=float(j["capture"]),
+            kill=float(j["kill"]),
+        )
+
+
+def random_params(rng: random.Random) -> EngineParams:
+    order = list(VehicleType)
+    rng.shuffle(order)
+    return EngineParams(
+        turn_order=tuple(order),
+        low_hp_bonus=rng.choice(LOW_HP_BONUS_RANGE),
+        capture_weight=rng.choice(CAPTURE_WEIGHT_RANGE),
+        repair_threshold=rng.choice(REPAIR_THRESHOLD_RANGE),
+    )
+
+
+def mutate(rng: random.Random, params: EngineParams) -> EngineParams:
+    '''
+    Change one randomly picked parameter.
+    '''
+
+    match rng.randrange(4):
+        case 0:
+            order = list(params.turn_order)
+            i, j = rng.sample(range(len(order)), 2)
+            order[i], order[j] = order[j], order[i]
+            return params._replace(turn_order=tuple(order))
+        case 1:
+            return params._replace(low_hp_bonus=rng.choice(LOW_HP_BONUS_RANGE))
+        case 2:
+            return params._replace(capture_weight=rng.choice(CAPTURE_WEIGHT_RANGE))
+        case _:
+            return params._replace(repair_threshold=rng.choice(REPAIR_THRESHOLD_RANGE))
+
+
+def crossover(rng: random.Random, a: EngineParams, b: EngineParams) -> EngineParams:
+    '''
+    Take every parameter from one of the parents.
+    '''
+
+    return EngineParams(*(rng.choice(pair) for pair in zip(a, b)))
+
+
+def fitness(wins: int, games: int, capture: float, kill: float) -> float:
+    '''
+    Win rate, points only break ties between equal win rates.
+    '''
+
+    return wins / games + 0.01 * capture + 0.001 * kill
+
+
+class Tuner:
+    '''
+    Searches engine parameters by playing candidates against
+    baseline engines in batches of headless games.
+    '''
+
+    def __init__(self, strategy: str = "evolve", population: int = 8,
+                 games: int = 6, num_players: int = 3, elite: int = 3,
+                 num_turns: Optional[int] = None, processes: Optional[int] = None,
+                 checkpoint: Optional[str] = None, seed: Optional[int] = None):
+        '''
+        <param name="strategy">"random" or "evolve".</param>
+        <param name="population">Candidates evaluated per generation.</param>
+        <param name="games">Games played by every candidate.</param>
+        <param name="num_players">Players in a game, others are baseline engines.</param>
+        <param name="elite">Best candidates evolution breeds from.</param>
+        <param name="num_turns">Number of turns in a game.</param>
+        <param name="processes">Number of worker processes.</param>
+        <param name="checkpoint">File to save progress to after every generation.</param>
+        <param name="seed">Random seed.</param>
+        '''
+
+        if strategy not in ("random", "evolve"):
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+        self.strategy = strategy
+        self.population = population
+        self.games = games
+        self.num_players = num_players
+        self.elite = elite
+        self.num_turns = num_turns
+        self.processes = processes
+        self.checkpoint = checkpoint
+        self.rng = random.Random(seed)
+        self.generation = 0
+        self.history = []  # type: List[Evaluation]
+
+    # Checkpoints
+
+    def save(self):
+        if self.checkpoint is None:
+            return
+
+        version, state, gauss = self.rng.getstate()
+        data = {
+            "strategy": self.strategy,
+            "generation": self.generation,
+            "rng": [version, list(state), gauss],
+            "history": [e.to_json() for e in self.history],
+        }
+
+        # Write to temporary file first so that interrupted save
+        # does not destroy the previous checkpoint
+        tmp = self.checkpoint + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.checkpoint)
+
+    def load(self) -> bool:
+        '''
+        Restore progress from checkpoint file if it exists.
+
+        <returns>True if checkpoint was loaded</returns>
+        '''
+
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return False
+
+        with open(self.checkpoint) as f:
+            data = json.load(f)
+
+        version, state, gauss = data["rng"]
+        self.rng.setstate((version, tuple(state), gauss))
+        self.strategy = data["strategy"]
+        self.generation = int(data["generation"])
+        self.history = [Evaluation.from_json(e) for e in data["history"]]
+
+        return True
+
+    # Search
+
+    def best(self, n: int = 1) -> List[Evaluation]:
+        return sorted(self.history, key=lambda e: e.fitness, reverse=True)[:n]
+
+    def candidates(self) -> List[EngineParams]:
+        if self.generation == 0:
+            # Always measure the baseline itself
+            return [DEFAULT_PARAMS] + [
+                random_params(self.rng) for _ in range(self.population - 1)
+            ]
+
+        if self.strategy == "random":
+            return [random_params(self.rng) for _ in range(self.population)]
+
+        seen = {e.params for e in self.history}
+        parents = [e.params for e in self.best(self.elite)]
+        result = []
+        # Bounded number of attempts, search space could be exhausted
+        for _ in range(self.population * 20):
+            if len(result) == self.population:
+                break
+            if len(parents) > 1 and self.rng.random() < 0.5:
+                child = crossover(self.rng, *self.rng.sample(parents, 2))
+            else:
+                child = self.rng.choice(parents)
+            child = mutate(self.rng, child)
+            if child not in seen:
+                seen.add(child)
+                result.append(child)
+
+        return result
+
+    def evaluate(self, executor: ProcessPoolExecutor, candidates: List[EngineParams]) -> List[Evaluation]:
+        '''
+        Play games of all candidates in one batch.
+        '''
+
+        jobs = []
+        for i, params in enumerate(candidates):
+            variants = [EngineVariant("candidate", params=params)] + \
+                [EngineVariant("baseline")] * (self.num_players - 1)
+            for j, seating in enumerate(seatings(variants, self.games)):
+                name = f"tuning-{self.generation}-{i}-{j}"
+                jobs.append((name, seating, self.num_turns))
+
+        results = list(executor.map(run_game, jobs))
+
+        evaluations = []
+        for i, params in enumerate(candidates):
+            games = results[i * self.games:(i + 1) * self.games]
+            bots = [
+                bot for result in games for bot in result.bots
+                if bot.variant == "candidate"
+            ]
+            wins = sum(bot.won for bot in bots)
+            capture = sum(bot.capture for bot in bots) / len(bots)
+            kill = sum(bot.kill for bot in bots) / len(bots)
+            evaluations.append(Evaluation(
+                params=params,
+                fitness=fitness(wins, len(bots), capture, kill),
+                games=len(bots),
+                wins=wins,
+                capture=capture,
+                kill=kill,
+            ))
+
+        return evaluations
+
+    def run(self, generations: int) -> List[Evaluation]:
+        '''
+        Run search until given number of generations is evaluated,
+        generations restored from checkpoint count too.
+
+        <param name="generations">Total number of generations.</param>
+        <returns>Best evaluations</returns>
+        '''
+
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            while self.generation < generations:
+                candidates = self.candidates()
+                if not candidates:
+                    logging.info("Search space is exhausted")
+                    break
+
+                self.history.extend(self.evaluate(executor, candidates))
+                self.generation += 1
+                self.save()
+
+                best = self.best()[0]
+                logging.info(f"Generation {self.generation}: best fitness "
+                             f"{best.fitness:.3f} with {best.params.to_json()}")
+
+        return self.best(self.elite)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tune engine parameters with headless self-play games")
+    parser.add_argument("-s", "--strategy", choices=["random", "evolve"], default="evolve")
+    parser.add_argument("-n", "--generations", type=int, default=10)
+    parser.add_argument("--population", type=int, default=8,
+                        help="candidates per generation")
+    parser.add_argument("-g", "--games", type=int, default=6,
+                        help="games per candidate")
+    parser.add_argument("--players", type=int, default=3,
+                        help="players in a game, all but one are baseline engines")
+    parser.add_argument("-t", "--turns", type=int, default=None,
+                        help="number of turns in a game, server default if omitted")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="number of worker processes, defaults to number of CPUs")
+    parser.add_argument("-c", "--checkpoint", default="tuning.json",
+                        help="checkpoint file, run is resumed from it if it exists")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-o", "--output", default=None,
+                        help="write best parameters to this file, usable as tournament variant")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s %(message)s",
+        level=logging.INFO)
+
+    tuner = Tuner(strategy=args.strategy, population=args.population,
+                  games=args.games, num_players=args.players,
+                  num_turns=args.turns, processes=args.processes,
+                  checkpoint=args.checkpoint, seed=args.seed)
+    if tuner.load():
+        logging.info(f"Resumed from {args.checkpoint} at generation {tuner.generation}")
+
+    best = tuner.run(args.generations)
+    for evaluation in best:
+        print(f"{evaluation.fitness:.3f} {evaluation.wins}/{evaluation.games} "
+              f"{json.dumps(evaluation.params.to_json())}")
+
+    if args.output is not None and best:
+        with open(args.output, "w") as f:
+            json.dump(best[0].params.to_json(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
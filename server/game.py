@@ -0,0 +1,499 @@
+import asyncio as aio
+from collections import deque
+from typing import Dict, List, Optional, Set
+
+from client.common import GameAction
+from client.responses import ResponseCode
+from model.common import Content
+from model.hex import Hex
+from model.vehicle import (
+    VehicleType,
+    VEHICLE_MAX_HP,
+    VEHICLE_SPEED_POINTS,
+    VEHICLE_DAMAGE_POINTS,
+    VEHICLE_SHOOTING_RANGE
+)
+from server.maps import ServerMap, hex_to_json
+
+
+CAPTURE_TO_WIN = 5
+CATAPULT_USAGES = 3
+MAX_PLAYERS_IN_BASE = 2
+TURNS_PER_PLAYER = 15
+
+
+class ServerError(Exception):
+    '''Error that is reported to the client as ErrorResponse.'''
+
+    def __init__(self, code: ResponseCode, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class ServerPlayer:
+    def __init__(self, idx: int, name: str, password: Optional[str], is_observer: bool):
+        self.idx = idx
+        self.name = name
+        self.password = password
+        self.is_observer = is_observer
+
+    def to_json(self) -> dict:
+        return {"idx": self.idx, "name": self.name, "is_observer": self.is_observer}
+
+
+class ServerVehicle:
+    def __init__(self, id: int, player_id: int, vehicle_type: VehicleType, spawn: Hex):
+        self.id = id
+        self.player_id = player_id
+        self.type = vehicle_type
+        self.spawn = spawn
+        self.respawn()
+
+    def respawn(self, move: bool = True):
+        self.hp = VEHICLE_MAX_HP[self.type]
+        if move:
+            self.position = self.spawn
+        self.capture_points = 0
+        self.bonus = False
+
+    def to_json(self) -> dict:
+        return {
+            "player_id": self.player_id,
+            "vehicle_type": self.type.name.lower(),
+            "health": self.hp,
+            "spawn_position": hex_to_json(self.spawn),
+            "position": hex_to_json(self.position),
+            "capture_points": self.capture_points,
+            "shoot_range_bonus": int(self.bonus),
+        }
+
+
+class ServerGame:
+    '''
+    Game on the stand-in server. Implements rules of the real server
+    closely enough to run bots against it.
+    '''
+
+    def __init__(self, name: str, game_map: ServerMap, num_players: int = 1,
+                 num_turns: Optional[int] = None, num_rounds: int = 1,
+                 turn_timeout: float = 10.0):
+        '''
+        <param name="name">Name of the game.</param>
+        <param name="game_map">Map to play on.</param>
+        <param name="num_players">Number of players to start the game.</param>
+        <param name="num_turns">Number of turns in a round.</param>
+        <param name="num_rounds">Number of rounds.</param>
+        <param name="turn_timeout">Seconds after which turn ends even if not everybody is ready.</param>
+        '''
+
+        if num_players > len(game_map.spawn_points):
+            raise ServerError(ResponseCode.BAD_COMMAND,
+                              f"Map {game_map.name} supports at most "
+                              f"{len(game_map.spawn_points)} players")
+
+        self.name = name
+        self.map = game_map
+        self.contents = game_map.contents()
+        self.num_players = num_players
+        self.num_turns = num_turns or TURNS_PER_PLAYER * num_players
+        self.num_rounds = num_rounds
+        self.turn_timeout = turn_timeout
+
+        self.players = []  # type: List[ServerPlayer]
+        self.observers = []  # type: List[ServerPlayer]
+        self.connected = set()  # type: Set[int]
+        self.next_idx = 1
+
+        self.started = False
+        self.finished = False
+        self.current_turn = 0
+        self.current_round = 1
+        self.round_winners = []  # type: List[Optional[int]]
+        self.winner = None  # type: Optional[int]
+
+        self.vehicles = {}  # type: Dict[int, ServerVehicle]
+        self.win_points = {}  # type: Dict[int, Dict[str, int]]
+        self.attack_matrix = {}  # type: Dict[int, Set[int]]
+        self.catapult_usage = []  # type: List[Hex]
+        self.acted = set()  # type: Set[int]
+
+        self.turn_actions = []  # type: List[dict]
+        self.last_actions = []  # type: List[dict]
+
+        self.ready = set()  # type: Set[int]
+        self.turn_done = None  # type: aio.Future | None
+        self.timer = None  # type: aio.TimerHandle | None
+
+    # Players
+
+    def login(self, name: str, password: Optional[str], is_observer: bool) -> ServerPlayer:
+        for player in self.players + self.observers:
+            if player.name != name:
+                continue
+            if player.password != password:
+                raise ServerError(ResponseCode.ACCESS_DENIED, "Wrong password")
+
+            # Reconnection of existing player
+            self.connected.add(player.idx)
+            return player
+
+        if not is_observer and len(self.players) >= self.num_players:
+            raise ServerError(ResponseCode.ACCESS_DENIED, f"Game {self.name} is full")
+
+        player = ServerPlayer(self.next_idx, name, password, is_observer)
+        self.next_idx += 1
+        self.connected.add(player.idx)
+
+        if is_observer:
+            self.observers.append(player)
+        else:
+            self.players.append(player)
+            if len(self.players) == self.num_players:
+                self.start()
+
+        return player
+
+    def disconnect(self, player: ServerPlayer):
+        self.connected.discard(player.idx)
+        self.ready.discard(player.idx)
+        self.__check_ready()
+
+    @property
+    def current_player(self) -> Optional[ServerPlayer]:
+        if not self.started or self.finished:
+            return None
+        return self.players[self.current_turn % self.num_players]
+
+    # Rounds and turns
+
+    def start(self):
+        self.started = True
+        self.__start_round()
+        self.__resolve_turn()
+
+    def __start_round(self):
+        self.current_turn = 0
+        self.vehicles = {}
+        for player, spawn_point in zip(self.players, self.map.spawn_points):
+            for vehicle_type, hexes in spawn_point.items():
+                for spawn in hexes:
+                    vid = len(self.vehicles) + 1
+                    self.vehicles[vid] = ServerVehicle(vid, player.idx, vehicle_type, spawn)
+
+        self.win_points = {p.idx: {"capture": 0, "kill": 0} for p in self.players}
+        self.attack_matrix = {p.idx: set() for p in self.players}
+        self.catapult_usage = []
+        self.acted = set()
+
+    def __finish_round(self):
+        points = self.win_points
+        best = max(points.values(), key=lambda p: (p["capture"], p["kill"]))
+        leaders = [idx for idx, p in points.items() if p == best]
+        self.round_winners.append(leaders[0] if len(leaders) == 1 else None)
+
+        if self.current_round == self.num_rounds:
+            self.finished = True
+            wins = {}
+            for winner in self.round_winners:
+                if winner is not None:
+                    wins[winner] = wins.get(winner, 0) + 1
+            if wins:
+                most = max(wins.values())
+                leaders = [idx for idx, count in wins.items() if count == most]
+                self.winner = leaders[0] if len(leaders) == 1 else None
+        else:
+            self.current_round += 1
+            self.__start_round()
+
+    def __end_turn(self):
+        player = self.current_player
+        if player is not None:
+            self.__repair(player.idx)
+            self.__capture(player.idx)
+
+            self.current_turn += 1
+            won = any(p["capture"] >= CAPTURE_TO_WIN for p in self.win_points.values())
+            if won or self.current_turn >= self.num_turns:
+                self.__finish_round()
+
+            next_player = self.current_player
+            if next_player is not None:
+                # Attacks of player are only remembered until their next turn
+                self.attack_matrix[next_player.idx] = set()
+            self.acted = set()
+
+        self.last_actions = self.turn_actions
+        self.turn_actions = []
+        self.__resolve_turn()
+
+    def __resolve_turn(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        self.ready = set()
+        if self.turn_done is not None and not self.turn_done.done():
+            self.turn_done.set_result(None)
+        self.turn_done = None
+
+    def __check_ready(self):
+        if not self.started or self.finished:
+            return
+        if self.connected and self.connected <= self.ready:
+            self.__end_turn()
+
+    async def turn(self, player: ServerPlayer):
+        '''
+        Wait for the turn to end. Turn ends when all connected
+        players and observers are ready or by timeout.
+        '''
+
+        if self.finished:
+            return
+
+        if self.turn_done is None:
+            loop = aio.get_running_loop()
+            self.turn_done = loop.create_future()
+            if self.started:
+                self.timer = loop.call_later(self.turn_timeout, self.__end_turn)
+
+        done = self.turn_done
+        self.ready.add(player.idx)
+        self.__check_ready()
+
+        await done
+
+    # Actions
+
+    def __vehicle_for_action(self, player: ServerPlayer, vehicle_id: int) -> ServerVehicle:
+        if player.is_observer:
+            raise ServerError(ResponseCode.ACCESS_DENIED, "Observers can not act")
+        if self.current_player is None or self.current_player.idx != player.idx:
+            raise ServerError(ResponseCode.INAPPROPRIATE_GAME_STATE, "Not your turn")
+
+        vehicle = self.vehicles.get(vehicle_id)
+        if vehicle is None or vehicle.player_id != player.idx:
+            raise ServerError(ResponseCode.BAD_COMMAND, f"Wrong vehicle {vehicle_id}")
+        if vehicle_id in self.acted:
+            raise ServerError(ResponseCode.BAD_COMMAND, f"Vehicle {vehicle_id} already acted")
+
+        return vehicle
+
+    def vehicle_at(self, hex: Hex) -> Optional[ServerVehicle]:
+        for vehicle in self.vehicles.values():
+            if vehicle.position == hex:
+                return vehicle
+        return None
+
+    def __on_map(self, hex: Hex) -> bool:
+        return hex.distance() <= self.map.size
+
+    def can_attack(self, player_id: int, enemy_id: int) -> bool:
+        '''
+        Player can attack enemy if enemy attacked player
+        or nobody else attacked enemy.
+        '''
+
+        if player_id == enemy_id:
+            return False
+        if player_id in self.attack_matrix.get(enemy_id, ()):
+            return True
+        return not any(
+            enemy_id in attacked
+            for idx, attacked in self.attack_matrix.items()
+            if idx != player_id
+        )
+
+    def move(self, player: ServerPlayer, vehicle_id: int, target: Hex):
+        vehicle = self.__vehicle_for_action(player, vehicle_id)
+
+        if not self.__on_map(target):
+            raise ServerError(ResponseCode.BAD_COMMAND, f"Target {target} is out of map")
+        if self.contents.get(target) == Content.OBSTACLE:
+            raise ServerError(ResponseCode.BAD_COMMAND, f"Target {target} is an obstacle")
+        if target != vehicle.position and self.vehicle_at(target) is not None:
+            raise ServerError(ResponseCode.BAD_COMMAND, f"Target {target} is occupied")
+        if target not in self.reachable(vehicle):
+            raise ServerError(ResponseCode.BAD_COMMAND, f"Target {target} is not reachable")
+
+        vehicle.position = target
+        if self.contents.get(target) == Content.CATAPULT and not vehicle.bonus:
+            if self.catapult_usage.count(target) < CATAPULT_USAGES:
+                self.catapult_usage.append(target)
+                vehicle.bonus = True
+
+        self.__record(player, GameAction.MOVE, vehicle_id, target)
+
+    def reachable(self, vehicle: ServerVehicle) -> Set[Hex]:
+        '''
+        Hexes vehicle can move to. Vehicle can pass through its
+        own player vehicles, but not through obstacles and enemies.
+        '''
+
+        blocked = {
+            v.position for v in self.vehicles.values()
+            if v.player_id != vehicle.player_id
+        }
+        speed = VEHICLE_SPEED_POINTS[vehicle.type]
+
+        visited = {vehicle.position: 0}
+        queue = deque([vehicle.position])
+        while queue:
+            current = queue.popleft()
+            if visited[current] == speed:
+                continue
+            for neighbor in current.neighbors():
+                if neighbor in visited or not self.__on_map(neighbor):
+                    continue
+                if neighbor in blocked or self.contents.get(neighbor) == Content.OBSTACLE:
+                    continue
+                visited[neighbor] = visited[current] + 1
+                queue.append(neighbor)
+
+        return set(visited)
+
+    def shoot(self, player: ServerPlayer, vehicle_id: int, target: Hex):
+        vehicle = self.__vehicle_for_action(player, vehicle_id)
+
+        rl, ru = VEHICLE_SHOOTING_RANGE[vehicle.type]
+        if vehicle.bonus:
+            ru += 1
+        dist = vehicle.position.distance(target)
+        if not rl <= dist <= ru:
+            raise ServerError(ResponseCode.BAD_COMMAND, f"Target {target} is out of range")
+
+        if vehicle.type == VehicleType.AT_SPG:
+            victims = self.__line_victims(vehicle, target, ru)
+        else:
+            victim = self.vehicle_at(target)
+            if victim is None or victim.player_id == player.idx:
+                raise ServerError(ResponseCode.BAD_COMMAND, f"No enemy at {target}")
+            victims = [victim]
+
+        for victim in victims:
+            if not self.can_attack(player.idx, victim.player_id):
+                raise ServerError(ResponseCode.BAD_COMMAND,
+                                  f"Player {victim.player_id} is neutral")
+
+        vehicle.bonus = False
+        for victim in victims:
+            self.__damage(vehicle, victim)
+
+        self.__record(player, GameAction.SHOOT, vehicle_id, target)
+
+    def __line_victims(self, vehicle: ServerVehicle, target: Hex, ru: int) -> List[ServerVehicle]:
+        diff = target - vehicle.position
+        if 0 not in diff:
+            raise ServerError(ResponseCode.BAD_COMMAND, f"Target {target} is not on line")
+
+        dist = vehicle.position.distance(target)
+        direction = Hex(diff.q // dist, diff.r // dist, diff.s // dist)
+
+        victims = []
+        current = vehicle.position
+        for _ in range(ru):
+            current = current + direction
+            if self.contents.get(current) == Content.OBSTACLE:
+                break
+            victim = self.vehicle_at(current)
+            if victim is not None and victim.player_id != vehicle.player_id:
+                victims.append(victim)
+
+        return victims
+
+    def __damage(self, attacker: ServerVehicle, victim: ServerVehicle):
+        self.attack_matrix[attacker.player_id].add(victim.player_id)
+
+        victim.hp -= VEHICLE_DAMAGE_POINTS[attacker.type]
+        victim.capture_points = 0
+        if victim.hp <= 0:
+            self.win_points[attacker.player_id]["kill"] += VEHICLE_MAX_HP[victim.type]
+            # Vehicle standing on the spawn keeps it, destroyed one is repaired in place
+            occupant = self.vehicle_at(victim.spawn)
+            victim.respawn(move=occupant is None or occupant is victim)
+
+        self.__update_capture_points()
+
+    def chat(self, player: ServerPlayer, message: str):
+        self.turn_actions.append({
+            "player_id": player.idx,
+            "action_type": GameAction.CHAT.value,
+            "data": {"message": message},
+        })
+
+    def __record(self, player: ServerPlayer, action_type: GameAction, vehicle_id: int, target: Hex):
+        self.acted.add(vehicle_id)
+        self.turn_actions.append({
+            "player_id": player.idx,
+            "action_type": action_type.value,
+            "data": {"vehicle_id": vehicle_id, "target": hex_to_json(target)},
+        })
+
+    # End of turn effects
+
+    def __repair(self, player_id: int):
+        for vehicle in self.vehicles.values():
+            if vehicle.player_id != player_id:
+                continue
+            match self.contents.get(vehicle.position), vehicle.type:
+                case Content.LIGHT_REPAIR, VehicleType.MEDIUM_TANK:
+                    vehicle.hp = VEHICLE_MAX_HP[vehicle.type]
+                case Content.HARD_REPAIR, VehicleType.HEAVY_TANK | VehicleType.AT_SPG:
+                    vehicle.hp = VEHICLE_MAX_HP[vehicle.type]
+
+    def __capture(self, player_id: int):
+        in_base = {
+            vehicle.player_id for vehicle in self.vehicles.values()
+            if self.contents.get(vehicle.position) == Content.BASE
+        }
+        if len(in_base) > MAX_PLAYERS_IN_BASE:
+            return
+
+        for vehicle in self.vehicles.values():
+            if vehicle.player_id != player_id:
+                continue
+            if self.contents.get(vehicle.position) == Content.BASE:
+                vehicle.capture_points += 1
+
+        self.__update_capture_points()
+
+    def __update_capture_points(self):
+        for idx, points in self.win_points.items():
+            points["capture"] = sum(
+                vehicle.capture_points for vehicle in self.vehicles.values()
+                if vehicle.player_id == idx
+            )
+
+    # Responses
+
+    def map_json(self) -> dict:
+        return self.map.to_json()
+
+    def state_json(self) -> dict:
+        current = self.current_player
+        return {
+            "num_players": self.num_players,
+            "num_turns": self.num_turns,
+            "num_rounds": self.num_rounds,
+            "current_turn": self.current_turn,
+            "current_round": self.current_round,
+            "players": [p.to_json() for p in self.players],
+            "observers": [p.to_json() for p in self.observers],
+            "current_player_idx": current.idx if current is not None else None,
+            "finished": self.finished,
+            "vehicles": {
+                str(vid): vehicle.to_json() for vid, vehicle in self.vehicles.items()
+            },
+            "attack_matrix": {
+                str(idx): sorted(attacked) for idx, attacked in self.attack_matrix.items()
+            },
+            "win_points": {
+                str(idx): dict(points) for idx, points in self.win_points.items()
+            },
+            "winner": self.winner,
+            "catapult_usage": [hex_to_json(h) for h in self.catapult_usage],
+        }
+
+    def actions_json(self) -> dict:
+        return {"actions": self.last_actions}
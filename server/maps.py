@@ -0,0 +1,158 @@
+from typing import NamedTuple, List, Dict
+
+from model.common import Content
+from model.hex import Hex, hexes_range
+from model.vehicle import VehicleType
+
+
+# Order in which vehicles are lined up on a spawn edge
+SPAWN_ORDER = [
+    VehicleType.SPG,
+    VehicleType.LIGHT_TANK,
+    VehicleType.HEAVY_TANK,
+    VehicleType.MEDIUM_TANK,
+    VehicleType.AT_SPG,
+]
+
+
+def hex_to_json(hex: Hex) -> dict:
+    return {"x": hex.q, "y": hex.r, "z": hex.s}
+
+
+def hex_from_json(j) -> Hex:
+    return Hex(int(j["x"]), int(j["y"]), int(j["z"]))
+
+
+def rotate(hex: Hex, times: int = 1) -> Hex:
+    '''
+    Rotates hex around the center by 120 degrees given number of times.
+
+    <param name="hex">Hex to rotate.</param>
+    <param name="times">Number of rotations.</param>
+    '''
+
+    for _ in range(times % 3):
+        hex = Hex(hex.s, hex.q, hex.r)
+    return hex
+
+
+class ServerMap(NamedTuple):
+    size: int
+    name: str
+    spawn_points: List[Dict[VehicleType, List[Hex]]]
+    content: Dict[Content, List[Hex]]
+
+    def contents(self) -> Dict[Hex, Content]:
+        return {
+            hex: content
+            for content, hexes in self.content.items()
+            for hex in hexes
+        }
+
+    def to_json(self) -> dict:
+        return {
+            "size": self.size,
+            "name": self.name,
+            "spawn_points": [
+                {
+                    vehicle_type.name.lower(): [hex_to_json(h) for h in hexes]
+                    for vehicle_type, hexes in spawn_point.items()
+                }
+                for spawn_point in self.spawn_points
+            ],
+            "content": {
+                content.name.lower(): [hex_to_json(h) for h in hexes]
+                for content, hexes in self.content.items()
+            },
+        }
+
+    @staticmethod
+    def from_json(j) -> 'ServerMap':
+        '''
+        Create map from JSON in the format of MAP response
+
+        <param name="j">Parsed JSON</param>
+        '''
+
+        return ServerMap(
+            size=int(j["size"]),
+            name=str(j["name"]),
+            spawn_points=[
+                {
+                    VehicleType[k.upper()]: [hex_from_json(h) for h in v]
+                    for k, v in spawn_point.items()
+                }
+                for spawn_point in j["spawn_points"]
+            ],
+            content={
+                Content[k.upper()]: [hex_from_json(h) for h in v]
+                for k, v in j["content"].items()
+            },
+        )
+
+
+def default_map(size: int = 10, num_players: int = 3) -> ServerMap:
+    '''
+    Builds map with rotational symmetry resembling the one of the real server:
+    base in the center, spawns in the middle of alternating edges.
+
+    <param name="size">Radius of the map.</param>
+    <param name="num_players">Number of spawn points, up to 3.</param>
+    '''
+
+    if not 1 <= num_players <= 3:
+        raise ValueError(f"Unsupported number of players: {num_players}")
+    if size < 6:
+        raise ValueError(f"Map is too small: {size}")
+
+    center = Hex(0, 0, 0)
+    half = size // 2
+
+    # Everything is described for a single third of the map
+    # and then rotated to other two
+    spawn = {
+        vehicle_type: [Hex(-half - 2 + i, half + 2 - i - size, size)]
+        for i, vehicle_type in enumerate(SPAWN_ORDER)
+    }
+    obstacles = [
+        Hex(-2, -half + 1, half + 1),
+        Hex(-1, -half + 1, half),
+        Hex(-half + 1, -1, half),
+        Hex(-half + 1, -2, half + 1),
+    ]
+    light_repairs = [Hex(-half, half, 0)]
+    hard_repairs = [Hex(half, -half, 0)]
+    catapults = [Hex(-size + 2, 1, size - 3)]
+
+    content = {
+        Content.BASE: list(center.range(2)),
+        Content.OBSTACLE: [],
+        Content.LIGHT_REPAIR: [],
+        Content.HARD_REPAIR: [],
+        Content.CATAPULT: [],
+    }
+    for i in range(3):
+        content[Content.OBSTACLE].extend(rotate(h, i) for h in obstacles)
+        content[Content.LIGHT_REPAIR].extend(rotate(h, i) for h in light_repairs)
+        content[Content.HARD_REPAIR].extend(rotate(h, i) for h in hard_repairs)
+        content[Content.CATAPULT].extend(rotate(h, i) for h in catapults)
+
+    spawn_points = [
+        {
+            vehicle_type: [rotate(h, i) for h in hexes]
+            for vehicle_type, hexes in spawn.items()
+        }
+        for i in range(num_players)
+    ]
+
+    # Sanity check, layout should fit into the map
+    inside = set(hexes_range(size + 1))
+    for hexes in content.values():
+        assert all(hex in inside for hex in hexes)
+
+    return ServerMap(
+        size=size,
+        name=f"default-{size}",
+        spawn_points=spawn_points,
+        content=content,
+    )
@@ -0,0 +1,325 @@
+import json
+import struct
+import random
+import argparse
+import asyncio as aio
+import logging as log
+
+from typing import Callable, Dict, List, Optional
+
+from client.common import ProtocolAction, GameAction
+from client.responses import ResponseCode
+from server.game import ServerGame, ServerPlayer, ServerError
+from server.maps import ServerMap, default_map, hex_from_json
+
+
+def default_map_factory(num_players: int) -> ServerMap:
+    return default_map()
+
+
+def load_map(path: str) -> ServerMap:
+    '''
+    Load map from JSON file in the format of MAP response.
+    '''
+
+    with open(path) as f:
+        return ServerMap.from_json(json.load(f))
+
+
+def maps_factory(maps: List[ServerMap]) -> Callable[[int], ServerMap]:
+    '''
+    Map factory cycling through given maps, maps with
+    too few spawn points for a game are skipped.
+
+    <param name="maps">Maps to play on.</param>
+    '''
+
+    if not maps:
+        raise ValueError("No maps given")
+
+    games = 0
+
+    def factory(num_players: int) -> ServerMap:
+        nonlocal games
+        for i in range(len(maps)):
+            server_map = maps[(games + i) % len(maps)]
+            if len(server_map.spawn_points) >= num_players:
+                games += i + 1
+                return server_map
+        raise ServerError(ResponseCode.BAD_COMMAND,
+                          f"No map for {num_players} players")
+
+    return factory
+
+
+class DelayedWriter:
+    '''
+    Writes responses after artificial network delay.
+    Every response is delayed independently, so pipelined requests
+    still cost a single delay, but responses never overtake each other.
+    '''
+
+    def __init__(self, writer: aio.StreamWriter, latency: float, jitter: float,
+                 rng: random.Random):
+        self.writer = writer
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = rng
+        self.last_due = 0.0
+        self.queue = aio.Queue()  # type: aio.Queue[tuple[float, bytes]]
+        self.task = aio.create_task(self.__run())
+
+    def write(self, data: bytes):
+        loop = aio.get_running_loop()
+        due = loop.time() + self.latency + self.rng.uniform(0, self.jitter)
+        # Keep order when jitter makes later response due earlier
+        self.last_due = max(due, self.last_due)
+        self.queue.put_nowait((self.last_due, data))
+
+    async def __run(self):
+        loop = aio.get_running_loop()
+        try:
+            while True:
+                due, data = await self.queue.get()
+                delay = due - loop.time()
+                if delay > 0:
+                    await aio.sleep(delay)
+                self.writer.write(data)
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+
+    def close(self):
+        self.task.cancel()
+
+
+class Connection:
+    '''State of a single client connection.'''
+
+    def __init__(self):
+        self.game = None  # type: ServerGame | None
+        self.player = None  # type: ServerPlayer | None
+
+
+class GameServer:
+    '''
+    Asyncio stand-in for the game server. Speaks the same binary
+    protocol, so Session could be pointed at it instead of the real one.
+    '''
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 map_factory: Callable[[int], ServerMap] = default_map_factory,
+                 num_rounds: int = 1, turn_timeout: float = 10.0,
+                 latency: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None):
+        '''
+        <param name="host">Host to listen on.</param>
+        <param name="port">Port to listen on, 0 to pick a free one.</param>
+        <param name="map_factory">Creates map for a game given number of players.</param>
+        <param name="num_rounds">Number of rounds in every game.</param>
+        <param name="turn_timeout">Seconds after which turn ends anyway.</param>
+        <param name="latency">Seconds every response is delayed by.</param>
+        <param name="jitter">Upper bound of random seconds added to latency.</param>
+        <param name="seed">Random seed of jitter.</param>
+        '''
+
+        if latency < 0 or jitter < 0:
+            raise ValueError("Latency and jitter should not be negative")
+
+        self.host = host
+        self.port = port
+        self.map_factory = map_factory
+        self.num_rounds = num_rounds
+        self.turn_timeout = turn_timeout
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.games = {}  # type: Dict[str, ServerGame]
+        self.server = None  # type: aio.AbstractServer | None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        await self.stop()
+
+    async def start(self):
+        if self.server is not None:
+            raise RuntimeError("Already started")
+
+        self.server = await aio.start_server(self.__serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        log.debug(f"Game server listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self.server is None:
+            raise RuntimeError("Not started")
+
+        self.server.close()
+        await self.server.wait_closed()
+        self.server = None
+
+    async def serve_forever(self):
+        if self.server is None:
+            raise RuntimeError("Not started")
+
+        await self.server.serve_forever()
+
+    async def __serve(self, reader: aio.StreamReader, writer: aio.StreamWriter):
+        conn = Connection()
+        delayed = DelayedWriter(writer, self.latency, self.jitter, self.rng) \
+            if self.latency or self.jitter else None
+        try:
+            while True:
+                header = await reader.readexactly(8)
+                t, l = struct.unpack("<II", header)
+                data = await reader.readexactly(l)
+
+                code, response = await self.__dispatch(conn, t, data)
+
+                data = json.dumps(response).encode("utf-8") \
+                    if response is not None else b''
+                frame = struct.pack("<II", code, len(data)) + data
+                if delayed is not None:
+                    delayed.write(frame)
+                else:
+                    writer.write(frame)
+                    await writer.drain()
+        except (aio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if delayed is not None:
+                delayed.close()
+            if conn.game is not None:
+                self.__disconnect(conn)
+            writer.close()
+
+    async def __dispatch(self, conn: Connection, t: int, data: bytes) -> tuple[ResponseCode, Optional[dict]]:
+        try:
+            request = json.loads(data) if data else {}
+            return ResponseCode.OKEY, await self.__handle(conn, t, request)
+        except ServerError as e:
+            return e.code, {"error_message": e.message}
+        except (ValueError, KeyError, TypeError) as e:
+            return ResponseCode.BAD_COMMAND, {"error_message": f"Bad request: {e!r}"}
+
+    async def __handle(self, conn: Connection, t: int, request: dict) -> Optional[dict]:
+        if t == ProtocolAction.LOGIN:
+            return self.__login(conn, request)
+
+        if conn.game is None:
+            raise ServerError(ResponseCode.ACCESS_DENIED, "Login first")
+
+        game, player = conn.game, conn.player
+        match t:
+            case ProtocolAction.LOGOUT:
+                self.__disconnect(conn)
+                return None
+            case ProtocolAction.MAP:
+                return game.map_json()
+            case ProtocolAction.GAME_STATE:
+                return game.state_json()
+            case ProtocolAction.GAME_ACTIONS:
+                return game.actions_json()
+            case ProtocolAction.TURN:
+                await game.turn(player)
+                return None
+            case GameAction.CHAT:
+                game.chat(player, str(request["message"]))
+                return None
+            case GameAction.MOVE:
+                game.move(player, int(request["vehicle_id"]),
+                          hex_from_json(request["target"]))
+                return None
+            case GameAction.SHOOT:
+                game.shoot(player, int(request["vehicle_id"]),
+                           hex_from_json(request["target"]))
+                return None
+            case _:
+                raise ServerError(ResponseCode.BAD_COMMAND, f"Unknown action {t}")
+
+    def __disconnect(self, conn: Connection):
+        game = conn.game
+        game.disconnect(conn.player)
+        conn.game = conn.player = None
+
+        # Forget finished games nobody looks at anymore
+        if game.finished and not game.connected:
+            self.games.pop(game.name, None)
+
+    def __login(self, conn: Connection, request: dict) -> dict:
+        if conn.game is not None:
+            raise ServerError(ResponseCode.INAPPROPRIATE_GAME_STATE, "Already logged in")
+
+        name = str(request["name"])
+        game_name = str(request.get("game") or f"game-{len(self.games)}")
+        is_observer = bool(request.get("is_observer") or False)
+
+        game = self.games.get(game_name)
+        if game is None:
+            num_players = int(request.get("num_players") or 1)
+            game = ServerGame(
+                game_name,
+                self.map_factory(num_players),
+                num_players=num_players,
+                num_turns=int(request.get("num_turns") or 0) or None,
+                num_rounds=self.num_rounds,
+                turn_timeout=self.turn_timeout,
+            )
+            self.games[game_name] = game
+
+        player = game.login(name, request.get("password"), is_observer)
+        conn.game, conn.player = game, player
+
+        return player.to_json()
+
+
+async def serve(args: argparse.Namespace):
+    if args.maps:
+        map_factory = maps_factory([load_map(path) for path in args.maps])
+    else:
+        def map_factory(num_players: int) -> ServerMap:
+            return default_map(args.size)
+
+    async with GameServer(args.host, args.port, map_factory,
+                          num_rounds=args.rounds, turn_timeout=args.turn_timeout,
+                          latency=args.latency, jitter=args.jitter,
+                          seed=args.seed) as server:
+        log.info(f"Game server listening on {server.host}:{server.port}")
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run local stand-in for the game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=4430)
+    parser.add_argument("-m", "--maps", nargs="*", default=[],
+                        help="JSON files of maps in the format of MAP response, "
+                             "games cycle through them; generated map if omitted")
+    parser.add_argument("--size", type=int, default=10,
+                        help="radius of generated map")
+    parser.add_argument("-r", "--rounds", type=int, default=1,
+                        help="number of rounds in a game")
+    parser.add_argument("--turn-timeout", type=float, default=10.0,
+                        help="seconds after which turn ends anyway")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds every response is delayed by")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="upper bound of random seconds added to latency")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    log.basicConfig(
+        format="%(asctime)s %(levelname)s %(message)s",
+        level=log.INFO)
+
+    try:
+        aio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import unittest
+
+from client.session import serialize_action
+from client.encoding import ActionEncoder
+from client.actions import *
+from client.common import ProtocolAction, GameAction, Hex, VehicleId
+
+
+class EncodeTestCase(unittest.TestCase):
+    def check(self, t, action=None):
+        encoder = ActionEncoder()
+        self.assertEqual(encoder.encode(t, action), serialize_action(t, action))
+
+    def test_no_data(self):
+        for t in ProtocolAction:
+            self.check(t)
+
+    def test_login(self):
+        self.check(ProtocolAction.LOGIN, LoginAction("player"))
+        self.check(ProtocolAction.LOGIN, LoginAction(
+            "player", password="secret", game="game",
+            num_turns=45, num_players=3, is_observer=False, is_full=True))
+        self.check(ProtocolAction.LOGIN, LoginAction(
+            'quote " backslash \\ tab \t', game="ïgrå 游戏 \x7f"))
+
+    def test_move_shoot(self):
+        for t, cls in [(GameAction.MOVE, MoveAction), (GameAction.SHOOT, ShootAction)]:
+            self.check(t, cls(VehicleId(3), Hex(-1, 0, 1)))
+            self.check(t, cls(VehicleId(12345), Hex(10, -10, 0)))
+
+    def test_chat(self):
+        self.check(GameAction.CHAT, ChatAction("Hello world!"))
+        self.check(GameAction.CHAT, ChatAction("Привет\n"))
+        self.check(GameAction.CHAT, ChatAction(None))
+
+    def test_many(self):
+        requests = [
+            (GameAction.MOVE, MoveAction(VehicleId(1), Hex(0, 1, -1))),
+            (GameAction.SHOOT, ShootAction(VehicleId(2), Hex(1, 0, -1))),
+            (ProtocolAction.TURN, None),
+        ]
+        encoder = ActionEncoder()
+        self.assertEqual(
+            encoder.encode_many(requests),
+            b''.join(serialize_action(t, a) for t, a in requests)
+        )
@@ -0,0 +1,34 @@
+import unittest
+
+from model.hex import Hex
+from model.game import Game
+from model.map import GameMap
+from model.common import Content, PlayerId
+from model.vehicle import Vehicle, VehicleId, VehicleType
+from model.action import MoveAction
+from player.engine import Engine
+
+
+class EngineTestCase(unittest.TestCase):
+    def test_target_by_walking_distance(self):
+        # Base node next to the tank is behind a wall with a gap at its far end
+        wall = {Hex(1, i, -1 - i) for i in range(-5, 4)}
+        near, far = Hex(2, -1, -1), Hex(-3, 0, 3)
+        contents = {hex: Content.OBSTACLE for hex in wall}
+        contents[near] = contents[far] = Content.BASE
+
+        game = Game()
+        game.map = GameMap(5, contents)
+        game.players = [PlayerId(1)]
+        game.attack_matrix = {PlayerId(1): []}
+        tank = Vehicle(VehicleId(1), PlayerId(1), VehicleType.LIGHT_TANK,
+                       Hex(0, 0, 0), 1, Hex(0, 0, 0), False, 0)
+        game.map.vehicles = {tank.position: tank}
+
+        self.assertLess(tank.position.distance(near), tank.position.distance(far))
+        self.assertGreater(game.map.tables.distance(tank.position, near),
+                           game.map.tables.distance(tank.position, far))
+
+        # The base node closer to walk to is taken
+        actions = Engine(game, PlayerId(1)).make_turn()
+        self.assertEqual([repr(a) for a in actions], [repr(MoveAction(PlayerId(1), tank.id, far))])
@@ -1,17 +1,24 @@
 import unittest
 
 from client.responses import *
+import pickle
+
+from client.decoding import decoder_for, LazyGameStateResponse
 
 
 class DeserializeTestCase(unittest.TestCase):
+    def check(self, cls, response, data):
+        '''Both from_json and generated decoder should give the response'''
+        self.assertEqual(response, cls.from_json(data))
+        self.assertEqual(response, decoder_for(cls)(data))
+
     def test_login_json(self):
         response = LoginResponse(
             idx=PlayerId(0),
             name="player",
             is_observer=False)
         data = {"idx": 0, "name": "player", "is_observer": False}
-        result = LoginResponse.from_json(data)
-        self.assertEqual(response, result)
+        self.check(LoginResponse, response, data)
 
     def test_map_json(self):
         response = MapResponse(
@@ -50,14 +57,15 @@ class DeserializeTestCase(unittest.TestCase):
                 "obstacle": [{"x": 1, "y": 2, "z": -3}, {"x": 5, "y": -5, "z": 0}],
             }
         }
-        result = MapResponse.from_json(data)
-        self.assertEqual(response, result)
+        self.check(MapResponse, response, data)
 
     def test_game_state_json(self):
         response = GameStateResponse(
             num_players=2,
             num_turns=100,
+            num_rounds=1,
             current_turn=0,
+            current_round=1,
             players=[
                 PlayerState(
                     idx=PlayerId(0),
@@ -115,7 +123,9 @@ class DeserializeTestCase(unittest.TestCase):
         data = {
             "num_players": 2,
             "num_turns": 100,
+            "num_rounds": 1,
             "current_turn": 0,
+            "current_round": 1,
             "players": [
                 {
                     "idx": 0,
@@ -164,8 +174,25 @@ class DeserializeTestCase(unittest.TestCase):
                 {"x": 0, "y": 0, "z": 0}, {"x": 1, "y": 1, "z": -2}
             ]
         }
-        result = GameStateResponse.from_json(data)
-        self.assertEqual(response, result)
+        self.check(GameStateResponse, response, data)
+
+        lazy = LazyGameStateResponse(data)
+        self.assertEqual(lazy, response)
+        self.assertEqual(response, lazy)
+        self.assertEqual(tuple(lazy), tuple(response))
+        self.assertEqual(lazy[9], response.vehicles)
+        self.assertEqual(pickle.loads(pickle.dumps(lazy)), response)
+        match lazy:
+            case GameStateResponse(current_player_idx=idx, finished=False):
+                self.assertEqual(idx, PlayerId(0))
+            case _:
+                self.fail("Lazy response does not match")
+
+        # Fields which are not accessed are not decoded
+        lazy = LazyGameStateResponse({**data, "win_points": None})
+        self.assertEqual(lazy.vehicles, response.vehicles)
+        with self.assertRaises(AttributeError):
+            lazy.win_points
 
     def test_game_actions_json(self):
         response = GameActionsResponse(
@@ -222,5 +249,55 @@ class DeserializeTestCase(unittest.TestCase):
                 }
             ]
         }
-        result = GameActionsResponse.from_json(data)
-        self.assertEqual(response, result)
+        self.check(GameActionsResponse, response, data)
+
+    def test_vehicle_json_variations(self):
+        response = Vehicle(
+            player_id=PlayerId(1),
+            vehicle_type=VehicleType.AT_SPG,
+            health=2,
+            spawn_position=Hex(-1, 1, 0),
+            position=Hex(1, -1, 0),
+            capture_points=3,
+            shoot_range_bonus=-1
+        )
+        data = {
+            "player_id": 1,
+            "vehicle_type": "AT_SPG",
+            "health": 2,
+            "spawn_position": {"x": -1, "y": 1, "z": 0},
+            "position": {"x": 1, "y": -1, "z": 0},
+            "capture_points": 3,
+        }
+        self.check(Vehicle, response, data)
+
+        data["vehicle_type"] = "tank"
+        with self.assertRaises(ValueError):
+            decoder_for(Vehicle)(data)
+
+    def test_model_vehicles_json(self):
+        from model.map import GameMap
+        from model.vehicle import Vehicle as ModelVehicle
+
+        data = {
+            "0": {"player_id": 0, "vehicle_type": "light_tank", "health": 1,
+                  "spawn_position": {"x": -1, "y": 1, "z": 0},
+                  "position": {"x": -1, "y": -1, "z": 2},
+                  "capture_points": 0, "shoot_range_bonus": 1},
+            "1": {"player_id": 1, "vehicle_type": "at_spg", "health": 2,
+                  "spawn_position": {"x": 1, "y": -1, "z": 0},
+                  "position": {"x": 1, "y": 1, "z": -2},
+                  "capture_points": 2},
+        }
+
+        fused = GameMap(11, {})
+        fused.update_vehicles_from_json(data)
+
+        converted = [
+            ModelVehicle.from_vehicle_response(VehicleId(int(vid)), Vehicle.from_json(v))
+            for vid, v in data.items()
+        ]
+
+        self.assertEqual(list(fused.vehicles), [v.position for v in converted])
+        self.assertEqual(fused.vehicles_snapshot(),
+                         tuple(v.snapshot() for v in converted))
@@ -0,0 +1,67 @@
+import unittest
+
+from client.session import Session
+from client.manager import SessionManager
+from client.actions import LoginAction
+from client.responses import LoginResponse
+from server.server import GameServer
+
+
+class FlakySession(Session):
+    '''Session failing first connection attempts'''
+    failures = 0
+
+    async def connect(self):
+        if FlakySession.failures > 0:
+            FlakySession.failures -= 1
+            raise ConnectionRefusedError("Flaky")
+        await super().connect()
+
+
+class SessionManagerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = GameServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_open_and_login(self):
+        async with SessionManager(self.server.host, self.server.port, max_logins=2) as manager:
+            sessions = await manager.open(5)
+            self.assertTrue(all(s.is_connected for s in sessions))
+
+            responses = await manager.login_all(sessions, [
+                LoginAction(f"player-{i}", game=f"game-{i}", num_players=1)
+                for i in range(len(sessions))
+            ])
+            self.assertEqual([r.name for r in responses],
+                             [f"player-{i}" for i in range(len(sessions))])
+            self.assertTrue(all(isinstance(r, LoginResponse) for r in responses))
+
+        self.assertFalse(any(s.is_connected for s in sessions))
+
+    async def test_retry(self):
+        FlakySession.failures = 2
+        async with SessionManager(self.server.host, self.server.port, retries=2,
+                                  backoff=0.01, session_class=FlakySession) as manager:
+            session, = await manager.open()
+            self.assertTrue(session.is_connected)
+
+        FlakySession.failures = 2
+        async with SessionManager(self.server.host, self.server.port, retries=1,
+                                  backoff=0.01, session_class=FlakySession) as manager:
+            with self.assertRaises(ConnectionRefusedError):
+                await manager.open()
+
+    async def test_spares(self):
+        async with SessionManager(self.server.host, self.server.port, spares=2) as manager:
+            await manager.open()
+            await manager.warm_up_task
+            spares = list(manager.spare_sessions)
+            self.assertEqual(len(spares), 2)
+
+            sessions = await manager.open(2)
+            self.assertEqual(set(sessions), set(spares))
+            await manager.warm_up_task
+            self.assertEqual(len(manager.spare_sessions), 2)
@@ -0,0 +1,47 @@
+import unittest
+import asyncio as aio
+
+from runner.game_loop import GameResult
+from runner.orchestrator import GameFailure, Shard, guarded_game, make_shards, play_shard, report
+from server.server import GameServer
+
+
+class OrchestratorTestCase(unittest.IsolatedAsyncioTestCase):
+    def shard(self, games, timeout=None) -> Shard:
+        return Shard(games=games, variants=["default"] * 3, num_turns=3,
+                     concurrency=4, addr=None, port=None, timeout=timeout)
+
+    async def test_failures_are_isolated(self):
+        good = self.shard(["good"])
+        bad = good._replace(variants=["missing.module:Engine"] * 3)
+
+        async with GameServer() as server:
+            slots = aio.Semaphore(good.concurrency)
+            outcomes = await aio.gather(
+                guarded_game(server.host, server.port, "bad", bad, slots),
+                guarded_game(server.host, server.port, "good", good, slots),
+            )
+
+        self.assertIsInstance(outcomes[0], GameFailure)
+        self.assertIsInstance(outcomes[1], GameResult)
+
+    async def test_play_shard(self):
+        result = await play_shard(self.shard(["first", "second"]))
+        self.assertEqual(sorted(r.name for r in result.results), ["first", "second"])
+        self.assertEqual(result.failures, [])
+
+        r = report([result], result.elapsed)
+        self.assertEqual(r.games, 2)
+        self.assertEqual(r.turns, sum(g.turns for g in result.results))
+
+    async def test_timeout(self):
+        result = await play_shard(self.shard(["slow"], timeout=0.0001))
+        self.assertEqual(result.results, [])
+        self.assertEqual([f.name for f in result.failures], ["slow"])
+
+    def test_make_shards(self):
+        shards = make_shards(5, 2, ["default"])
+        self.assertEqual([s.games for s in shards],
+                         [["orchestrated-0", "orchestrated-2", "orchestrated-4"],
+                          ["orchestrated-1", "orchestrated-3"]])
+        self.assertEqual(len(make_shards(1, 4, ["default"])), 1)
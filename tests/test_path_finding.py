@@ -1,7 +1,15 @@
+import os
+import tempfile
 import unittest
 from itertools import *
 
 from ai.pathFinder import *
+from model.game import Game
+from model.map import GameMap
+from model.hex import hexes_at
+from model.common import Content, PlayerId
+from model.vehicle import Vehicle, VehicleId, VehicleType
+from model.precompute import MapTables, FIELD_CONTENTS, UNREACHABLE
 
 
 class DeserializeTestCase(unittest.TestCase):
@@ -54,3 +62,139 @@ class DeserializeTestCase(unittest.TestCase):
         for start, end in product(center.range(2), center.range(3, size + 1)):
             result = finder.path(start, end, excluded, 1)
             self.assertFalse(result)
+
+
+class MapTablesTestCase(unittest.TestCase):
+    def test_distance(self):
+        size = 4
+        center = Hex(0, 0, 0)
+        finder = AStarPathfinding(size, center)
+
+        # Wall with a gap and a closed cell around one hex
+        excluded = {Hex(1, i, -1 - i) for i in range(-3, 3)}
+        excluded |= set(Hex(-3, 1, 2).neighbors())
+        tables = MapTables(size, {hex: Content.OBSTACLE for hex in excluded})
+
+        for start, end in permutations(center.range(size + 1), 2):
+            if start in excluded or end in excluded:
+                continue
+            dist = tables.distance(start, end)
+            path = finder.path(start, end, excluded, 1)
+            if path:
+                self.assertEqual(dist, len(path) - 1)
+            else:
+                self.assertEqual(dist, UNREACHABLE)
+
+    def test_file(self):
+        size = 5
+        contents = {hex: Content.OBSTACLE for hex in Hex(1, 1, -2).range(2)}
+        contents[Hex(-4, 2, 2)] = Content.BASE
+        contents[Hex(0, -4, 4)] = Content.CATAPULT
+        tables = MapTables(size, contents)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "map.tables")
+            tables.save(path)
+            loaded = MapTables.load(path, size, contents)
+
+            for i, hex in enumerate(tables.hexes):
+                self.assertEqual(list(loaded.row(i)), list(tables.row(i)))
+                self.assertEqual(loaded.lines_of(hex), tables.lines_of(hex))
+            for content in FIELD_CONTENTS:
+                self.assertEqual(list(loaded.fields[content]), list(tables.fields[content]))
+
+            # File of another map is not accepted
+            with self.assertRaises(ValueError):
+                MapTables.load(path, size + 1, contents)
+
+
+class ReachableTestCase(unittest.TestCase):
+    def test_reachable(self):
+        size = 4
+        center = Hex(0, 0, 0)
+        finder = AStarPathfinding(size, center)
+
+        obstacles = {Hex(1, i, -1 - i) for i in range(-3, 2)}
+        game = Game()
+        game.map = GameMap(size, {hex: Content.OBSTACLE for hex in obstacles})
+
+        def vehicle(vid, player, position):
+            return Vehicle(VehicleId(vid), PlayerId(player), VehicleType.LIGHT_TANK,
+                           position, 2, position, False, 0)
+
+        tank = vehicle(1, 1, Hex(-1, 1, 0))
+        own = vehicle(2, 1, Hex(0, 1, -1))
+        enemy = vehicle(3, 2, Hex(-1, 0, 1))
+        game.map.vehicles = {v.position: v for v in (tank, own, enemy)}
+
+        goal = Hex(3, -3, 0)
+        reachable = game.reachable(tank, goal)
+        self.assertEqual(reachable[tank.position], game.map.tables.distance(tank.position, goal))
+
+        for hex in center.range(size + 1):
+            if hex in obstacles or hex == tank.position:
+                continue
+            # Own vehicles can be passed through, but not ended on
+            path = finder.path(tank.position, hex, obstacles | {enemy.position}, 1)
+            expected = bool(path) and len(path) - 1 <= tank.speed and hex not in game.map.vehicles
+            self.assertEqual(hex in reachable, expected, hex)
+            if expected:
+                self.assertEqual(reachable[hex], game.map.tables.distance(hex, goal))
+
+        self.assertNotIn(own.position, reachable)
+        self.assertNotIn(enemy.position, reachable)
+
+
+class TurnPathTestCase(unittest.TestCase):
+    def test_turn_path(self):
+        size = 6
+        speed = 3
+        center = Hex(0, 0, 0)
+
+        # Wall with a gap, jumps over it are not allowed
+        excluded = {Hex(1, i, -1 - i) for i in range(-6, 4)}
+        tables = MapTables(size, {hex: Content.OBSTACLE for hex in excluded})
+        finder = AStarPathfinding(size, center, tables)
+
+        expanded = {True: 0, False: 0}
+        hexes = list(center.range(size + 1))
+        for start, end in product(hexes[::5], hexes):
+            if start in excluded or end in excluded or start == end:
+                continue
+            path = finder.path(start, end, excluded, speed, turns=True)
+            expanded[True] += finder.expanded
+            finder.path(start, end, excluded, speed)
+            expanded[False] += finder.expanded
+
+            # Optimal number of turns, each one walkable
+            dist = tables.distance(start, end)
+            self.assertNotEqual(dist, UNREACHABLE)
+            self.assertEqual(len(path) - 1, -(-dist // speed))
+            self.assertEqual((path[0], path[-1]), (start, end))
+            for a, b in zip(path, path[1:]):
+                self.assertLessEqual(tables.distance(a, b), speed)
+
+        # Fewer than jumps over hexes within speed, which ignore the wall
+        self.assertLess(expanded[True], expanded[False])
+
+    def test_turn_path_needs_tables(self):
+        with self.assertRaises(ValueError):
+            AStarPathfinding().path(Hex(0, 0, 0), Hex(1, -1, 0), set(), 1, turns=True)
+
+    def test_turn_path_short_turns(self):
+        size = 10
+        speed = 3
+        start, end = Hex(0, 0, 0), Hex(7, -7, 0)
+        tables = MapTables(size, {})
+        finder = AStarPathfinding(size, tables=tables)
+
+        # No turn can end at full speed from start
+        excluded = {start + hex for hex in hexes_at(speed)}
+        path = finder.path(start, end, excluded, speed, turns=True)
+        walk = finder.path(start, end, excluded, speed)
+
+        self.assertEqual(len(path), len(walk))
+        self.assertEqual((path[0], path[-1]), (start, end))
+        for a, b in zip(path, path[1:]):
+            self.assertNotIn(b, excluded)
+            self.assertLessEqual(tables.distance(a, b), speed)
@@ -0,0 +1,59 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+from model import precompute
+from model.common import PlayerId
+from player.engine import Engine
+from player.pool import EnginePool
+from util import start_game
+
+
+class EnginePoolTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server, _, self.game = start_game("pool")
+        self.player_ids = [PlayerId(player.idx) for player in self.server.players]
+
+    async def test_make_turn(self):
+        player_id = PlayerId(self.server.current_player.idx)
+        expected = Engine(self.game.copy(), player_id).make_turn()
+        self.assertTrue(expected)
+
+        for use_processes in (False, True):
+            with EnginePool(2, use_processes) as pool:
+                await pool.warm_up(self.game, self.player_ids)
+                actions = await pool.make_turn(self.game.copy(), player_id)
+                # Actions have no equality, their representations are compared
+                self.assertEqual(repr(actions), repr(expected))
+
+    def test_start_twice(self):
+        pool = EnginePool()
+        with self.assertRaises(RuntimeError):
+            pool.make_turn(self.game, self.player_ids[0])
+
+        with pool:
+            with self.assertRaises(RuntimeError):
+                pool.start()
+
+        with self.assertRaises(RuntimeError):
+            pool.shutdown()
+
+    async def test_process_warm_up_with_cache(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.dict(os.environ, {"YAGDE_TABLES_CACHE": tmp}), \
+                mock.patch.object(precompute, "CACHE_DIR", tmp), \
+                mock.patch.object(precompute, "_tables", {}):
+            # First run writes the file, the second one loads it in a new process
+            for _ in range(2):
+                with EnginePool(1, True) as pool:
+                    await pool.warm_up(self.game, self.player_ids)
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+            # Game with memory mapped tables can still be sent to a process
+            game_map = self.game.map
+            tables = game_map.tables
+            self.assertIsInstance(tables.rows[0], memoryview)
+            copy = pickle.loads(pickle.dumps(self.game))
+            self.assertIs(copy.map.tables, tables)
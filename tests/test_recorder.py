@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from client.common import ProtocolAction
+from client.recorder import Recorder, REQUEST, RESPONSE, read_frames
+from runner.game_loop import play_game
+from runner.replay import replay
+from server.server import GameServer
+
+
+class RecorderTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_record_and_replay(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "game.rec")
+
+            with Recorder(path) as recorder:
+                async with GameServer() as server:
+                    result = await play_game(server.host, server.port, "recorded",
+                                             ["default"] * 3, num_turns=6,
+                                             recorder=recorder)
+
+            frames = list(read_frames(path))
+            requests = [f for f in frames if f.kind == REQUEST]
+            responses = [f for f in frames if f.kind == RESPONSE]
+            self.assertEqual(len(requests), len(responses))
+            # Response answers request recorded before it
+            self.assertEqual([f.action for f in requests], [f.action for f in responses])
+            self.assertEqual(responses[0].action, ProtocolAction.LOGIN)
+
+            stats = replay(frames)
+            # Every turn and the final state
+            self.assertEqual(stats.states, result.turns + 1)
+            self.assertEqual(stats.turns, result.turns)
+            self.assertEqual(stats.states, replay(frames, lazy=False).states)
@@ -0,0 +1,135 @@
+import asyncio as aio
+import unittest
+
+from model.hex import Hex
+from model.common import Content
+from model.vehicle import VehicleType, VEHICLE_MAX_HP
+from server.game import ServerGame, ServerError
+from server.maps import default_map
+
+
+class ServerGameTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = ServerGame("rules", default_map(), num_players=3)
+        self.players = [self.server.login(f"player-{i}", None, False) for i in range(3)]
+        self.current = self.server.current_player
+        self.first, self.second, self.third = self.players
+
+    def vehicle(self, player, vehicle_type: VehicleType):
+        return next(v for v in self.server.vehicles.values()
+                    if v.player_id == player.idx and v.type == vehicle_type)
+
+    def free(self, hex: Hex) -> bool:
+        return self.server.contents.get(hex) != Content.OBSTACLE and self.server.vehicle_at(hex) is None
+
+    def open_area(self) -> Hex:
+        # Hex with a free ring of radius 3 around it
+        return next(
+            center for center in Hex(0, 0, 0).range(self.server.map.size - 3)
+            if all(self.free(hex) for hex in center.range(4))
+        )
+
+    async def end_turn(self):
+        await aio.gather(*(self.server.turn(player) for player in self.players))
+
+    def test_move(self):
+        self.assertIs(self.current, self.first)
+        tank = self.vehicle(self.first, VehicleType.LIGHT_TANK)
+        center = self.open_area()
+        tank.position = center
+
+        with self.assertRaises(ServerError):
+            self.server.move(self.first, tank.id, next(center.neighbors(4)))
+
+        target = next(center.neighbors(3))
+        self.server.move(self.first, tank.id, target)
+        self.assertEqual(tank.position, target)
+
+        # Every vehicle acts once per turn
+        with self.assertRaises(ServerError):
+            self.server.move(self.first, tank.id, center)
+        # Only current player acts
+        other = self.vehicle(self.second, VehicleType.LIGHT_TANK)
+        with self.assertRaises(ServerError):
+            self.server.move(self.second, other.id, next(other.position.neighbors()))
+
+    def test_move_blocked(self):
+        tank = self.vehicle(self.first, VehicleType.MEDIUM_TANK)
+        center = self.open_area()
+        tank.position = center
+
+        obstacle = next(hex for hex, content in self.server.contents.items()
+                        if content == Content.OBSTACLE)
+        own = self.vehicle(self.first, VehicleType.HEAVY_TANK)
+        own.position = center + Hex(1, -1, 0)
+        enemy = self.vehicle(self.second, VehicleType.HEAVY_TANK)
+        enemy.position = center + Hex(0, -1, 1)
+
+        for target in (Hex(self.server.map.size + 1, 0, -self.server.map.size - 1),
+                       obstacle, own.position, enemy.position):
+            with self.assertRaises(ServerError):
+                self.server.move(self.first, tank.id, target)
+
+        # Surrounded by enemies but one own vehicle, which is passed through
+        enemies = [v for v in self.server.vehicles.values() if v.player_id == self.second.idx]
+        for enemy, hex in zip(enemies, (h for h in center.neighbors() if h != own.position)):
+            enemy.position = hex
+        with self.assertRaises(ServerError):
+            self.server.move(self.first, tank.id, center + Hex(0, -2, 2))
+        self.server.move(self.first, tank.id, center + Hex(2, -2, 0))
+        self.assertEqual(tank.position, center + Hex(2, -2, 0))
+
+    def test_shoot_and_neutrality(self):
+        tank = self.vehicle(self.first, VehicleType.MEDIUM_TANK)
+        center = self.open_area()
+        tank.position = center
+        second = self.vehicle(self.second, VehicleType.MEDIUM_TANK)
+        second.position = center + Hex(2, -2, 0)
+        third = self.vehicle(self.third, VehicleType.MEDIUM_TANK)
+        third.position = center + Hex(-2, 2, 0)
+
+        with self.assertRaises(ServerError):
+            # Out of range
+            self.server.shoot(self.first, tank.id, center + Hex(1, -1, 0))
+
+        # Third player was attacked by the second one
+        self.server.attack_matrix[self.second.idx].add(self.third.idx)
+        with self.assertRaises(ServerError):
+            self.server.shoot(self.first, tank.id, third.position)
+
+        self.server.shoot(self.first, tank.id, second.position)
+        self.assertEqual(second.hp, VEHICLE_MAX_HP[second.type] - 1)
+        self.assertIn(self.second.idx, self.server.attack_matrix[self.first.idx])
+
+    async def test_capture_and_respawn(self):
+        base = [hex for hex, content in self.server.contents.items() if content == Content.BASE]
+        tank = self.vehicle(self.first, VehicleType.MEDIUM_TANK)
+        tank.position = base[0]
+        enemy = self.vehicle(self.second, VehicleType.LIGHT_TANK)
+        enemy.position = next(hex for hex in base[0].neighbors(2) if self.free(hex))
+        enemy.capture_points = 2
+
+        self.server.shoot(self.first, tank.id, enemy.position)
+        self.assertEqual((enemy.position, enemy.hp, enemy.capture_points),
+                         (enemy.spawn, VEHICLE_MAX_HP[enemy.type], 0))
+        self.assertEqual(self.server.win_points[self.first.idx]["kill"],
+                         VEHICLE_MAX_HP[enemy.type])
+
+        await self.end_turn()
+        self.assertEqual(tank.capture_points, 1)
+        self.assertEqual(self.server.win_points[self.first.idx]["capture"], 1)
+        self.assertIs(self.server.current_player, self.second)
+
+    def test_respawn_on_taken_spawn(self):
+        tank = self.vehicle(self.first, VehicleType.MEDIUM_TANK)
+        enemy = self.vehicle(self.second, VehicleType.LIGHT_TANK)
+        tank.position = self.open_area()
+        enemy.position = next(hex for hex in tank.position.neighbors(2))
+        position = enemy.position
+        other = self.vehicle(self.third, VehicleType.LIGHT_TANK)
+        other.position = enemy.spawn
+
+        # Destroyed vehicle is repaired where it is
+        self.server.shoot(self.first, tank.id, enemy.position)
+        self.assertEqual((enemy.position, enemy.hp), (position, VEHICLE_MAX_HP[enemy.type]))
+        self.assertEqual(other.position, enemy.spawn)
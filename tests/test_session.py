@@ -0,0 +1,146 @@
+import unittest
+import asyncio as aio
+from time import perf_counter
+
+from client.session import Session
+from client.actions import LoginAction, MoveAction
+from client.common import ProtocolAction, GameAction, Hex, VehicleId
+from client.responses import *
+from client.metrics import SessionMetrics, Histogram
+from client.shared import SharedRequests
+from server.server import GameServer
+
+
+class SessionTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = GameServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_pipeline_order(self):
+        async with Session(self.server.host, self.server.port) as session:
+            login = await session.login(LoginAction("player", game="test"))
+            self.assertIsInstance(login, LoginResponse)
+
+            vehicle = VehicleId(1)
+            requests = [
+                (ProtocolAction.MAP, None),
+                (ProtocolAction.GAME_STATE, None),
+                # Vehicle can not move that far
+                (GameAction.MOVE, MoveAction(vehicle, Hex(0, 0, 0))),
+                (ProtocolAction.GAME_ACTIONS, None),
+            ]
+            responses = await session.pipeline(requests)
+
+            self.assertEqual(len(responses), len(requests))
+            self.assertIsInstance(responses[0], MapResponse)
+            self.assertIsInstance(responses[1], GameStateResponse)
+            self.assertIsInstance(responses[2], ErrorResponse)
+            self.assertEqual(responses[2].code, ResponseCode.BAD_COMMAND)
+            self.assertIsInstance(responses[3], GameActionsResponse)
+
+    async def test_metrics(self):
+        metrics = SessionMetrics()
+        async with Session(self.server.host, self.server.port, metrics=metrics) as session:
+            await session.login(LoginAction("player", game="test"))
+            await session.pipeline([
+                (ProtocolAction.GAME_STATE, None),
+                (GameAction.MOVE, MoveAction(VehicleId(1), Hex(0, 0, 0))),
+            ])
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["requests"], 3)
+        self.assertGreater(snapshot["bytes_sent"], 3 * 8)
+        self.assertGreater(snapshot["bytes_received"], 3 * 8)
+        self.assertEqual(snapshot["round_trips"]["LOGIN"]["count"], 1)
+        self.assertEqual(snapshot["round_trips"]["MOVE"]["count"], 1)
+        self.assertEqual(snapshot["decode"]["count"], 3)
+        self.assertEqual(snapshot["errors"], {"BAD_COMMAND": 1})
+
+    async def test_shared_requests(self):
+        metrics = SessionMetrics()
+        async with Session(self.server.host, self.server.port, metrics=metrics) as session:
+            await session.login(LoginAction("player", game="test"))
+            shared = SharedRequests(session)
+
+            states = await aio.gather(*(shared.game_state() for _ in range(3)))
+            self.assertIs(states[0], states[2])
+            self.assertIs(await shared.game_state(), states[0])
+            await shared.map()
+            await shared.map()
+
+            shared.next_turn()
+            self.assertIsNot(await shared.game_state(), states[0])
+
+        self.assertEqual(metrics.round_trips[ProtocolAction.GAME_STATE].count, 2)
+        self.assertEqual(metrics.round_trips[ProtocolAction.MAP].count, 1)
+        self.assertEqual((shared.sent, shared.collapsed), (3, 4))
+
+    async def test_stream_transport(self):
+        async with Session(self.server.host, self.server.port, buffered=False) as session:
+            await session.login(LoginAction("player", game="test"))
+            responses = await session.pipeline([
+                (ProtocolAction.MAP, None),
+                (GameAction.MOVE, MoveAction(VehicleId(1), Hex(0, 0, 0))),
+            ])
+            self.assertIsInstance(responses[0], MapResponse)
+            self.assertIsInstance(responses[1], ErrorResponse)
+
+    async def test_concurrent_requests(self):
+        for buffered in (True, False):
+            async with Session(self.server.host, self.server.port, buffered=buffered) as session:
+                await session.login(LoginAction("player", game="test"))
+                requests = [session.map(), session.game_state(), session.game_actions(),
+                            session.pipeline([(ProtocolAction.MAP, None), (ProtocolAction.GAME_STATE, None)]),
+                            session.game_state()]
+                # Every caller gets the response to its own request
+                responses = await aio.wait_for(aio.gather(*requests), 5)
+                self.assertIsInstance(responses[0], MapResponse)
+                self.assertIsInstance(responses[1], GameStateResponse)
+                self.assertIsInstance(responses[2], GameActionsResponse)
+                self.assertIsInstance(responses[3][0], MapResponse)
+                self.assertIsInstance(responses[3][1], GameStateResponse)
+                self.assertIsInstance(responses[4], GameStateResponse)
+
+    async def test_empty_pipeline(self):
+        async with Session(self.server.host, self.server.port) as session:
+            self.assertEqual(await session.pipeline([]), [])
+
+
+class LatencyTestCase(unittest.IsolatedAsyncioTestCase):
+    LATENCY = 0.1
+
+    async def asyncSetUp(self):
+        self.server = GameServer(latency=self.LATENCY, jitter=0.01, seed=0)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_pipeline_latency(self):
+        async with Session(self.server.host, self.server.port) as session:
+            start = perf_counter()
+            await session.login(LoginAction("player", game="test"))
+            self.assertGreaterEqual(perf_counter() - start, self.LATENCY)
+
+            # Responses to pipelined requests are delayed together
+            start = perf_counter()
+            responses = await session.pipeline([(ProtocolAction.GAME_STATE, None)] * 5)
+            self.assertLess(perf_counter() - start, self.LATENCY * 3)
+            self.assertTrue(all(isinstance(r, GameStateResponse) for r in responses))
+
+
+class HistogramTestCase(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = Histogram()
+        for i in range(1, 101):
+            histogram.record(i / 1000)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.max, 0.1)
+        # Quantiles are bucket bounds, exact up to factor of two
+        self.assertLessEqual(0.05, histogram.quantile(0.5))
+        self.assertLess(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(1), 0.1)
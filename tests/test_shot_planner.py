@@ -0,0 +1,98 @@
+import unittest
+
+from ai.pathFinder import AStarPathfinding
+from model.game import Game
+from model.map import GameMap
+from model.hex import Hex
+from model.common import Content, PlayerId
+from model.vehicle import Vehicle, VehicleId, VehicleType
+from player.shot_planner import ShotPlanner
+
+
+def make_vehicle(vid: int, player: int, vehicle_type: VehicleType, position: Hex,
+                 hp: int = 1, capture_points: int = 0) -> Vehicle:
+    return Vehicle(VehicleId(vid), PlayerId(player), vehicle_type,
+                   position, hp, position, False, capture_points)
+
+
+def make_game(size: int, contents, vehicles, attack_matrix=None) -> Game:
+    game = Game()
+    game.map = GameMap(size, contents)
+    game.map.vehicles = {vehicle.position: vehicle for vehicle in vehicles}
+    game.players = [PlayerId(1), PlayerId(2), PlayerId(3)]
+    game.attack_matrix = attack_matrix or {player: [] for player in game.players}
+    return game
+
+
+class ShotPlannerTestCase(unittest.TestCase):
+    size = 4
+    center = Hex(0, 0, 0)
+    # Everything is base, so every vehicle is allowed to shoot
+    base = {hex: Content.BASE for hex in center.range(size + 1)}
+
+    def test_no_overkill(self):
+        first = make_vehicle(1, 1, VehicleType.MEDIUM_TANK, Hex(0, 0, 0))
+        second = make_vehicle(2, 1, VehicleType.MEDIUM_TANK, Hex(0, 2, -2))
+        # Both are in range of both own vehicles, one shot destroys the first
+        weak = make_vehicle(3, 2, VehicleType.LIGHT_TANK, Hex(2, 0, -2), hp=1, capture_points=2)
+        strong = make_vehicle(4, 2, VehicleType.MEDIUM_TANK, Hex(-2, 2, 0), hp=2)
+        game = make_game(self.size, self.base, [first, second, weak, strong])
+
+        planner = ShotPlanner(game, PlayerId(1))
+        shots = planner.plan([first, second])
+
+        self.assertEqual(sorted(enemy.id for enemy in shots.values()), [weak.id, strong.id])
+        self.assertEqual(planner.hp_left, [0, 1])
+
+    def test_neutrality(self):
+        own = make_vehicle(1, 1, VehicleType.MEDIUM_TANK, Hex(0, 0, 0))
+        second = make_vehicle(2, 2, VehicleType.MEDIUM_TANK, Hex(-2, 2, 0), hp=2)
+        third = make_vehicle(3, 3, VehicleType.LIGHT_TANK, Hex(2, 0, -2), capture_points=2)
+
+        # Third player was attacked by the second one, not by us
+        matrix = {PlayerId(1): [], PlayerId(2): [PlayerId(3)], PlayerId(3): []}
+        game = make_game(self.size, self.base, [own, second, third], matrix)
+        shots = ShotPlanner(game, PlayerId(1)).plan([own])
+        self.assertEqual(shots[own.id].id, second.id)
+
+        # Unless third player attacked us
+        matrix[PlayerId(3)] = [PlayerId(1)]
+        shots = ShotPlanner(game, PlayerId(1)).plan([own])
+        self.assertEqual(shots[own.id].id, third.id)
+
+    def test_at_spg_shadow(self):
+        contents = dict(self.base)
+        contents[Hex(1, -1, 0)] = Content.OBSTACLE
+
+        own = make_vehicle(1, 1, VehicleType.AT_SPG, Hex(0, 0, 0))
+        hidden = make_vehicle(2, 2, VehicleType.LIGHT_TANK, Hex(2, -2, 0), capture_points=2)
+        visible = make_vehicle(3, 2, VehicleType.MEDIUM_TANK, Hex(0, -2, 2), hp=2)
+        game = make_game(self.size, contents, [own, hidden, visible])
+
+        shots = ShotPlanner(game, PlayerId(1)).plan([own])
+        self.assertEqual(shots[own.id].id, visible.id)
+
+
+class FireLineTestCase(unittest.TestCase):
+    def test_fire_line_matches_path_search(self):
+        size = 5
+        center = Hex(0, 0, 0)
+        obstacles = {Hex(1, -1, 0), Hex(-2, 0, 2), Hex(0, 2, -2), Hex(2, 1, -3)}
+        game = make_game(size, {hex: Content.OBSTACLE for hex in obstacles}, [])
+        finder = AStarPathfinding(size, center)
+        hexes = set(center.range(size + 1))
+
+        for position in hexes - obstacles:
+            vehicle = make_vehicle(1, 1, VehicleType.AT_SPG, position)
+            _, ru = vehicle.shooting_range
+
+            # Hex is on a line if it is aligned and the only shortest path to it is free
+            expected = set()
+            for hex in hexes - obstacles:
+                dist = position.distance(hex)
+                aligned = any(a == b for a, b in zip(position, hex))
+                if aligned and 1 <= dist <= ru and \
+                        len(finder.path(position, hex, obstacles, 1)) == dist + 1:
+                    expected.add(hex)
+
+            self.assertEqual(game.fire_line(vehicle) & hexes, expected, position)
@@ -0,0 +1,107 @@
+import asyncio as aio
+import unittest
+
+from model.common import PlayerId
+from model.action import MoveAction, TurnActions
+from player.pool import compute_turn
+from player.speculation import Speculator, TurnSimulator, state_key
+from server.game import ServerError
+from util import start_game, update_game
+
+
+class SpeculationTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server, self.players, self.game = start_game("speculation")
+
+    async def play_turn(self, actions):
+        current = self.server.current_player
+        for action in actions:
+            try:
+                if isinstance(action, MoveAction):
+                    self.server.move(current, action.vehicleId, action.target)
+                else:
+                    self.server.shoot(current, action.vehicleId, action.target)
+            except ServerError:
+                pass
+        await aio.gather(*(self.server.turn(player) for player in self.players))
+        update_game(self.game, self.server)
+
+    async def test_simulated_turn_matches_server(self):
+        for _ in range(12):
+            current = PlayerId(self.server.current_player.idx)
+            next_player = self.game.players[(self.game.players.index(current) + 1) % 3]
+            actions = compute_turn(self.game.copy(), current)
+
+            simulator = TurnSimulator(self.game)
+            simulator.apply(actions)
+            simulator.end_turn(current, next_player)
+
+            await self.play_turn(actions)
+            self.assertEqual(state_key(simulator.game), state_key(self.game))
+
+    def test_state_key(self):
+        game = self.game.copy()
+        vehicle = next(iter(game.map.vehicles.values()))
+
+        # Vehicle changes are tracked by the map hash
+        game.map.set_hp(vehicle, vehicle.hp - 1)
+        self.assertNotEqual(state_key(game), state_key(self.game))
+        game.map.set_hp(vehicle, vehicle.hp + 1)
+        self.assertEqual(state_key(game), state_key(self.game))
+        self.assertEqual(hash(state_key(game)), hash(state_key(self.game)))
+
+        game.attack_matrix[vehicle.playerId].append(game.players[-1])
+        self.assertNotEqual(state_key(game), state_key(self.game))
+
+    def test_respawn_on_taken_spawn(self):
+        simulator = TurnSimulator(self.game)
+        game_map = simulator.game.map
+        victim, other = list(game_map.vehicles.values())[:2]
+        free = [hex for hex in game_map.tables.hexes
+                if hex not in game_map.vehicles and hex not in game_map.contents]
+        game_map.move_vehicle(victim, free[0])
+        game_map.move_vehicle(other, victim.spawn)
+
+        # Vehicle standing on the spawn keeps it
+        simulator.respawn(victim)
+        self.assertEqual((victim.position, other.position), (free[0], victim.spawn))
+        self.assertEqual(len(game_map.vehicles), len(self.game.map.vehicles))
+
+        expected = game_map.hash
+        game_map.rehash()
+        self.assertEqual(game_map.hash, expected)
+
+    async def test_repeated_turn_is_predicted(self):
+        first, second, third = self.game.players
+        speculator = Speculator(third)
+
+        # Second player moves the same vehicle by the same offset in both turns
+        game_map = self.game.map
+        vehicle = next(v for v in game_map.vehicles.values() if v.playerId == second)
+        target = next(h for h in vehicle.position.neighbors()
+                      if h not in game_map.contents and h not in game_map.vehicles
+                      and (h + h - vehicle.position) not in game_map.contents
+                      and h.distance() < game_map.size)
+        offset = target - vehicle.position
+        move = [MoveAction(second, vehicle.id, target)]
+
+        await self.play_turn([])
+        turn_start = self.game.copy()
+        await self.play_turn(move)
+        speculator.observe(turn_start, TurnActions(move, [], []))
+        await self.play_turn([])
+
+        # Back to the first player, the second one is expected to repeat
+        computed = []
+
+        async def compute(game, player_id):
+            computed.append(state_key(game))
+            return [player_id]
+
+        await speculator.speculate(self.game, first, compute, known={first: []})
+        self.assertEqual(len(computed), 2)
+
+        await self.play_turn([])
+        await self.play_turn([MoveAction(second, vehicle.id, vehicle.position + offset + offset)])
+        self.assertEqual(speculator.take(self.game), [third])
+        self.assertEqual((speculator.hits, speculator.misses), (1, 0))
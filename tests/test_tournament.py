@@ -0,0 +1,41 @@
+import unittest
+
+from runner.game_loop import BotResult, GameResult
+from runner.tournament import summarize, format_stats
+
+
+def bot(idx, variant, won=False, capture=0, kill=0, latencies=(0.001,), rejected=0, invalid=0):
+    return BotResult(idx, variant, capture, kill, won, list(latencies), rejected, invalid)
+
+
+class SummarizeTestCase(unittest.TestCase):
+    def test_summarize(self):
+        results = [
+            GameResult("first", 1, 45, [
+                bot(1, "a", won=True, capture=5, kill=2, latencies=(0.001, 0.003)),
+                bot(2, "a", kill=4, rejected=1),
+                bot(3, "b", capture=1, invalid=2),
+            ]),
+            GameResult("second", None, 45, [
+                bot(1, "b", capture=3, kill=1, latencies=(0.002,)),
+                bot(2, "a", capture=1),
+                bot(3, "b", kill=3),
+            ]),
+        ]
+
+        stats = summarize(results)
+        a, b = stats["a"], stats["b"]
+
+        # Variant taking several seats of a game plays it once
+        self.assertEqual((a.games, a.seats, a.wins), (2, 3, 1))
+        self.assertEqual((b.games, b.seats, b.wins), (2, 3, 0))
+        self.assertAlmostEqual(a.win_rate, 1 / 3)
+        self.assertAlmostEqual(a.capture, 2)
+        self.assertAlmostEqual(b.kill, 4 / 3)
+        self.assertEqual((a.rejected, a.invalid, b.rejected, b.invalid), (1, 0, 0, 2))
+        self.assertAlmostEqual(a.latency_max, 3.0)
+        self.assertAlmostEqual(b.latency_mean, 1.0 + 1 / 3)
+
+        lines = format_stats(stats).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith("a"))
@@ -0,0 +1,52 @@
+import unittest
+
+from client.transport import HEADER, INITIAL_BUFFER_SIZE, FrameProtocol
+
+
+def frame(code: int, payload: bytes) -> bytes:
+    return HEADER.pack(code, len(payload)) + payload
+
+
+class FrameProtocolTestCase(unittest.TestCase):
+    def feed(self, protocol: FrameProtocol, data: bytes, chunk: int):
+        '''Feed data as transport does, in chunks of given size at most'''
+        offset = 0
+        while offset < len(data):
+            buffer = protocol.get_buffer(-1)
+            n = min(chunk, len(buffer), len(data) - offset)
+            buffer[:n] = data[offset:offset + n]
+            protocol.buffer_updated(n)
+            offset += n
+
+    def test_split_frames(self):
+        payloads = [b'{"a": %d}' % i for i in range(100)] + [b'']
+        data = b''.join(frame(i, p) for i, p in enumerate(payloads))
+
+        for chunk in (1, 3, 7, len(data)):
+            protocol = FrameProtocol()
+            self.feed(protocol, data, chunk)
+            frames = [(c, bytes(p)) for c, p in protocol.frames]
+            self.assertEqual(frames, list(enumerate(payloads)))
+
+    def test_large_frame(self):
+        large = b'x' * (INITIAL_BUFFER_SIZE * 3 + 5)
+        protocol = FrameProtocol()
+        self.feed(protocol, frame(1, b'small'), 1000)
+        self.feed(protocol, frame(2, large), 5000)
+
+        # Queued view is still valid after buffer is replaced
+        code, small = protocol.frames.popleft()
+        self.assertEqual((code, bytes(small)), (1, b'small'))
+        code, payload = protocol.frames.popleft()
+        self.assertEqual((code, bytes(payload)), (2, large))
+
+    def test_buffer_is_reused(self):
+        protocol = FrameProtocol()
+        payload = b'y' * 1000
+        for _ in range(INITIAL_BUFFER_SIZE // 100):
+            self.feed(protocol, frame(0, payload), 4096)
+            _, view = protocol.frames.popleft()
+            self.assertEqual(bytes(view), payload)
+            del view
+
+        self.assertEqual(len(protocol.buffer), INITIAL_BUFFER_SIZE)
@@ -0,0 +1,83 @@
+import unittest
+
+from ai.transposition import TranspositionTable, prefer_deeper
+from player.simulator import TurnSimulator
+from util import start_game
+
+
+class ZobristTestCase(unittest.TestCase):
+    def test_incremental_hash(self):
+        _, _, game = start_game("zobrist")
+
+        simulator = TurnSimulator(game)
+        game_map = simulator.game.map
+        self.assertEqual(game_map.hash, game.map.hash)
+
+        # Two vehicles swap places through a free hex
+        a, b = list(game_map.vehicles.values())[:2]
+        position_a, position_b = a.position, b.position
+        free = next(hex for hex in game_map.tables.hexes if hex not in game_map.vehicles)
+        game_map.move_vehicle(a, free)
+        game_map.move_vehicle(b, position_a)
+        game_map.move_vehicle(a, position_b)
+        game_map.set_hp(a, a.hp - 1)
+        game_map.set_capture_points(b, 1)
+        game_map.set_bonus(b, True)
+
+        changed = game_map.hash
+        self.assertNotEqual(changed, game.map.hash)
+        game_map.rehash()
+        self.assertEqual(game_map.hash, changed)
+
+        # Changes undone in another order give the original hash
+        game_map.set_bonus(b, False)
+        game_map.move_vehicle(a, free)
+        game_map.set_capture_points(b, 0)
+        game_map.move_vehicle(b, position_b)
+        game_map.set_hp(a, a.hp + 1)
+        game_map.move_vehicle(a, position_a)
+        self.assertEqual(game_map.hash, game.map.hash)
+
+
+class CollidingKey(int):
+    # Every key lands in the same slot
+    def __hash__(self):
+        return 0
+
+
+class TranspositionTableTestCase(unittest.TestCase):
+    def test_always_replace(self):
+        table = TranspositionTable(4)
+        self.assertTrue(table.put(1, "a"))
+        self.assertEqual(table.get(1), "a")
+
+        # Same slot, the latest entry wins
+        self.assertTrue(table.put(5, "b"))
+        self.assertIsNone(table.get(1))
+        self.assertEqual(table.get(5), "b")
+        self.assertNotIn(1, table)
+        self.assertEqual((table.hits, table.misses), (2, 1))
+
+    def test_prefer_deeper(self):
+        table = TranspositionTable(4, prefer_deeper)
+        table.put(1, "deep", depth=3)
+        self.assertFalse(table.put(5, "shallow", depth=1))
+        self.assertEqual(table.get(1), "deep")
+
+        # Shallower search is not enough
+        self.assertIsNone(table.get(1, depth=4))
+
+        # Entries of previous turns give way
+        table.new_generation()
+        self.assertEqual(table.get(1), "deep")
+        self.assertTrue(table.put(5, "shallow", depth=1))
+        self.assertEqual(table.get(5), "shallow")
+
+    def test_hash_collision(self):
+        table = TranspositionTable(4)
+        table.put(CollidingKey(1), "a")
+
+        # Equal hashes are not enough to match
+        self.assertNotIn(CollidingKey(2), table)
+        self.assertIsNone(table.get(CollidingKey(2)))
+        self.assertEqual(table.get(CollidingKey(1)), "a")
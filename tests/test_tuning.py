@@ -0,0 +1,91 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from player.engine import Engine
+from player.params import EngineParams, DEFAULT_PARAMS
+from player.variants import EngineVariant, parse_variant
+from runner.tuning import Evaluation, Tuner
+
+
+PARAMS = EngineParams(
+    turn_order=tuple(reversed(DEFAULT_PARAMS.turn_order)),
+    low_hp_bonus=5,
+    capture_weight=2,
+    repair_threshold=0,
+)
+
+
+class ParamsTestCase(unittest.TestCase):
+    def test_json_round_trip(self):
+        j = json.loads(json.dumps(PARAMS.to_json()))
+        self.assertEqual(EngineParams.from_json(j), PARAMS)
+
+        # Missing parameters take default values
+        self.assertEqual(EngineParams.from_json({"low_hp_bonus": 5}),
+                         DEFAULT_PARAMS._replace(low_hp_bonus=5))
+
+    def test_parse_variant(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tuned.json")
+            with open(path, "w") as f:
+                json.dump(PARAMS.to_json(), f)
+
+            variant = parse_variant(path)
+            self.assertEqual(variant, EngineVariant(name="tuned", params=PARAMS))
+            self.assertEqual(variant.factory().keywords, {"params": PARAMS})
+
+        self.assertIs(parse_variant("default").factory(), Engine)
+        self.assertIs(parse_variant("player.engine:Engine").factory(), Engine)
+        with self.assertRaises(ValueError):
+            parse_variant("unknown").factory()
+
+
+class TunerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.tmp.name, "tuning.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_tuner(self, seed=None) -> Tuner:
+        return Tuner(population=4, checkpoint=self.checkpoint, seed=seed)
+
+    def test_resume(self):
+        self.assertFalse(self.make_tuner().load())
+
+        tuner = self.make_tuner(seed=1)
+        tuner.history = [
+            Evaluation(DEFAULT_PARAMS, 0.4, 6, 2, 1.5, 3.0),
+            Evaluation(PARAMS, 0.6, 6, 3, 2.0, 1.0),
+        ]
+        tuner.generation = 1
+        tuner.rng.random()
+        tuner.save()
+
+        resumed = self.make_tuner(seed=2)
+        self.assertTrue(resumed.load())
+        self.assertEqual(resumed.generation, 1)
+        self.assertEqual(resumed.history, tuner.history)
+        self.assertEqual(resumed.best()[0].params, PARAMS)
+
+        # Search continues exactly as it would without interruption
+        self.assertEqual(resumed.candidates(), tuner.candidates())
+
+    def test_interrupted_save(self):
+        tuner = self.make_tuner(seed=1)
+        tuner.generation = 1
+        tuner.save()
+
+        tuner.generation = 2
+        with mock.patch("runner.tuning.json.dump", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                tuner.save()
+
+        # Previous checkpoint is intact
+        resumed = self.make_tuner()
+        self.assertTrue(resumed.load())
+        self.assertEqual(resumed.generation, 1)
@@ -0,0 +1,79 @@
+import unittest
+
+from model.hex import Hex
+from model.common import PlayerId
+from model.vehicle import VehicleType
+from model.action import MoveAction, ShootAction
+from player.validator import ActionValidator
+from util import start_game
+
+
+class ValidatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server, self.players, self.game = start_game("validator")
+        self.player_id = PlayerId(self.server.current_player.idx)
+
+    def send(self, actions):
+        # Raises ServerError if any action is rejected
+        player = self.server.current_player
+        for action in actions:
+            if isinstance(action, MoveAction):
+                self.server.move(player, action.vehicleId, action.target)
+            else:
+                self.server.shoot(player, action.vehicleId, action.target)
+
+    def vehicle(self, vehicle_type: VehicleType):
+        vehicles = self.game.get_vehicles_for(self.player_id)
+        return vehicles[vehicle_type][0]
+
+    def test_invalid_actions(self):
+        light = self.vehicle(VehicleType.LIGHT_TANK)
+        heavy = self.vehicle(VehicleType.HEAVY_TANK)
+        medium = self.vehicle(VehicleType.MEDIUM_TANK)
+        enemy = next(v for v in self.game.map.vehicles.values() if v.playerId != self.player_id)
+
+        actions = [
+            # Too far, repaired to a hex on the way
+            MoveAction(self.player_id, light.id, Hex(0, 0, 0)),
+            # Second action of the same vehicle
+            MoveAction(self.player_id, light.id, light.position),
+            # Enemy is out of range
+            ShootAction(self.player_id, medium.id, enemy.position),
+            # Vehicle of another player
+            MoveAction(enemy.playerId, enemy.id, Hex(0, 0, 0)),
+            # Valid move
+            MoveAction(self.player_id, heavy.id, next(
+                hex for hex in heavy.position.neighbors()
+                if hex not in self.game.map.vehicles and hex not in self.game.map.contents
+                and hex.distance() < self.game.map.size
+            )),
+        ]
+
+        validator = ActionValidator(self.game, self.player_id)
+        valid = validator.validate(actions)
+
+        self.assertEqual((validator.repaired, validator.dropped), (1, 3))
+        self.assertEqual([a.vehicleId for a in valid], [light.id, heavy.id])
+        self.assertIs(valid[1], actions[4])
+        self.assertEqual(valid[0].target.distance(light.position), light.speed)
+        self.assertLess(valid[0].target.distance(), light.position.distance())
+
+        self.send(valid)
+
+    def test_engine_turn_is_valid(self):
+        from player.engine import Engine
+
+        validator = ActionValidator(self.game, self.player_id)
+        actions = Engine(self.game.copy(), self.player_id).make_turn()
+        self.assertEqual(validator.validate(actions), actions)
+        self.assertEqual((validator.repaired, validator.dropped), (0, 0))
+        self.send(actions)
+
+    def test_stay_in_place(self):
+        # Server accepts a move to the vehicle's own hex
+        light = self.vehicle(VehicleType.LIGHT_TANK)
+        action = MoveAction(self.player_id, light.id, light.position)
+
+        validator = ActionValidator(self.game, self.player_id)
+        self.assertEqual(validator.validate([action]), [action])
+        self.send([action])
@@ -0,0 +1,46 @@
+import unittest
+
+from model.game import Game
+from model.map import GameMap
+from model.vehicle import Vehicle
+from player.engine import Engine
+from player.workers import EngineWorkers
+from util import start_game
+
+
+class WorkersTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server, _, self.game = start_game("workers")
+        # Something besides initial values
+        self.game.attack_matrix[self.game.players[0]] = [self.game.players[1]]
+        vehicle = next(iter(self.game.map.vehicles.values()))
+        vehicle.hp -= 1
+        vehicle.capture_points = 2
+        vehicle.bonus = True
+
+    def test_snapshot_round_trip(self):
+        game_map = GameMap.from_snapshot(self.game.map.snapshot())
+        self.assertEqual((game_map.size, game_map.contents),
+                         (self.game.map.size, self.game.map.contents))
+
+        for vehicle in self.game.map.vehicles.values():
+            copy = Vehicle.from_snapshot(vehicle.snapshot())
+            self.assertEqual(vars(copy), vars(vehicle))
+
+        game = Game()
+        game.map = game_map
+        game.update_state_from_snapshot(self.game.state_snapshot())
+        self.assertEqual(game.players, self.game.players)
+        self.assertEqual(game.attack_matrix, self.game.attack_matrix)
+        self.assertEqual(game.map.vehicles.keys(), self.game.map.vehicles.keys())
+        self.assertEqual(game.state_snapshot(), self.game.state_snapshot())
+
+    async def test_worker_turn(self):
+        with EngineWorkers() as workers:
+            await workers.warm_up(self.game, self.game.players)
+            for player_id in self.game.players:
+                expected = Engine(self.game.copy(), player_id).make_turn()
+                actions = await workers.make_turn(self.game, player_id)
+                # Actions have no equality, their representations are compared
+                self.assertEqual(repr(actions), repr(expected))
+            self.assertEqual(set(workers.workers), set(self.game.players))
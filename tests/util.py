@@ -0,0 +1,32 @@
+from typing import List, Tuple
+
+from client.decoding import decoder_for
+from client.responses import MapResponse, GameStateResponse
+from model.game import Game
+from server.game import ServerGame, ServerPlayer
+from server.maps import default_map
+
+
+def start_game(name: str, num_players: int = 3) -> Tuple[ServerGame, List[ServerPlayer], Game]:
+    '''
+    Start a game on stand-in server with all players logged in.
+
+    <param name="name">Name of the game.</param>
+    <param name="num_players">Number of players.</param>
+    <returns>Server game, its players and client game with the first state</returns>
+    '''
+
+    server = ServerGame(name, default_map(), num_players=num_players)
+    players = [server.login(f"player-{i}", None, False) for i in range(num_players)]
+    game = Game()
+    game.init_map(decoder_for(MapResponse)(server.map_json()))
+    update_game(game, server)
+    return server, players, game
+
+
+def update_game(game: Game, server: ServerGame):
+    '''
+    Update client game with current state of the server game.
+    '''
+
+    game.update_state(decoder_for(GameStateResponse)(server.state_json()))